@@ -0,0 +1,91 @@
+"""
+Auth overhead per request: raw JWT verification (python-jose, PyJWT if installed)
+versus the verified-token cache, and how many decodes one chat-style request performs.
+
+    python -m benchmarks.bench_auth --iterations 20000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt as jose_jwt
+
+from src.auth import service
+from src.auth.dependencies import get_current_user
+from src.auth.schemas import TokenData
+
+
+def per_call_us(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def decodes_per_request(token: str) -> int:
+    """
+    Same dependency layout as the chat router: router-level and endpoint-level `get_current_user`.
+    """
+    calls = 0
+    original = service.jwt_decode
+
+    def counting_decode(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return original(*args, **kwargs)
+
+    router = APIRouter(dependencies=[Depends(get_current_user)])
+
+    @router.get("/probe")
+    async def probe(current_user: Annotated[TokenData, Depends(get_current_user)]):
+        return {"id": current_user.id}
+
+    app = FastAPI()
+    app.include_router(router)
+    service.jwt_decode = counting_decode
+    service.token_cache.clear()
+    try:
+        TestClient(app).get("/probe", headers={"Authorization": f"Bearer {token}"})
+    finally:
+        service.jwt_decode = original
+    return calls
+
+
+def main(args: argparse.Namespace) -> dict:
+    token = asyncio.run(service.create_access_token({"id": 1, "name": "bench", "account": "bench"}))
+    key, algorithm = service.SECRET_KEY, service.ALGORITHM
+    results = {
+        "jose_decode_us": per_call_us(lambda: jose_jwt.decode(token, key, algorithms=[algorithm]), args.iterations),
+    }
+    try:
+        import jwt as pyjwt
+
+        results["pyjwt_decode_us"] = per_call_us(
+            lambda: pyjwt.decode(token, key, algorithms=[algorithm]), args.iterations
+        )
+    except ImportError:
+        results["pyjwt_decode_us"] = None
+
+    loop = asyncio.new_event_loop()
+    service.token_cache.clear()
+    loop.run_until_complete(service.decode_access_token(token))
+    results["cached_decode_us"] = per_call_us(
+        lambda: loop.run_until_complete(service.decode_access_token(token)), args.iterations
+    )
+    results["event_loop_baseline_us"] = per_call_us(
+        lambda: loop.run_until_complete(asyncio.sleep(0)), args.iterations
+    )
+    loop.close()
+    results["decodes_per_request"] = decodes_per_request(token)
+    return {"benchmark": "auth_overhead", "params": vars(args), **results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    print(json.dumps(main(parser.parse_args()), indent=2))
@@ -0,0 +1,78 @@
+"""
+Concurrent query embeddings: one embed call per query versus the coalescing BatchingEmbedder.
+The fake Ollama models a GPU that serves `--parallel` calls at once, each costing a fixed
+overhead plus a small per-text cost, so batching amortizes the overhead.
+
+    python -m benchmarks.bench_embed_batching --queries 256 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from src.rag.batching import BatchingEmbedder, embed_batch_size
+from src.rag.embedder import Embedder
+
+from .stats import summarize
+from .stubs import FakeOllamaClient
+
+
+async def drive(embedder, queries: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await embedder.embed_texts([f"query {i} 台積電(2330)的最新消息"])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(queries)))
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "queries_per_second": queries / elapsed, **summarize(latencies)}
+
+
+def new_client(args: argparse.Namespace) -> FakeOllamaClient:
+    return FakeOllamaClient(
+        embed_latency=args.embed_latency,
+        embed_item_latency=args.item_latency,
+        embed_parallel=args.parallel,
+        embedding_dim=args.embedding_dim,
+    )
+
+
+async def run(args: argparse.Namespace) -> dict:
+    single = Embedder("bench")
+    single.client = new_client(args)
+    unbatched = await drive(single, args.queries, args.concurrency)
+
+    inner = Embedder("bench")
+    inner.client = new_client(args)
+    batching = BatchingEmbedder(inner, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000)
+    batched = await drive(batching, args.queries, args.concurrency)
+
+    return {
+        "benchmark": "embed_batching",
+        "params": vars(args),
+        "unbatched": {**unbatched, "embed_calls": single.client.calls},
+        "batched": {
+            **batched,
+            "embed_calls": inner.client.calls,
+            "mean_batch_size": embed_batch_size.sum() / max(embed_batch_size.count(), 1),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--embed-latency", type=float, default=0.02, help="Fixed seconds per embed call")
+    parser.add_argument("--item-latency", type=float, default=0.001, help="Extra seconds per text in a call")
+    parser.add_argument("--parallel", type=int, default=2, help="Embed calls the server runs at once")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--embedding-dim", type=int, default=384)
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
@@ -0,0 +1,235 @@
+"""
+Micro-benchmarks of the ingestion hot paths (the stages of `ingest_file`) over synthetic
+Chinese news corpora, fully offline with a deterministic fake embedder.
+Per stage: throughput, peak traced allocations (tracemalloc, first batch only) and the largest
+RSS growth over one batch. The peak RSS of the process is reported once per corpus.
+
+    python -m benchmarks.bench_ingest --docs 1000 10000
+    python -m benchmarks.bench_ingest --docs 100000 --batch 2000 --embedding-dim 1536
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from .stubs import FakeOllamaClient
+
+COMPANIES = [("台積電", "2330"), ("鴻海", "2317"), ("聯發科", "2454"), ("廣達", "2382"), ("台達電", "2308")]
+TOPICS = ["營收", "法說會", "AI 伺服器", "先進封裝", "電動車", "匯率", "外資買超", "資本支出"]
+TEMPLATES = [
+    "{company}({ticker})公布{topic}最新數據，市場預期後續動能持續增強。",
+    "法人指出，{company}在{topic}的布局已進入收成期，毛利率有望維持高檔。",
+    "受{topic}影響，{company}股價今日震盪，成交量較前一交易日放大。",
+    "供應鏈消息傳出{company}({ticker}.TW)將擴大{topic}投資，相關設備商同步受惠。",
+]
+
+
+def synthetic_document(rng: random.Random, sentences: int) -> str:
+    parts = []
+    for _ in range(sentences):
+        company, ticker = rng.choice(COMPANIES)
+        parts.append(rng.choice(TEMPLATES).format(company=company, ticker=ticker, topic=rng.choice(TOPICS)))
+    return "".join(parts)
+
+
+def write_corpus(folder: str, docs: List[str], docs_per_csv: int) -> Tuple[List[str], List[str]]:
+    """
+    Every document as a .txt file, and the same documents as rows of .csv files.
+    """
+    txt_files, csv_files = [], []
+    for i, doc in enumerate(docs):
+        path = os.path.join(folder, f"doc_{i}.txt")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(doc)
+        txt_files.append(path)
+    for start in range(0, len(docs), docs_per_csv):
+        path = os.path.join(folder, f"docs_{start}.csv")
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            for i, doc in enumerate(docs[start : start + docs_per_csv], start=start):
+                writer.writerow([f"title {i}", doc])
+        csv_files.append(path)
+    return txt_files, csv_files
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux, and the peak since the process started
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def current_rss_mb() -> Optional[float]:
+    # Resident pages right now, Linux only
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        return None
+
+
+class StageStats:
+    def __init__(self, unit: str):
+        self.unit = unit
+        self.seconds = 0.0
+        self.items = 0
+        self.peak_traced_mb = None
+        self.rss_growth_mb = None
+
+    def to_dict(self) -> dict:
+        return {
+            "unit": self.unit,
+            "items": self.items,
+            "seconds": self.seconds,
+            "items_per_second": self.items / self.seconds if self.seconds else None,
+            "peak_traced_mb": self.peak_traced_mb,
+            "rss_growth_mb": self.rss_growth_mb,
+        }
+
+
+async def timed(stats: StageStats, trace: bool, func: Callable, *args):
+    if trace:
+        tracemalloc.start()
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    result = func(*args)
+    if asyncio.iscoroutine(result):
+        result = await result
+    elapsed = time.perf_counter() - start
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats.peak_traced_mb = peak / 1024 / 1024
+    else:
+        stats.seconds += elapsed
+        rss_after = current_rss_mb()
+        if rss_before is not None and rss_after is not None:
+            stats.rss_growth_mb = max(stats.rss_growth_mb or 0.0, rss_after - rss_before)
+    return result
+
+
+async def run_batch(stages: Dict[str, StageStats], ingestor, embedder, txt_files, csv_files, trace: bool):
+    from qdrant_client.models import PointStruct
+
+    from src.rag.sparse import SPARSE_VECTOR_NAME, encode_document
+    from src.rag.utils import extract_tickers
+
+    make_chunk = getattr(ingestor, "__make_chunk")
+
+    async def read_all_txt():
+        return [await ingestor.read_txt(path) for path in txt_files]
+
+    async def read_all_csv():
+        return [await ingestor.read_csv(path) for path in csv_files]
+
+    chunked = await timed(stages["read_txt"], trace, read_all_txt)
+    csv_chunks = await timed(stages["read_csv"], trace, read_all_csv)
+    texts = ["".join(chunks) for chunks in chunked]
+    chunked = await timed(stages["make_chunk"], trace, lambda: [make_chunk(text) for text in texts])
+    tickers = await timed(stages["extract_tickers"], trace, lambda: [extract_tickers(text) for text in texts])
+
+    def build_payloads():
+        timestamp = datetime.now().isoformat()
+        documents = []
+        for source, (chunks, doc_tickers) in enumerate(zip(chunked, tickers)):
+            metadata = ingestor.ArticleMetadata(news_source="BENCH", tickers=doc_tickers)
+            documents.append(
+                [
+                    ingestor.DocumentChunk(
+                        source=f"doc_{source}", chunk_id=i, text=chunk, created_at=timestamp, metadata=metadata
+                    )
+                    for i, chunk in enumerate(chunks)
+                ]
+            )
+        return documents, [[chunk.to_payload() for chunk in chunks] for chunks in documents]
+
+    documents, payloads = await timed(stages["to_payload"], trace, build_payloads)
+    sparse = await timed(
+        stages["sparse_encode"],
+        trace,
+        lambda: [[encode_document(chunk.text) for chunk in chunks] for chunks in documents],
+    )
+
+    async def embed_all():
+        return [await embedder.embed_texts([chunk.text for chunk in chunks]) for chunks in documents]
+
+    embeddings = await timed(stages["embed_texts"], trace, embed_all)
+
+    def build_points():
+        return [
+            PointStruct(id=str(uuid4()), vector={"": embedding, SPARSE_VECTOR_NAME: sparse_vector}, payload=payload)
+            for doc_payloads, doc_sparse, doc_embeddings in zip(payloads, sparse, embeddings)
+            for payload, sparse_vector, embedding in zip(doc_payloads, doc_sparse, doc_embeddings)
+        ]
+
+    points = await timed(stages["point_struct"], trace, build_points)
+    if not trace:
+        chunk_count = sum(len(chunks) for chunks in chunked)
+        stages["read_txt"].items += len(txt_files)
+        stages["read_csv"].items += sum(len(chunks) for chunks in csv_chunks)
+        stages["make_chunk"].items += chunk_count
+        stages["extract_tickers"].items += len(texts)
+        for name in ("to_payload", "sparse_encode", "embed_texts"):
+            stages[name].items += chunk_count
+        stages["point_struct"].items += len(points)
+
+
+async def run_corpus(docs: int, args: argparse.Namespace, ingestor, embedder) -> dict:
+    rng = random.Random(args.seed)
+    stages = {
+        "read_txt": StageStats("files"),
+        "read_csv": StageStats("chunks"),
+        "make_chunk": StageStats("chunks"),
+        "extract_tickers": StageStats("documents"),
+        "to_payload": StageStats("chunks"),
+        "sparse_encode": StageStats("chunks"),
+        "embed_texts": StageStats("chunks"),
+        "point_struct": StageStats("points"),
+    }
+    for batch_index, start in enumerate(range(0, docs, args.batch)):
+        batch_docs = [synthetic_document(rng, args.sentences) for _ in range(min(args.batch, docs - start))]
+        with tempfile.TemporaryDirectory() as folder:
+            txt_files, csv_files = write_corpus(folder, batch_docs, args.docs_per_csv)
+            if batch_index == 0:
+                # tracemalloc slows everything down, so allocations are measured in a separate pass
+                await run_batch(stages, ingestor, embedder, txt_files, csv_files, trace=True)
+            await run_batch(stages, ingestor, embedder, txt_files, csv_files, trace=False)
+    return {
+        "docs": docs,
+        "chunks": stages["make_chunk"].items,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": {name: stats.to_dict() for name, stats in stages.items()},
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from src import llm_client
+
+    llm_client._client = FakeOllamaClient(embed_latency=0.0, embedding_dim=args.embedding_dim)
+
+    from src.rag import ingestor
+    from src.rag.embedder import Embedder
+
+    embedder = Embedder()
+    embedder.embedding_len = args.embedding_dim
+    corpora = [await run_corpus(docs, args, ingestor, embedder) for docs in args.docs]
+    return {"benchmark": "ingest_hot_paths", "params": vars(args), "corpora": corpora}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, nargs="+", default=[1000, 10000], help="Corpus sizes to run")
+    parser.add_argument("--batch", type=int, default=1000, help="Documents processed (and kept in memory) at a time")
+    parser.add_argument("--sentences", type=int, default=12, help="Sentences per synthetic document")
+    parser.add_argument("--docs-per-csv", type=int, default=100)
+    parser.add_argument("--embedding-dim", type=int, default=384)
+    parser.add_argument("--seed", type=int, default=42)
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
@@ -0,0 +1,108 @@
+"""
+Event-loop blocking under log load: a coroutine logs bursts of records while a ticker measures
+how late the loop wakes it up, for direct (colored / JSON) handlers versus the queue-based mode.
+--sink-latency-us simulates a slow stdout (pipe back-pressure, container log driver).
+
+    python -m benchmarks.bench_logging --records 20000 --sink-latency-us 20
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import sys
+import tempfile
+import time
+
+from src.common import logger as logger_module
+from src.common.logger import get_logger
+
+from .stats import percentile
+
+MODES = {
+    "sync_color": {"log_format": "color", "use_queue": False},
+    "sync_json": {"log_format": "json", "use_queue": False},
+    "queue_json": {"log_format": "json", "use_queue": True},
+}
+
+
+class SlowSink:
+    """
+    Stand-in for stderr that discards output but takes `latency` seconds per write.
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.writes = 0
+
+    def write(self, data: str) -> int:
+        self.writes += 1
+        if self.latency:
+            # Blocking I/O releases the GIL, so sleep rather than spin
+            time.sleep(self.latency)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+
+async def ticker(stop: asyncio.Event, interval: float) -> list:
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1e3)
+    return lags
+
+
+async def produce(logger: logging.Logger, records: int, burst: int) -> float:
+    start = time.perf_counter()
+    for i in range(records):
+        logger.info("chat request handled user=%s tokens=%d", "bench", i)
+        if i % burst == burst - 1:
+            await asyncio.sleep(0)
+    return time.perf_counter() - start
+
+
+async def run_mode(name: str, options: dict, args: argparse.Namespace, log_dir: str) -> dict:
+    sink = SlowSink(args.sink_latency_us / 1e6)
+    with contextlib.redirect_stderr(sink):
+        # StreamHandler binds sys.stderr when it is created
+        logger = get_logger(f"bench.{name}", to_file=args.to_file, log_dir=log_dir, file_name=name, **options)
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(stop, 0.001))
+    await asyncio.sleep(0.05)
+    produce_seconds = await produce(logger, args.records, args.burst)
+    stop.set()
+    lags = await tick_task
+    drain_start = time.perf_counter()
+    logger_module.stop_logging()
+    drain_seconds = time.perf_counter() - drain_start
+    return {
+        "mode": name,
+        "produce_seconds": produce_seconds,
+        "records_per_second": args.records / produce_seconds,
+        "loop_lag_ms": {"p50": percentile(lags, 0.5), "p99": percentile(lags, 0.99), "max": max(lags)},
+        "drain_seconds": drain_seconds,
+        "sink_writes": sink.writes,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as log_dir:
+        for name in args.modes:
+            results.append(await run_mode(name, MODES[name], args, log_dir))
+    return {"benchmark": "logging_blocking", "params": vars(args), "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--burst", type=int, default=50, help="Records logged between two yields to the loop")
+    parser.add_argument("--sink-latency-us", type=float, default=20.0)
+    parser.add_argument("--to-file", action="store_true", help="Also write a rotating log file")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    result = asyncio.run(run(parser.parse_args()))
+    print(json.dumps(result, indent=2), file=sys.stdout)
@@ -0,0 +1,107 @@
+"""
+Login burst versus chat latency: fires concurrent logins (real bcrypt, stubbed user lookup)
+while a probe endpoint standing in for chat is polled, and reports login throughput,
+rejected logins and the probe's p50/p99 latency with and without the burst.
+
+    python -m benchmarks.bench_login --logins 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from src.auth import service
+from src.auth.router import VERSION
+from src.auth.router import router as auth_router
+from src.auth.utils import get_hashed_password
+from src.db.models import User
+from src.db.session import get_db_session
+
+from .stats import percentile
+
+
+async def probe_latencies(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/probe")
+        latencies.append((time.perf_counter() - start) * 1e3)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def login_burst(client: httpx.AsyncClient, logins: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    codes = {}
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            response = await client.post(
+                f"/auth/{VERSION}/login",
+                data={"username": f"user{i}", "password": "bench-password"},
+            )
+            codes[response.status_code] = codes.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(logins)))
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "logins_per_second": logins / elapsed, "status_codes": codes}
+
+
+async def run(args: argparse.Namespace) -> dict:
+    hashed = await get_hashed_password("bench-password")
+
+    async def fake_get_user_by_account(session, account):
+        return User(id=1, name=account, account=account, password=hashed)
+
+    async def fake_db_session():
+        yield None
+
+    service.get_user_by_account = fake_get_user_by_account
+    # Every login uses a distinct account, but the whole burst comes from one client IP
+    service.login_ip_limiter.limit = args.logins
+
+    app = FastAPI()
+    app.include_router(auth_router)
+    app.dependency_overrides[get_db_session] = fake_db_session
+
+    @app.get("/probe")
+    async def probe():
+        await asyncio.sleep(0)
+        return {"ok": True}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        idle_task = asyncio.create_task(probe_latencies(client, stop, args.probe_interval))
+        await asyncio.sleep(args.idle_seconds)
+        stop.set()
+        idle = await idle_task
+
+        stop = asyncio.Event()
+        busy_task = asyncio.create_task(probe_latencies(client, stop, args.probe_interval))
+        burst = await login_burst(client, args.logins, args.concurrency)
+        stop.set()
+        busy = await busy_task
+
+    return {
+        "benchmark": "login_burst",
+        "params": vars(args),
+        "login": burst,
+        "probe_idle_ms": {"p50": statistics.median(idle), "p99": percentile(idle, 0.99)},
+        "probe_during_burst_ms": {"p50": statistics.median(busy), "p99": percentile(busy, 0.99)},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--probe-interval", type=float, default=0.005)
+    parser.add_argument("--idle-seconds", type=float, default=1.0)
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
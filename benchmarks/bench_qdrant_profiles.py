@@ -0,0 +1,189 @@
+"""
+Memory vs. recall vs. latency of the collection profiles (src/rag/profiles.py).
+Every profile gets a temporary collection with the same clustered synthetic vectors and
+news-sized payloads. Recall@k is measured against exact float32 search done with NumPy.
+RAM is measured on a Qdrant server as the change of its allocator metrics (`/metrics`
+memory_allocated_bytes and memory_resident_bytes) between before the collection is created
+and after it is indexed and queried. Memory-mapped on-disk vectors and payloads are page cache
+and not counted, run one benchmark at a time against an otherwise idle server. The estimate
+from the profile layout (what Qdrant keeps resident per point) is reported next to it.
+
+    python -m benchmarks.bench_qdrant_profiles --qdrant-url http://localhost:6333 --points 100000 --dim 1536
+
+The in-memory client (`--qdrant-url :memory:`, the default) ignores quantization and
+on-disk storage, so it only smoke-tests the script, use a Qdrant server for real numbers.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from typing import Dict, Optional
+
+import httpx
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import BinaryQuantization, CollectionStatus, PointStruct
+
+from src.rag.profiles import PROFILES, CollectionProfile
+
+from .stats import summarize
+
+CHUNK_TEXT = "供應鏈消息指出，台積電(2330)本季先進封裝產能持續吃緊，法人看好後續營收動能。" * 4
+
+
+def synthetic_vectors(rng: np.random.Generator, count: int, dim: int, clusters: int) -> np.ndarray:
+    """
+    Unit vectors around `clusters` random centres, closer to real embeddings than uniform noise.
+    """
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, count)] + 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def estimated_ram_mb(profile: CollectionProfile, points: int, dim: int, payload_bytes: int) -> dict:
+    float_bytes = points * dim * 4
+    if profile.quantization is None:
+        resident = float_bytes
+    elif isinstance(profile.quantization, BinaryQuantization):
+        resident = points * math.ceil(dim / 8)
+    else:
+        resident = points * dim
+    if not profile.on_disk_vectors and profile.quantization is not None:
+        resident += float_bytes
+    if not profile.on_disk_payload:
+        resident += points * payload_bytes
+    on_disk = float_bytes if profile.on_disk_vectors else 0
+    if profile.on_disk_payload:
+        on_disk += points * payload_bytes
+    return {"estimated_ram_mb": resident / 1024 / 1024, "estimated_disk_mb": on_disk / 1024 / 1024}
+
+
+async def server_memory(url: str) -> Optional[Dict[str, float]]:
+    """
+    Allocator metrics of the Qdrant server in bytes, None for the in-memory client or without /metrics.
+    """
+    if url == ":memory:":
+        return None
+    try:
+        async with httpx.AsyncClient(timeout=10) as client:
+            response = await client.get(f"{url.rstrip('/')}/metrics")
+            response.raise_for_status()
+    except httpx.HTTPError:
+        return None
+    metrics = {}
+    for line in response.text.splitlines():
+        name, _, value = line.partition(" ")
+        if name in ("memory_allocated_bytes", "memory_resident_bytes"):
+            metrics[name] = float(value)
+    return metrics or None
+
+
+async def wait_indexed(client: AsyncQdrantClient, name: str, timeout: float = 600.0) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        info = await client.get_collection(name)
+        if info.status == CollectionStatus.GREEN:
+            break
+        await asyncio.sleep(0.5)
+    return time.perf_counter() - start
+
+
+async def bench_profile(
+    client: AsyncQdrantClient,
+    profile: CollectionProfile,
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    args: argparse.Namespace,
+) -> dict:
+    name = f"bench_profile_{profile.name}"
+    if await client.collection_exists(name):
+        await client.delete_collection(name)
+    memory_before = await server_memory(args.qdrant_url)
+    await client.create_collection(
+        collection_name=name,
+        vectors_config=profile.vectors_config(args.dim),
+        on_disk_payload=profile.on_disk_payload,
+        quantization_config=profile.quantization,
+        hnsw_config=profile.hnsw_config(),
+    )
+    payload = {"text": CHUNK_TEXT, "news_source": "BENCH", "tickers": ["2330"]}
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), args.batch):
+        batch = vectors[offset : offset + args.batch]
+        await client.upsert(
+            collection_name=name,
+            points=[
+                PointStruct(id=offset + i, vector=vector.tolist(), payload=payload) for i, vector in enumerate(batch)
+            ],
+        )
+    upsert_seconds = time.perf_counter() - start
+    index_seconds = await wait_indexed(client, name)
+
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        response = await client.query_points(
+            collection_name=name,
+            query=query.tolist(),
+            limit=args.top_k,
+            search_params=profile.search_params(),
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len({point.id for point in response.points} & set(expected.tolist()))
+    memory_after = await server_memory(args.qdrant_url)
+    if not args.keep:
+        await client.delete_collection(name)
+
+    payload_bytes = len(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+    measured = {}
+    if memory_before and memory_after:
+        for metric in ("memory_allocated_bytes", "memory_resident_bytes"):
+            if metric in memory_before and metric in memory_after:
+                key = metric.replace("memory_", "measured_").replace("_bytes", "_mb")
+                measured[key] = (memory_after[metric] - memory_before[metric]) / 2**20
+    return {
+        "recall_at_k": hits / (len(queries) * args.top_k),
+        "upsert_seconds": upsert_seconds,
+        "index_seconds": index_seconds,
+        **measured,
+        **estimated_ram_mb(profile, len(vectors), args.dim, payload_bytes),
+        **summarize(latencies),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    rng = np.random.default_rng(args.seed)
+    vectors = synthetic_vectors(rng, args.points, args.dim, args.clusters)
+    queries = synthetic_vectors(rng, args.queries, args.dim, args.clusters)
+    # Exact float32 top-k is the ground truth every profile is scored against
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, : args.top_k]
+
+    if args.qdrant_url == ":memory:":
+        client = AsyncQdrantClient(location=":memory:")
+    else:
+        client = AsyncQdrantClient(url=args.qdrant_url)
+    try:
+        results = {}
+        for name in args.profiles:
+            results[name] = await bench_profile(client, PROFILES[name], vectors, queries, truth, args)
+    finally:
+        await client.close()
+    return {"benchmark": "qdrant_profiles", "params": vars(args), "profiles": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--qdrant-url", default=":memory:")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(PROFILES), default=list(PROFILES))
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=512, help="Points per upsert request")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Keep the collections, e.g. to inspect memory use")
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
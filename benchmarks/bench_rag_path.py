@@ -0,0 +1,78 @@
+"""
+Critical-path latency of `ask_llm_with_rag` with stub Ollama / Qdrant / DB backends.
+Compares the concurrent request path with the old sequential one (DB lookups, then retrieval).
+
+    python -m benchmarks.bench_rag_path --requests 50 --db-latency 0.01 --search-latency 0.03
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from src.auth.schemas import TokenData
+from src.core_llm import llm_service
+from src.core_llm.schemas import RequestChatMessage
+
+from .stubs import FakeChatStore, FakeOllamaClient, FakeRetriever
+
+
+async def sequential_gather(*aws):
+    return [await aw for aw in aws]
+
+
+def patch_backends(args: argparse.Namespace) -> None:
+    store = FakeChatStore(latency=args.db_latency)
+    client = FakeOllamaClient(latency=args.llm_latency, reply_tokens=1, tokens_per_sec=1000)
+    llm_service.get_user_by_id = store.get_user_by_id
+    llm_service.create_chat_session = store.create_chat_session
+    llm_service.query_chat_session_by_session_id = store.query_chat_session_by_session_id
+    llm_service.update_chat_session = store.update_chat_session
+    llm_service.rag_retriever = FakeRetriever(embed_latency=args.embed_latency, search_latency=args.search_latency)
+    llm_service.get_client = lambda: client
+
+
+async def measure(requests: int) -> dict:
+    user = TokenData(id=1, name="bench", account="bench")
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await llm_service.ask_llm_with_rag(
+            session=None,
+            request=RequestChatMessage(content="台積電(2330)今天的新聞"),
+            current_user=user,
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "mean_ms": statistics.mean(latencies),
+        "p50_ms": statistics.median(latencies),
+        "max_ms": max(latencies),
+    }
+
+
+async def main(args: argparse.Namespace) -> dict:
+    patch_backends(args)
+    concurrent_gather = llm_service.gather_or_cancel
+    llm_service.gather_or_cancel = sequential_gather
+    sequential = await measure(args.requests)
+    llm_service.gather_or_cancel = concurrent_gather
+    concurrent = await measure(args.requests)
+    return {
+        "benchmark": "rag_request_path",
+        "params": vars(args),
+        "sequential": sequential,
+        "concurrent": concurrent,
+        "critical_path_reduction_ms": sequential["p50_ms"] - concurrent["p50_ms"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--db-latency", type=float, default=0.01, help="Seconds per DB round trip")
+    parser.add_argument("--embed-latency", type=float, default=0.03, help="Seconds per query embedding")
+    parser.add_argument("--search-latency", type=float, default=0.02, help="Seconds per Qdrant search")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds per chat call")
+    result = asyncio.run(main(parser.parse_args()))
+    print(json.dumps(result, indent=2))
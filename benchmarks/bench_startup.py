@@ -0,0 +1,59 @@
+"""
+Cold-start cost of the API process: wall time and peak RSS of `import src.app` in a fresh interpreter.
+Each run is a new process so nothing is cached in `sys.modules`.
+
+    python -m benchmarks.bench_startup --runs 10
+    CRAWLER_ENABLED=false python -m benchmarks.bench_startup
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in ("playwright", "apscheduler", "langchain", "langchain_community") if m in sys.modules]
+print(json.dumps({{
+    "import_ms": elapsed * 1000,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+    "heavy_modules_loaded": heavy,
+}}))
+"""
+
+
+def run_once(module: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(args: argparse.Namespace) -> dict:
+    runs = [run_once(args.module) for _ in range(args.runs)]
+    import_ms = [r["import_ms"] for r in runs]
+    return {
+        "benchmark": "api_startup",
+        "params": vars(args),
+        "import_ms_p50": statistics.median(import_ms),
+        "import_ms_min": min(import_ms),
+        "import_ms_max": max(import_ms),
+        "max_rss_mb": max(r["max_rss_mb"] for r in runs),
+        "modules": runs[-1]["modules"],
+        "heavy_modules_loaded": runs[-1]["heavy_modules_loaded"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--module", default="src.app")
+    print(json.dumps(main(parser.parse_args()), indent=2))
@@ -0,0 +1,131 @@
+"""
+Local NumPy store (VECTOR_BACKEND=local, exhaustive and IVF) vs. Qdrant at growing collection sizes.
+Every backend gets the same clustered synthetic vectors, recall@k is measured against exact float32
+search, the load time includes the upserts and the first query (which trains the IVF lists).
+
+    python -m benchmarks.bench_vector_backends --sizes 10000 100000 1000000 --qdrant-url http://localhost:6333
+
+Without `--qdrant-url` the Qdrant column uses the in-memory client, which is itself a NumPy
+brute force and far slower than a server past ~50k points, so it is skipped above `--memory-max`.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Union
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from src.rag.local_store import LocalVectorStore
+
+from .bench_qdrant_profiles import synthetic_vectors, wait_indexed
+from .stats import summarize
+
+BACKENDS = ("local", "local_ivf", "qdrant")
+
+
+def exact_top_k(queries: np.ndarray, vectors: np.ndarray, k: int, chunk: int = 16) -> np.ndarray:
+    """
+    Ground truth, a few queries at a time so 1M points do not need a queries x points matrix.
+    """
+    truth = []
+    for i in range(0, len(queries), chunk):
+        scores = queries[i : i + chunk] @ vectors.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        truth.append(np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1))
+    return np.concatenate(truth)
+
+
+def directory_mb(path: str) -> float:
+    return sum(os.path.getsize(os.path.join(root, file)) for root, _, files in os.walk(path) for file in files) / 2**20
+
+
+async def bench_backend(
+    client: Union[AsyncQdrantClient, LocalVectorStore],
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    args: argparse.Namespace,
+    path: str,
+) -> dict:
+    name = f"bench_backend_{len(vectors)}"
+    if await client.collection_exists(name):
+        await client.delete_collection(name)
+    await client.create_collection(name, vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE))
+    payload = {"news_source": "BENCH"}
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), args.batch):
+        await client.upsert(
+            collection_name=name,
+            points=[
+                PointStruct(id=offset + i, vector=vector.tolist(), payload=payload)
+                for i, vector in enumerate(vectors[offset : offset + args.batch])
+            ],
+        )
+    if isinstance(client, AsyncQdrantClient):
+        await wait_indexed(client, name)
+    await client.query_points(collection_name=name, query=queries[0].tolist(), limit=args.top_k)
+    load_seconds = time.perf_counter() - start
+
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        response = await client.query_points(collection_name=name, query=query.tolist(), limit=args.top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len({point.id for point in response.points} & set(expected.tolist()))
+    result = {"recall_at_k": hits / (len(queries) * args.top_k), "load_seconds": load_seconds, **summarize(latencies)}
+    if isinstance(client, LocalVectorStore):
+        result["disk_mb"] = directory_mb(path)
+    await client.delete_collection(name)
+    return result
+
+
+async def run(args: argparse.Namespace) -> dict:
+    results = {}
+    for size in args.sizes:
+        rng = np.random.default_rng(args.seed)
+        vectors = synthetic_vectors(rng, size, args.dim, args.clusters)
+        queries = synthetic_vectors(rng, args.queries, args.dim, args.clusters)
+        truth = exact_top_k(queries, vectors, args.top_k)
+        results[size] = {}
+        for backend in args.backends:
+            if backend == "qdrant" and args.qdrant_url is None and size > args.memory_max:
+                results[size][backend] = {"skipped": f"in-memory Qdrant above {args.memory_max} points"}
+                continue
+            with tempfile.TemporaryDirectory() as path:
+                if backend == "qdrant" and args.qdrant_url:
+                    client = AsyncQdrantClient(url=args.qdrant_url)
+                elif backend == "qdrant":
+                    client = AsyncQdrantClient(location=":memory:")
+                else:
+                    # About sqrt(n) lists, the usual IVF starting point
+                    lists = max(1, int(np.sqrt(size))) if backend == "local_ivf" else 0
+                    client = LocalVectorStore(path, ivf_lists=lists, ivf_probes=args.probes)
+                try:
+                    results[size][backend] = await bench_backend(client, vectors, queries, truth, args, path)
+                    if backend != "qdrant":
+                        results[size][backend]["ivf_lists"] = lists
+                finally:
+                    await client.close()
+    return {"benchmark": "vector_backends", "params": vars(args), "sizes": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10000, 100000])
+    parser.add_argument("--qdrant-url", default=None, help="Default: in-memory Qdrant, up to --memory-max points")
+    parser.add_argument("--memory-max", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--probes", type=int, default=8, help="IVF lists scanned per query")
+    parser.add_argument("--batch", type=int, default=1000, help="Points per upsert request")
+    parser.add_argument("--seed", type=int, default=42)
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
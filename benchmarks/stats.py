@@ -0,0 +1,29 @@
+"""
+Latency summaries shared by the benchmarks.
+"""
+
+import statistics
+from typing import Dict, List
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile, `q` in [0, 1].
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies_ms: List[float]) -> Dict[str, float]:
+    if not latencies_ms:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    return {
+        "mean_ms": statistics.mean(latencies_ms),
+        "p50_ms": percentile(latencies_ms, 0.50),
+        "p95_ms": percentile(latencies_ms, 0.95),
+        "p99_ms": percentile(latencies_ms, 0.99),
+        "max_ms": max(latencies_ms),
+    }
@@ -0,0 +1,138 @@
+"""
+Stand-in backends for the benchmarks, so they run without Ollama, Qdrant or Postgres.
+Every stub sleeps for a configurable latency to model the network hop it replaces.
+"""
+
+import asyncio
+import hashlib
+import uuid
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import List, Optional
+
+from ollama import ChatResponse, EmbeddingsResponse, EmbedResponse, GenerateResponse, Message
+
+
+def fake_embedding(text: str, dim: int) -> List[float]:
+    """
+    Deterministic pseudo-embedding derived from the text hash.
+    """
+    digest = hashlib.sha256(text.encode('utf-8')).digest()
+    return [digest[i % len(digest)] / 255.0 for i in range(dim)]
+
+
+@dataclass
+class FakeOllamaClient:
+    """
+    Mimics the subset of `ollama.AsyncClient` used by the app.
+    Chat latency is `latency + reply_tokens / tokens_per_sec`.
+    An embedding call takes `embed_latency + embed_item_latency * texts`, and at most
+    `embed_parallel` embedding calls run at once (0 = unlimited), like OLLAMA_NUM_PARALLEL.
+    """
+
+    latency: float = 0.05
+    tokens_per_sec: float = 50.0
+    reply_tokens: int = 20
+    embed_latency: float = 0.02
+    embed_item_latency: float = 0.0
+    embed_parallel: int = 0
+    embedding_dim: int = 1536
+    calls: dict = field(default_factory=dict)
+    _embed_slots: Optional[asyncio.Semaphore] = field(default=None, init=False, repr=False)
+
+    def __count(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    async def list(self):
+        self.__count("list")
+        return {"models": []}
+
+    async def pull(self, model: str, **kwargs):
+        self.__count("pull")
+
+    async def chat(self, model: str, messages: list, **kwargs) -> ChatResponse:
+        self.__count("chat")
+        await asyncio.sleep(self.latency + self.reply_tokens / self.tokens_per_sec)
+        return ChatResponse(
+            model=model,
+            done=True,
+            eval_count=self.reply_tokens,
+            prompt_eval_count=sum(len(m.get("content", "")) for m in messages),
+            message=Message(role="assistant", content="好" * self.reply_tokens),
+        )
+
+    async def generate(self, model: str, prompt: str = "", **kwargs) -> GenerateResponse:
+        self.__count("generate")
+        await asyncio.sleep(self.latency)
+        return GenerateResponse(model=model, done=True, response="5")
+
+    async def __embed_delay(self, texts: int) -> None:
+        if self.embed_parallel and self._embed_slots is None:
+            self._embed_slots = asyncio.Semaphore(self.embed_parallel)
+        if self._embed_slots is None:
+            await asyncio.sleep(self.embed_latency + self.embed_item_latency * texts)
+            return
+        async with self._embed_slots:
+            await asyncio.sleep(self.embed_latency + self.embed_item_latency * texts)
+
+    async def embeddings(self, model: str, prompt: str, **kwargs) -> EmbeddingsResponse:
+        self.__count("embeddings")
+        await self.__embed_delay(1)
+        return EmbeddingsResponse(embedding=fake_embedding(prompt, self.embedding_dim))
+
+    async def embed(self, model: str, input, **kwargs) -> EmbedResponse:
+        self.__count("embed")
+        texts = [input] if isinstance(input, str) else list(input)
+        await self.__embed_delay(len(texts))
+        return EmbedResponse(model=model, embeddings=[fake_embedding(t, self.embedding_dim) for t in texts])
+
+
+@dataclass
+class FakeRetriever:
+    """
+    Replaces `Retriever`, one embed round trip plus one vector search round trip.
+    """
+
+    embed_latency: float = 0.02
+    search_latency: float = 0.02
+
+    async def search(self, query: str, top_k: int = 5, filters=None):
+        from src.rag.retriever import SearchResult
+
+        await asyncio.sleep(self.embed_latency)
+        await asyncio.sleep(self.search_latency)
+        return [
+            SearchResult(
+                id=str(i),
+                score=1.0 - i / 100,
+                payload={"source": f"doc-{i}", "chunk_id": 0, "text": f"{query} 相關新聞 {i}"},
+                dense_score=1.0 - i / 100,
+            )
+            for i in range(top_k)
+        ]
+
+
+@dataclass
+class FakeChatStore:
+    """
+    Replaces the DB helpers used by the chat service, each call is one DB round trip.
+    """
+
+    latency: float = 0.005
+
+    async def get_user_by_id(self, session, user_id):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(id=user_id, name="bench", account="bench")
+
+    async def create_chat_session(self, session, user_id):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(id=1, session_id=str(uuid.uuid4()), user_id=user_id, messages=[])
+
+    async def query_chat_session_by_session_id(self, session, user_id, chat_session_id):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(id=1, session_id=chat_session_id, user_id=user_id, messages=[])
+
+    async def update_chat_session(self, session, chat_session, new_messages):
+        await asyncio.sleep(self.latency)
+        chat_session.messages.extend(new_messages)
+        return chat_session
@@ -1,11 +1,26 @@
+import argparse
+
 import uvicorn
 
 if __name__ == "__main__":
-    uvicorn.run(
-        app="src.app:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        reload_dirs=["src"],
-        log_level="info",
+    parser = argparse.ArgumentParser(description="Intra Chat API server")
+    parser.add_argument(
+        "--import-report",
+        action="store_true",
+        help="Print the import-time report of the API process and exit",
     )
+    args = parser.parse_args()
+
+    if args.import_report:
+        from src.common.profiling import format_import_report, import_time_report
+
+        print(format_import_report(import_time_report("src.app")))
+    else:
+        uvicorn.run(
+            app="src.app:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,
+            reload_dirs=["src"],
+            log_level="info",
+        )
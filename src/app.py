@@ -1,32 +1,59 @@
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from .auth import router as auth_router
+from .common.metrics import registry
+from .common.middleware import RequestIdMiddleware, TracingMiddleware
+from .common.readiness import DATABASE, EMBEDDER, LLM, QDRANT, startup
+from .config import configuration
 from .core_llm import router as llm_router
 from .core_llm.llm_service import pull_model, warmup_model
-from .crawler import router as crawler_router
-from .db.models import Base
+from .db.migrations import check_schema, upgrade
 from .db.session import engine
+from .quota import router as quota_router
+from .quota.service import start_usage_sync, stop_usage_sync
+from .rag.embedder import get_embedding_service
 from .rag.qdrant import ensure_collection, get_qdrant_client, qdrant_status_check
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """
-    Lifespan event handler for FastAPI to pull models at startup.
-    """
-
-    # Pull the models when the application starts
+async def start_llm():
     await pull_model()
     await warmup_model()
+
+
+async def start_qdrant():
     await ensure_collection()
     await qdrant_status_check()
-    async with engine.begin() as conn:
-        # Ensure the database is created
-        await conn.run_sync(Base.metadata.create_all)
+
+
+async def start_database():
+    # No DDL at startup, migrations are applied with `python -m src.db.migrations upgrade`
+    if configuration.DB_AUTO_MIGRATE:
+        await upgrade(engine)
+    await check_schema(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Lifespan event handler for FastAPI.
+    Init steps run in the background so liveness is served right away, endpoints that
+    need a component answer 503 until it is ready (see `/readyz`).
+    """
+    startup.add(LLM, start_llm)
+    # Initialize the shared embedder once, the retriever and ingestor reuse it
+    startup.add(EMBEDDER, get_embedding_service().start)
+    startup.add(QDRANT, start_qdrant, depends_on=(EMBEDDER,))
+    startup.add(DATABASE, start_database)
+    startup.start()
+    # Per-user usage is counted in memory and synced with the database in the background
+    start_usage_sync()
     yield
     # Cleanup can be done here if needed
+    await stop_usage_sync()
+    await startup.stop()
     qdrant = get_qdrant_client()
     if qdrant:
         await qdrant.close()
@@ -38,11 +65,44 @@ app = FastAPI(
     root_path='/api',
     lifespan=lifespan,
 )
+# The last added middleware runs first, so the request id is set before the trace starts
+app.add_middleware(TracingMiddleware)
+app.add_middleware(RequestIdMiddleware)
 app.include_router(llm_router)
 app.include_router(auth_router)
-app.include_router(crawler_router)
+app.include_router(quota_router)
+if configuration.CRAWLER_ENABLED:
+    # The crawler (and its scheduler) is only imported when enabled
+    from .crawler import router as crawler_router
+
+    app.include_router(crawler_router)
 
 
 @app.get("/")
 def read_root():
     return {"message": "Hello, uv + FastAPI!"}
+
+
+@app.get("/healthz")
+def healthz():
+    """
+    Liveness, the process is up and serving.
+    """
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    """
+    Readiness with the status of every startup component, 503 until all of them are ready.
+    """
+    status = startup.status()
+    return JSONResponse(content=status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    In-process metrics in the Prometheus text format.
+    """
+    return registry.render()
@@ -1,8 +1,14 @@
-from fastapi import Depends
+from fastapi import Depends, Request
 
 from .router import oauth2_scheme
+from .schemas import TokenData
 from .service import decode_access_token
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    return await decode_access_token(token=token)  # type: ignore[return-value]
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)) -> TokenData:
+    # Memoized on the request, so router-level and endpoint-level uses decode the token once
+    current_user = getattr(request.state, "current_user", None)
+    if current_user is None:
+        current_user = await decode_access_token(token=token)
+        request.state.current_user = current_user
+    return current_user  # type: ignore[return-value]
@@ -0,0 +1,3 @@
+from ..common import get_logger
+
+auth_logger = get_logger("src.auth")
@@ -1,14 +1,16 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..common.readiness import DATABASE, require_ready
 from ..common.schemas import MessageResponse
 from ..db.session import get_db_session
 from .schemas import RequestCreateUser, Token, TokenData
 from .service import (
     auth_user,
+    check_login_rate,
     create_access_token,
     create_user,
     decode_access_token,
@@ -29,6 +31,7 @@ router = APIRouter(
 @router.post(
     "/register",
     response_model=MessageResponse,
+    dependencies=[Depends(require_ready(DATABASE))],
 )
 async def user_register(
     user_data: RequestCreateUser,
@@ -49,12 +52,18 @@ async def user_register(
 @router.post(
     "/login",
     response_model=Token,
+    dependencies=[Depends(require_ready(DATABASE))],
 )
 async def login(
+    request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     session: Annotated[AsyncSession, Depends(get_db_session)],
 ) -> Token:
     try:
+        check_login_rate(
+            account=form_data.username,
+            client_ip=request.client.host if request.client else None,
+        )
         user = await auth_user(session=session, account=form_data.username, password=form_data.password)
         access_token = await create_access_token(
             data={
@@ -1,20 +1,53 @@
+import time
 from datetime import UTC, datetime, timedelta
 from typing import Optional
 
 from fastapi import HTTPException, status
 from jose import JWTError, jwt
-from sqlalchemy import insert, select
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..common.ratelimit import SlidingWindowLimiter
 from ..config import configuration
 from ..db.models import User
+from .logger import auth_logger
 from .schemas import RequestCreateUser, TokenData
-from .utils import get_hashed_password, verify_password
+from .token_cache import TokenCache
+from .utils import get_hashed_password, verify_and_update_password
 
 SECRET_KEY = configuration.SECRET_KEY
 ALGORITHM = configuration.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = configuration.ACCESS_TOKEN_EXPIRE_MINUTES
 
+token_cache = TokenCache(maxsize=configuration.AUTH_TOKEN_CACHE_SIZE)
+
+login_account_limiter = SlidingWindowLimiter(
+    limit=configuration.LOGIN_RATE_PER_ACCOUNT,
+    window=configuration.LOGIN_RATE_WINDOW_SECONDS,
+)
+login_ip_limiter = SlidingWindowLimiter(
+    limit=configuration.LOGIN_RATE_PER_IP,
+    window=configuration.LOGIN_RATE_WINDOW_SECONDS,
+)
+
+
+def __load_jwt_backend():
+    """
+    Returns the (encode, decode, error) functions of the configured JWT backend.
+    PyJWT is optional, python-jose is used when it is not installed.
+    """
+    if configuration.JWT_BACKEND == "pyjwt":
+        try:
+            import jwt as pyjwt
+
+            return pyjwt.encode, pyjwt.decode, pyjwt.PyJWTError
+        except ImportError:
+            auth_logger.warning("JWT_BACKEND is 'pyjwt' but PyJWT is not installed, using python-jose.")
+    return jwt.encode, jwt.decode, JWTError
+
+
+jwt_encode, jwt_decode, JWTDecodeError = __load_jwt_backend()
+
 
 async def create_access_token(
     data: dict,
@@ -26,15 +59,18 @@ async def create_access_token(
     else:
         expire = datetime.now(tz=UTC) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    jwt_token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    jwt_token = jwt_encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return jwt_token
 
 
 async def decode_access_token(
     token: str,
 ) -> Optional[TokenData]:
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt_decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: int = payload.get("id")
         name: str = payload.get("name")
         account: str = payload.get("account")
@@ -44,8 +80,14 @@ async def decode_access_token(
                 detail="Invalid authentication credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return TokenData(id=user_id, name=name, account=account)
-    except JWTError:
+        token_data = TokenData(id=user_id, name=name, account=account)
+        # Tokens without `exp` never expire on their own, keep them for one token lifetime at most
+        expires_at = payload.get("exp") or time.time() + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        token_cache.put(token, token_data, expires_at=float(expires_at))
+        return token_data
+    except HTTPException:
+        raise
+    except JWTDecodeError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
@@ -114,6 +156,40 @@ async def get_user_by_id(
     return User(**user_data) if user_data else None
 
 
+def check_login_rate(
+    account: str,
+    client_ip: Optional[str],
+) -> None:
+    """
+    Per-account and per-IP login rate limit, checked before any bcrypt work is done.
+    Raises HTTPException 429 with Retry-After when a limit is exceeded.
+    The account window is cleared by a successful login in `auth_user`, so it only holds failed attempts.
+    """
+    retry_after = login_account_limiter.hit(account)
+    if retry_after is None and client_ip:
+        retry_after = login_ip_limiter.hit(client_ip)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please retry later.",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+        )
+
+
+async def update_user_password(
+    session: AsyncSession,
+    user_id: int,
+    hashed_password: str,
+) -> None:
+    try:
+        query = update(User).where(User.id == user_id).values(password=hashed_password)
+        await session.execute(query)
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        raise e
+
+
 async def auth_user(
     session: AsyncSession,
     account: str,
@@ -126,10 +202,20 @@ async def auth_user(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
-    if not await verify_password(plain_password=password, hashed_password=user_in_db.password):
+    is_verified, new_hash = await verify_and_update_password(
+        plain_password=password,
+        hashed_password=user_in_db.password,
+    )
+    if not is_verified:
         # Password verification failed
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Incorrect password",
         )
+    # A user logging in several times (e.g. several devices) must not lock their own account
+    login_account_limiter.reset(account)
+    if new_hash is not None:
+        # The stored hash uses an outdated bcrypt cost, replace it while the plain password is known
+        await update_user_password(session, user_in_db.id, new_hash)
+        auth_logger.info(f"Rehashed password of user {user_in_db.id} with the current bcrypt cost.")
     return user_in_db
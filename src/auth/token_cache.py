@@ -0,0 +1,67 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .schemas import TokenData
+
+
+class TokenCache:
+    """
+    Bounded cache of verified access tokens, keyed by the token's SHA-256 so raw tokens are never kept.
+    An entry is only served until the token's own `exp`, and when the cache is full
+    expired entries are dropped before the least recently used one.
+    """
+
+    def __init__(self, maxsize: int = 10_000, sweep_interval: float = 60.0):
+        self.maxsize = maxsize
+        self.sweep_interval = sweep_interval
+        self._entries: OrderedDict[bytes, Tuple[TokenData, float]] = OrderedDict()
+        self._last_sweep = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def __key(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token: str) -> Optional[TokenData]:
+        key = self.__key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        token_data, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return token_data
+
+    def put(self, token: str, token_data: TokenData, expires_at: float) -> None:
+        if self.maxsize <= 0:
+            return
+        key = self.__key(token)
+        self._entries[key] = (token_data, expires_at)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self.__evict()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __evict(self) -> None:
+        now = time.time()
+        # A full sweep is O(n), so it runs at most once per interval, LRU eviction covers the rest
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            expired = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+            for key in expired:
+                del self._entries[key]
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
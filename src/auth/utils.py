@@ -1,9 +1,41 @@
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from ..config import configuration
+
+BCRYPT_ROUNDS = configuration.BCRYPT_ROUNDS
+
+# min/max pinned to the configured cost, so hashes made with any other cost "need update"
+# and are transparently rehashed on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+# One shared, size-limited pool for bcrypt, which holds a CPU core for ~100-300 ms per call.
+# At most AUTH_HASH_WORKERS hashes run at once and AUTH_HASH_QUEUE more may wait,
+# beyond that the request is rejected instead of piling up threads.
+_hash_pool = ThreadPoolExecutor(max_workers=configuration.AUTH_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = asyncio.Semaphore(configuration.AUTH_HASH_WORKERS + configuration.AUTH_HASH_QUEUE)
+
+
+async def __run_in_hash_pool(func, *args):
+    if _hash_slots.locked():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password operations in progress, please retry.",
+            headers={"Retry-After": "1"},
+        )
+    async with _hash_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_pool, func, *args)
 
 
 def __hash_pwd(plain_password: str) -> str:
@@ -11,10 +43,7 @@ def __hash_pwd(plain_password: str) -> str:
 
 
 async def get_hashed_password(plain_password: str) -> str:
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor() as pool:
-        hashed_password = await loop.run_in_executor(pool, __hash_pwd, plain_password)
-    return hashed_password
+    return await __run_in_hash_pool(__hash_pwd, plain_password)
 
 
 def __verify_pwd(plain_password: str, hashed_password: str) -> bool:
@@ -22,7 +51,16 @@ def __verify_pwd(plain_password: str, hashed_password: str) -> bool:
 
 
 async def verify_password(plain_password: str, hashed_password: str) -> bool:
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor() as pool:
-        is_verified = await loop.run_in_executor(pool, __verify_pwd, plain_password, hashed_password)
-    return is_verified
+    return await __run_in_hash_pool(__verify_pwd, plain_password, hashed_password)
+
+
+def __verify_and_update_pwd(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify the password, returns (is_verified, new_hash).
+    `new_hash` is set when the stored hash uses an outdated cost factor.
+    """
+    return await __run_in_hash_pool(__verify_and_update_pwd, plain_password, hashed_password)
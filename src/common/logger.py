@@ -1,14 +1,128 @@
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
+import random
 import warnings
-from logging.handlers import RotatingFileHandler
-from typing import Literal, Optional
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List, Literal, Optional
 
 from coloredlogs import ColoredFormatter
 
-TO_FILE = os.environ.get("TO_FILE", False)
-if TO_FILE:
-    TO_FILE = TO_FILE.lower() in ("true", "1")
+
+def __env_flag(name: str) -> bool:
+    return os.environ.get(name, "").lower() in ("true", "1")
+
+
+TO_FILE = __env_flag("TO_FILE")
+# "color" for humans, "json" for log shippers in production
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "color").lower()
+# Hand records to a background thread instead of formatting and writing on the caller's thread
+LOG_ASYNC = __env_flag("LOG_ASYNC")
+# Fraction of DEBUG records kept, INFO and above are never sampled
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+
+# Set per request by the request-id middleware, attached to every record logged while handling it
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, message, request_id and the traceback if any.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Formatted before the record was queued, see _RecordQueueHandler
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _RecordQueueHandler(QueueHandler):
+    """
+    The stdlib QueueHandler formats the traceback into the message and drops it. This one merges only the
+    arguments and keeps the traceback as text, so the formatters on the listener thread still see it apart
+    (the `exc_info` field of JSON lines). The traceback object itself is not queued, it keeps frames alive.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_exception_formatter = logging.Formatter()
+
+
+class _DispatchHandler(logging.Handler):
+    """
+    Sink of the shared queue listener, routes each record to the handlers of the logger that emitted it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.routes: Dict[str, List[logging.Handler]] = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_dispatcher = _DispatchHandler()
+_listener: Optional[QueueListener] = None
+
+
+def __start_listener() -> None:
+    global _listener
+    if _listener is None:
+        _listener = QueueListener(_log_queue, _dispatcher)
+        _listener.start()
+        # Flush what is still queued on interpreter exit
+        atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
 def get_logger(
@@ -18,6 +132,8 @@ def get_logger(
     to_file: bool = TO_FILE,
     log_dir: str = "./logs",
     file_name: Optional[str] = None,
+    log_format: Literal["color", "json"] = LOG_FORMAT,
+    use_queue: bool = LOG_ASYNC,
 ) -> logging.Logger:
     logger = logging.getLogger(name)
     if logger.hasHandlers():
@@ -26,10 +142,11 @@ def get_logger(
 
     log_lv = getattr(logging, level.upper(), logging.INFO)
     logger.setLevel(log_lv)
-    fmt = ColoredFormatter(format)
+    handlers = []
+    fmt = JsonFormatter() if log_format == "json" else ColoredFormatter(format)
     std_out = logging.StreamHandler()
     std_out.setFormatter(fmt)
-    logger.addHandler(std_out)
+    handlers.append(std_out)
     if to_file:
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
@@ -40,8 +157,21 @@ def get_logger(
             file = file_name + ".log"
         file_path = os.path.join(log_dir, file)
         file_handler = RotatingFileHandler(file_path, maxBytes=5 * 1024 * 1024, backupCount=3)
-        file_handler.setFormatter(logging.Formatter(format))
-        logger.addHandler(file_handler)
+        file_handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(format))
+        handlers.append(file_handler)
+
+    if use_queue:
+        # The caller only enqueues, formatting, writing and rotation happen on the listener thread
+        _dispatcher.routes[name] = handlers
+        handlers = [_RecordQueueHandler(_log_queue)]
+        __start_listener()
+    if LOG_DEBUG_SAMPLE_RATE < 1.0:
+        # On the logger, so a record is kept or dropped once for all its handlers
+        logger.addFilter(DebugSamplingFilter(LOG_DEBUG_SAMPLE_RATE))
+    for handler in handlers:
+        # Filters run on the caller's side, where the request id context and the level are known
+        handler.addFilter(RequestIdFilter())
+        logger.addHandler(handler)
     logger.propagate = False
     return logger
 
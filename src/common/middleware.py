@@ -0,0 +1,84 @@
+import re
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .logger import request_id_var
+from .tracing import tracer
+
+REQUEST_ID_HEADER = b"x-request-id"
+TRACEPARENT_HEADER = b"traceparent"
+# Accept a caller-provided id only if it is short and plain, it ends up in every log line
+__VALID_REQUEST_ID = re.compile(rb"^[A-Za-z0-9._-]{1,64}$")
+
+
+def _incoming_request_id(scope: Scope) -> str:
+    for key, value in scope.get("headers", ()):
+        if key == REQUEST_ID_HEADER and __VALID_REQUEST_ID.match(value):
+            return value.decode("ascii")
+    return uuid.uuid4().hex
+
+
+class RequestIdMiddleware:
+    """
+    Pure ASGI middleware (no response buffering, so streaming is unaffected): takes X-Request-ID
+    from the request or generates one, exposes it to the logs and echoes it in the response.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = _incoming_request_id(scope)
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, request_id.encode("ascii")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+
+
+class TracingMiddleware:
+    """
+    Opens the root span of every sampled HTTP request, continuing an upstream `traceparent`.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        traceparent = None
+        for key, value in scope.get("headers", ()):
+            if key == TRACEPARENT_HEADER:
+                traceparent = value.decode("latin-1")
+                break
+        path = scope.get("path", "")
+        with tracer.start_trace(
+            f"{scope['method']} {path}",
+            traceparent=traceparent,
+            **{"http.method": scope["method"], "http.target": path},
+        ) as span:
+            if span is None:
+                await self.app(scope, receive, send)
+                return
+            span.set_attribute("request_id", request_id_var.get() or "")
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
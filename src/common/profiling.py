@@ -0,0 +1,64 @@
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def import_time_report(module: str = "src.app") -> List[ImportTiming]:
+    """
+    Import `module` in a fresh interpreter with `-X importtime` and parse the per-module timings.
+    A fresh process is needed because modules already imported by the caller would not be timed.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    timings: List[ImportTiming] = []
+    for line in result.stderr.splitlines():
+        # import time:       123 |       4567 |   package.module
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        timings.append(
+            ImportTiming(
+                module=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=depth,
+            )
+        )
+    return timings
+
+
+def format_import_report(timings: List[ImportTiming], top: int = 25) -> str:
+    """
+    Import time summed per top-level package (fastapi, sqlalchemy, qdrant_client, ...), then the slowest single modules.
+    """
+    total_us = sum(t.cumulative_us for t in timings if t.depth == 0)
+    per_package: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    for t in timings:
+        package = per_package[t.module.split(".")[0]]
+        package[0] += t.self_us
+        package[1] += 1
+    lines = [f"Total import time: {total_us / 1000:.1f} ms ({len(timings)} modules)", ""]
+    lines.append(f"{'self ms':>14} {'modules':>8}  package")
+    for name, (self_us, count) in sorted(per_package.items(), key=lambda item: item[1][0], reverse=True)[:top]:
+        lines.append(f"{self_us / 1000:>14.1f} {count:>8}  {name}")
+    lines.append("")
+    lines.append(f"{'self ms':>14}  slowest modules")
+    for t in sorted(timings, key=lambda t: t.self_us, reverse=True)[:top]:
+        lines.append(f"{t.self_us / 1000:>14.1f}  {t.module}")
+    return "\n".join(lines)
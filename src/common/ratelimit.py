@@ -0,0 +1,81 @@
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+
+class SlidingWindowLimiter:
+    """
+    In-memory sliding-window rate limiter: at most `limit` hits per key within `window` seconds.
+    State is per process, so with N workers the effective limit is up to N times higher.
+    """
+
+    def __init__(self, limit: int, window: float, max_keys: int = 100_000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._hits: Dict[str, Deque[float]] = {}
+
+    def hit(self, key: str) -> Optional[float]:
+        """
+        Record a hit for `key`. Returns None if allowed, otherwise the seconds until a retry can succeed.
+        """
+        now = time.monotonic()
+        hits = self._hits.get(key)
+        if hits is None:
+            if len(self._hits) >= self.max_keys:
+                self.__prune(now)
+            hits = self._hits[key] = deque()
+        while hits and hits[0] <= now - self.window:
+            hits.popleft()
+        if len(hits) >= self.limit:
+            return hits[0] + self.window - now
+        hits.append(now)
+        return None
+
+    def reset(self, key: str) -> None:
+        self._hits.pop(key, None)
+
+    def __prune(self, now: float) -> None:
+        stale = [key for key, hits in self._hits.items() if not hits or hits[-1] <= now - self.window]
+        for key in stale:
+            del self._hits[key]
+
+
+class TokenBucketLimiter:
+    """
+    In-memory token bucket per key: up to `burst` hits at once, refilled at `rate` hits per second.
+    Like `SlidingWindowLimiter`, state is per process.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, last refill time)
+
+    def hit(self, key: str) -> Optional[float]:
+        """
+        Take one token for `key`. Returns None if allowed, otherwise the seconds until a token is available.
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self.__prune(now)
+            tokens = float(self.burst)
+        else:
+            tokens = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+        self._buckets[key] = (tokens - 1, now)
+        return None
+
+    def reset(self, key: str) -> None:
+        self._buckets.pop(key, None)
+
+    def __prune(self, now: float) -> None:
+        # A bucket that has refilled completely carries no state
+        full = [key for key, (tokens, at) in self._buckets.items() if tokens + (now - at) * self.rate >= self.burst]
+        for key in full:
+            del self._buckets[key]
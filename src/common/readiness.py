@@ -0,0 +1,141 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from .logger import get_logger
+
+logger = get_logger("src.startup")
+
+StartupStep = Callable[[], Awaitable[None]]
+
+# Startup components registered in `src/app.py`
+DATABASE = "database"
+LLM = "llm"
+EMBEDDER = "embedder"
+QDRANT = "qdrant"
+
+
+class ComponentState(str, Enum):
+    PENDING = "pending"
+    STARTING = "starting"
+    READY = "ready"
+    FAILED = "failed"  # Last attempt failed, it is retried with backoff
+
+
+@dataclass
+class ComponentStatus:
+    name: str
+    depends_on: Tuple[str, ...] = ()
+    state: ComponentState = ComponentState.PENDING
+    error: Optional[str] = None
+    attempts: int = 0
+    ready_after: Optional[float] = None  # Seconds since the orchestrator started
+
+    def to_dict(self) -> dict:
+        return {
+            "state": self.state.value,
+            "error": self.error,
+            "attempts": self.attempts,
+            "ready_after": self.ready_after,
+            "depends_on": list(self.depends_on),
+        }
+
+
+class StartupOrchestrator:
+    """
+    Runs the application init steps in the background so the API can serve liveness right away.
+    Independent steps run concurrently, a step waits only for the components it depends on,
+    and a failing step is retried with exponential backoff until it succeeds.
+    """
+
+    def __init__(self, *, max_backoff: float = 30.0):
+        self.max_backoff = max_backoff
+        self.components: Dict[str, ComponentStatus] = {}
+        self._steps: Dict[str, StartupStep] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._started_at = 0.0
+
+    def add(self, name: str, step: StartupStep, *, depends_on: Tuple[str, ...] = ()) -> None:
+        self.components[name] = ComponentStatus(name=name, depends_on=depends_on)
+        self._steps[name] = step
+
+    def start(self) -> None:
+        self._started_at = time.perf_counter()
+        self._events = {name: asyncio.Event() for name in self.components}
+        self._tasks = [asyncio.create_task(self.__run(name), name=f"startup:{name}") for name in self.components]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def wait(self, *names: str) -> None:
+        """
+        Wait until the given components (all of them by default) are ready.
+        """
+        await asyncio.gather(*(self._events[name].wait() for name in names or self.components if name in self._events))
+
+    def is_ready(self, *names: str) -> bool:
+        """
+        True if the given components (all of them by default) are ready, unknown names count as ready.
+        """
+        return all(
+            self.components[name].state == ComponentState.READY
+            for name in names or self.components
+            if name in self.components
+        )
+
+    def status(self) -> dict:
+        return {
+            "ready": self.is_ready(),
+            "components": {name: component.to_dict() for name, component in self.components.items()},
+        }
+
+    async def __run(self, name: str) -> None:
+        component = self.components[name]
+        await asyncio.gather(*(self._events[dep].wait() for dep in component.depends_on))
+        backoff = 1.0
+        while True:
+            component.state = ComponentState.STARTING
+            component.attempts += 1
+            try:
+                await self._steps[name]()
+            except Exception as e:
+                component.state = ComponentState.FAILED
+                component.error = str(e)
+                logger.error(f"Startup step '{name}' failed (attempt {component.attempts}), retry in {backoff:.0f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            component.state = ComponentState.READY
+            component.error = None
+            component.ready_after = round(time.perf_counter() - self._started_at, 3)
+            self._events[name].set()
+            logger.info(f"Startup step '{name}' ready after {component.ready_after}s.")
+            return
+
+
+startup = StartupOrchestrator()
+
+
+def require_ready(*components: str) -> Callable[[], None]:
+    """
+    Dependency that answers 503 while one of the given startup components is not ready.
+    """
+
+    def dependency() -> None:
+        not_ready = [name for name in components if not startup.is_ready(name)]
+        if not_ready:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Service is starting, not ready yet: {', '.join(not_ready)}",
+                headers={"Retry-After": "5"},
+            )
+
+    return dependency
@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import json
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Set, TypeVar
+
+from .metrics import registry
+
+T = TypeVar("T")
+
+singleflight_calls = registry.counter(
+    "singleflight_calls_total",
+    "Calls through a single-flight group, role=leader made the upstream call, role=shared reused it, "
+    "role=cancelled stopped an upstream call every caller had given up on.",
+    labels=("group", "role"),
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def request_key(model: str, payload: Any) -> str:
+    """
+    Stable key of an upstream request: the model plus the payload (prompt text or chat messages)
+    with whitespace runs collapsed, hashed so keys stay small.
+    """
+
+    def normalize(value: Any) -> Any:
+        if isinstance(value, str):
+            return _WHITESPACE.sub(" ", value).strip()
+        if isinstance(value, dict):
+            return {key: normalize(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(item) for item in value]
+        return value
+
+    encoded = json.dumps([model, normalize(payload)], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class _SharedStream:
+    """
+    Fan-out of one upstream stream: chunks are buffered so late joiners replay them first.
+    """
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Condition()
+        self.readers = 0
+        self.pump: Optional[asyncio.Task] = None
+
+
+class SingleFlight:
+    """
+    Collapses identical concurrent calls into one: the first caller for a key (the leader) starts
+    the upstream call, callers arriving while it is in flight await the same result.
+    The key is forgotten as soon as the call finishes, so nothing is cached.
+    Results are shared between callers and must not be mutated.
+    A caller being cancelled does not affect the others, the upstream call is cancelled with the last one.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self._streams: Dict[Hashable, _SharedStream] = {}
+        self._pumps: Set[asyncio.Task] = set()
+
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._streams)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            singleflight_calls.inc(1, self.name, "leader")
+            # A task, so one caller being cancelled does not cancel the call the others wait for
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self.__forget(self._calls, key, done))
+        else:
+            singleflight_calls.inc(1, self.name, "shared")
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Every caller was cancelled, nobody reads the result: stop the upstream call
+                    # and let the next caller for the key start a new one
+                    singleflight_calls.inc(1, self.name, "cancelled")
+                    self.__forget(self._calls, key, task)
+                    task.cancel()
+
+    async def stream(self, key: Hashable, factory: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        Single-flight for streamed output: every caller receives the full chunk sequence
+        of one upstream stream.
+        """
+        shared = self._streams.get(key)
+        if shared is None:
+            singleflight_calls.inc(1, self.name, "leader")
+            shared = self._streams[key] = _SharedStream()
+            shared.pump = asyncio.create_task(self.__pump(key, shared, factory))
+            self._pumps.add(shared.pump)
+            shared.pump.add_done_callback(self._pumps.discard)
+        else:
+            singleflight_calls.inc(1, self.name, "shared")
+        shared.readers += 1
+        index = 0
+        try:
+            while True:
+                async with shared.changed:
+                    await shared.changed.wait_for(lambda: index < len(shared.chunks) or shared.done)
+                    chunks = shared.chunks[index:]
+                    finished = shared.done
+                for chunk in chunks:
+                    yield chunk
+                index += len(chunks)
+                if finished and index >= len(shared.chunks):
+                    if shared.error is not None:
+                        raise shared.error
+                    return
+        finally:
+            # Also reached when the reader is cancelled or stops iterating early
+            shared.readers -= 1
+            if not shared.readers and not shared.done:
+                singleflight_calls.inc(1, self.name, "cancelled")
+                self.__forget(self._streams, key, shared)
+                shared.pump.cancel()
+
+    async def __pump(self, key: Hashable, shared: _SharedStream, factory: Callable[[], AsyncIterator[T]]) -> None:
+        try:
+            async for chunk in factory():
+                async with shared.changed:
+                    shared.chunks.append(chunk)
+                    shared.changed.notify_all()
+        except Exception as e:
+            shared.error = e
+        finally:
+            if self._streams.get(key) is shared:
+                del self._streams[key]
+            async with shared.changed:
+                shared.done = True
+                shared.changed.notify_all()
+
+    @staticmethod
+    def __forget(calls: Dict[Hashable, Any], key: Hashable, value: Any) -> None:
+        if calls.get(key) is value:
+            del calls[key]
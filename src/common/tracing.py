@@ -0,0 +1,380 @@
+import atexit
+import json
+import queue
+import random
+import secrets
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import configuration
+from .logger import get_logger
+
+trace_logger = get_logger("src.tracing")
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    kind: int = SPAN_KIND_INTERNAL
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    spans: List[Span] = field(default_factory=list)
+
+    @property
+    def root(self) -> Span:
+        return self.spans[0]
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+class _NoopSpanContext:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+
+_NOOP = _NoopSpanContext()
+
+
+class _SpanContext:
+    def __init__(self, tracer: "Tracer", trace: Trace, span: Span, is_root: bool = False):
+        self.tracer = tracer
+        self.trace = trace
+        self.span = span
+        self.is_root = is_root
+        self._tokens = None
+
+    def __enter__(self) -> Span:
+        self._tokens = (_current_trace.set(self.trace), _current_span.set(self.span))
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.span.end_ns = time.time_ns()
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        trace_token, span_token = self._tokens
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        if self.is_root:
+            self.tracer.finish(self.trace)
+        return False
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """
+    W3C traceparent `00-<trace id>-<parent span id>-<flags>`, returns (trace_id, parent_id, sampled).
+    """
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+class Tracer:
+    """
+    Minimal request tracer: the root span is sampled once per request, nested spans only cost a
+    context lookup when the request is not sampled. Finished traces go to the exporter.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, exporter: Optional["SpanExporter"] = None, slow_ms: float = 0):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self.slow_ms = slow_ms
+
+    @property
+    def enabled(self) -> bool:
+        """
+        True if traces go anywhere (the exporter or the slow request log). With a sample rate of 0,
+        requests that carry a sampled upstream traceparent are still traced.
+        """
+        return self.exporter is not None or self.slow_ms > 0
+
+    def start_trace(self, name: str, traceparent: Optional[str] = None, **attributes: Any):
+        """
+        Root span context of a request, a no-op when the request is not sampled.
+        An upstream sampled traceparent forces sampling and continues that trace.
+        """
+        if not self.enabled:
+            return _NOOP
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id, sampled = secrets.token_hex(16), None, random.random() < self.sample_rate
+        if not sampled:
+            return _NOOP
+        trace = Trace(trace_id=trace_id)
+        span = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=secrets.token_hex(8),
+            parent_id=parent_id,
+            start_ns=time.time_ns(),
+            kind=SPAN_KIND_SERVER,
+            attributes=attributes,
+        )
+        trace.spans.append(span)
+        return _SpanContext(self, trace, span, is_root=True)
+
+    def span(self, name: str, **attributes: Any):
+        """
+        Child span of the current span, a no-op outside of a sampled trace.
+        """
+        parent = _current_span.get()
+        if parent is None:
+            return _NOOP
+        trace = _current_trace.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id,
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        trace.spans.append(span)
+        return _SpanContext(self, trace, span)
+
+    def record_span(self, name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+        """
+        Add an already finished child span, for hooks that only see start and end (e.g. SQL events).
+        """
+        parent = _current_span.get()
+        if parent is None:
+            return
+        _current_trace.get().spans.append(
+            Span(
+                name=name,
+                trace_id=parent.trace_id,
+                span_id=secrets.token_hex(8),
+                parent_id=parent.span_id,
+                start_ns=start_ns,
+                end_ns=end_ns,
+                attributes=attributes,
+            )
+        )
+
+    def finish(self, trace: Trace) -> None:
+        if self.slow_ms and trace.root.duration_ms >= self.slow_ms:
+            trace_logger.warning(f"Slow request {trace.root.name} ({trace.trace_id}): {format_critical_path(trace)}")
+        if self.exporter is not None:
+            self.exporter.export(trace)
+
+
+def traced(name: Optional[str] = None):
+    """
+    Decorator wrapping an async function in a span named `name` (default: the qualified name).
+    """
+
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return await func(*args, **kwargs)
+            with tracer.span(span_name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def critical_path(trace: Trace) -> List[Tuple[str, float]]:
+    """
+    Spans on the critical path with the time (ms) each one contributes exclusively.
+    Walking back from the end of a span, the child that finished last before the cursor is on
+    the path, concurrent children that finished earlier did not delay the parent.
+    """
+    children: Dict[str, List[Span]] = {}
+    for span in trace.spans[1:]:
+        children.setdefault(span.parent_id, []).append(span)
+
+    def walk(span: Span) -> List[Tuple[str, float]]:
+        path = []
+        cursor = span.end_ns
+        exclusive_ns = span.end_ns - span.start_ns
+        for child in sorted(children.get(span.span_id, ()), key=lambda s: s.end_ns, reverse=True):
+            if child.end_ns <= cursor and child.start_ns >= span.start_ns:
+                path = walk(child) + path
+                exclusive_ns -= child.end_ns - child.start_ns
+                cursor = child.start_ns
+        return [(span.name, exclusive_ns / 1e6)] + path
+
+    return walk(trace.root)
+
+
+def format_critical_path(trace: Trace) -> str:
+    segments = sorted(critical_path(trace), key=lambda segment: segment[1], reverse=True)
+    breakdown = ", ".join(f"{name} {ms:.1f}ms" for name, ms in segments if ms >= 0.1)
+    return f"total {trace.root.duration_ms:.1f}ms: {breakdown}"
+
+
+def __otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def __otlp_attributes(attributes: Dict[str, Any]) -> List[dict]:
+    return [{"key": key, "value": __otlp_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp_json(traces: List[Trace], service_name: str) -> dict:
+    """
+    ExportTraceServiceRequest in the OTLP/JSON encoding.
+    """
+    spans = []
+    for trace in traces:
+        for span in trace.spans:
+            entry = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": span.kind,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": __otlp_attributes(span.attributes),
+                # 1 = OK, 2 = ERROR
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_id:
+                entry["parentSpanId"] = span.parent_id
+            spans.append(entry)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": __otlp_attributes({"service.name": service_name})},
+                "scopeSpans": [{"scope": {"name": "src.common.tracing"}, "spans": spans}],
+            }
+        ]
+    }
+
+
+class SpanExporter:
+    """
+    Batches finished traces on a background thread and writes them as OTLP/JSON, either appended
+    to a file (one request per line) or POSTed to a collector (`http(s)://.../v1/traces`).
+    When the queue is full, traces are dropped rather than slowing requests down.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        service_name: str = "intra-chat",
+        max_queue: int = 1000,
+        batch_size: int = 64,
+        flush_interval: float = 2.0,
+    ):
+        self.target = target
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Trace]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self.__run, name="span-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def export(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+    def __write(self, batch: List[Trace]) -> None:
+        body = json.dumps(to_otlp_json(batch, self.service_name))
+        if self.target.startswith(("http://", "https://")):
+            request = urllib.request.Request(
+                self.target,
+                data=body.encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            with urllib.request.urlopen(request, timeout=5):
+                pass
+        else:
+            with open(self.target, "a", encoding="utf-8") as file:
+                file.write(body + "\n")
+
+    def __run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    trace = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if trace is None:
+                    stopping = True
+                    break
+                batch.append(trace)
+            if batch:
+                try:
+                    self.__write(batch)
+                except Exception as e:
+                    trace_logger.error(f"Failed to export {len(batch)} traces to {self.target}: {e}")
+
+
+tracer = Tracer(
+    sample_rate=configuration.TRACE_SAMPLE_RATE,
+    exporter=(
+        SpanExporter(configuration.TRACE_EXPORT, service_name=configuration.TRACE_SERVICE_NAME)
+        if configuration.TRACE_EXPORT
+        else None
+    ),
+    slow_ms=configuration.TRACE_SLOW_MS,
+)
@@ -1,25 +1,32 @@
 from typing import Optional, Tuple
 
 from fastapi import HTTPException, status
+from ollama import ChatResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..auth.schemas import TokenData
 from ..auth.service import get_user_by_id
+from ..common.singleflight import SingleFlight, request_key
+from ..common.tracing import traced, tracer
 from ..config import configuration
 from ..db.models import ChatSession
 from ..llm_client import get_client
-from ..rag.retriever import Retriever
+from ..quota.service import record_usage
+from ..rag.context import build_context, format_context
+from ..rag.retriever import Retriever, SearchFilter
 from .logger import model_logger
 from .schemas import ChatSessionDetail, ChatSessionList, RequestChatMessage
 from .utils import (
     create_chat_session,
+    gather_or_cancel,
     query_chat_session_by_session_id,
     query_chat_sessions,
     split_content_form_ollama,
     update_chat_session,
 )
 
-rag_retriever = Retriever(embedder=None)  # Lazy initialization of the retriever
+rag_retriever = Retriever()  # Embeds queries with the shared embedding service
+chat_flight = SingleFlight("ollama_chat")  # Identical concurrent prompts share one Ollama call
 
 MODEL = configuration.LLM_MODEL  # Default model name from configuration
 # MODEL = "gemma3:4b"  # Uncomment to use Gemma 3 model
@@ -53,6 +60,21 @@ async def warmup_model() -> None:
         model_logger.error(f"Error warming up {MODEL} model: {e}")
 
 
+async def __chat(messages: list) -> ChatResponse:
+    """
+    Chat completion with MODEL. With LLM_SINGLEFLIGHT, concurrent requests with the same
+    messages (e.g. the same question in new sessions) share one upstream call.
+    """
+    with tracer.span("ollama.chat", model=MODEL):
+        if not configuration.LLM_SINGLEFLIGHT:
+            return await get_client().chat(model=MODEL, messages=messages)
+        return await chat_flight.do(
+            request_key(MODEL, messages),
+            lambda: get_client().chat(model=MODEL, messages=messages),
+        )
+
+
+@traced("chat.user_check")
 async def __user_check(
     session: AsyncSession,
     user_id: str,
@@ -60,7 +82,10 @@ async def __user_check(
     """
     Check if the user exists in the database.
     Raises HTTPException if the user does not exist.
+    Skipped with AUTH_STATELESS, the token is then trusted (chat sessions still reference users by foreign key).
     """
+    if configuration.AUTH_STATELESS:
+        return
     user = await get_user_by_id(session=session, user_id=user_id)
     if not user:
         raise HTTPException(
@@ -69,6 +94,7 @@ async def __user_check(
         )
 
 
+@traced("chat.get_chat_session")
 async def __get_chat_session_by_id(
     session: AsyncSession,
     user_id: str,
@@ -90,6 +116,48 @@ async def __get_chat_session_by_id(
     return chat_session
 
 
+async def __load_chat_session(
+    session: AsyncSession,
+    user_id: str,
+    user_name: str,
+    chat_session_id: Optional[str],
+) -> ChatSession:
+    """
+    Check the user and load (or create) the chat session.
+    Raises HTTPException if the chat session does not exist.
+    """
+    await __user_check(session=session, user_id=user_id)
+    chat_session = await __get_chat_session_by_id(
+        session=session,
+        user_id=user_id,
+        chat_session_id=chat_session_id,
+    )
+    # If chat_session is still None, it means user give an invalid chat_session_id.
+    if chat_session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Chat session with ID {chat_session_id} not found for User: {user_name}.",
+        )
+    return chat_session
+
+
+@traced("rag.retrieve_context")
+async def __retrieve_context(
+    query: str,
+    rag_filter: Optional[SearchFilter],
+) -> str:
+    """
+    Search qdrant for relevant documents and build the context text for the prompt.
+    """
+    candidates = await rag_retriever.search(
+        query=query,
+        top_k=configuration.RAG_CANDIDATE_K,
+        filters=rag_filter,
+    )
+    passages = await build_context(query, candidates)
+    return format_context(passages)
+
+
 async def ask_llm(
     session: AsyncSession,
     request: RequestChatMessage,
@@ -120,10 +188,8 @@ async def ask_llm(
         *history_messages,
         {"role": "user", "content": user_content},
     ]
-    llm_response = await get_client().chat(
-        model=MODEL,
-        messages=message,
-    )
+    llm_response = await __chat(message)
+    record_usage(user_id, llm_response)
     # Append the model's response to the chat session
     new_message = [
         {
@@ -155,27 +221,23 @@ async def ask_llm_with_rag(
     user_name = current_user.name
     user_content = request.content
     chat_session_id = request.chat_session_id
+    rag_filter = None
+    if request.rag_filter is not None:
+        rag_filter = SearchFilter(**request.rag_filter.model_dump())
 
-    # Check user existence
-    await __user_check(session=session, user_id=user_id)
-
-    chat_session = await __get_chat_session_by_id(
-        session=session,
-        user_id=user_id,
-        chat_session_id=chat_session_id,
+    # Retrieval does not need the DB, so it runs while the user and chat session are loaded.
+    # If either side fails the other one is cancelled.
+    chat_session, context_text = await gather_or_cancel(
+        __load_chat_session(
+            session=session,
+            user_id=user_id,
+            user_name=user_name,
+            chat_session_id=chat_session_id,
+        ),
+        __retrieve_context(query=user_content, rag_filter=rag_filter),
     )
-    # If chat_session is still None, it means user give an invalid chat_session_id.
-    if chat_session is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Chat session with ID {chat_session_id} not found for User: {user_name}.",
-        )
-
-    # Search qdrant for relevant documents
-    rag_results = await rag_retriever.search(query=user_content, top_k=5)
 
     # Combine the user's message with the RAG results
-    context_text = "\n".join(f"({i + 1}) {r.payload.get('text', '')}" for i, r in enumerate(rag_results))
     rag_messages = [
         {
             "role": "system",
@@ -185,10 +247,8 @@ async def ask_llm_with_rag(
         {"role": "user", "content": user_content},
     ]
     # 4. 呼叫 LLM
-    llm_response = await get_client().chat(
-        model=MODEL,
-        messages=rag_messages,
-    )
+    llm_response = await __chat(rag_messages)
+    record_usage(user_id, llm_response)
     new_message = [
         {
             'role': 'user',
@@ -1,11 +1,13 @@
 from typing import Annotated, List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..auth.dependencies import get_current_user
 from ..auth.schemas import TokenData
+from ..common.readiness import DATABASE, EMBEDDER, LLM, QDRANT, require_ready
 from ..db.session import get_db_session
+from ..quota.dependencies import enforce_quota
 from .llm_service import (
     ask_llm,
     ask_llm_with_rag,
@@ -18,13 +20,14 @@ from .schemas import (
     RequestChatMessage,
     ResponseChatMessage,
 )
+from .utils import cancel_on_disconnect
 
 VERSION = 'v1'
 
 router = APIRouter(
     prefix=f'/chat/{VERSION}',
     tags=['chat'],
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_user), Depends(require_ready(DATABASE))],
 )
 
 
@@ -68,11 +71,13 @@ async def get_chat_session(
 @router.post(
     '/ask',
     response_model=ResponseChatMessage,
+    dependencies=[Depends(require_ready(LLM)), Depends(enforce_quota)],
 )
 async def ask_chat(
     current_user: Annotated[TokenData, Depends(get_current_user)],
     request: RequestChatMessage,
     db_session: Annotated[AsyncSession, Depends(get_db_session)],
+    http_request: Request,
 ) -> ResponseChatMessage:
     """
     Ask a question in a chat session.
@@ -81,10 +86,15 @@ async def ask_chat(
     """
 
     try:
-        answer, thinking_content, chat_session_id = await ask_llm(
-            session=db_session,
-            request=request,
-            current_user=current_user,
+        # A client that disconnects stops the generation, the turn is then not saved
+        answer, thinking_content, chat_session_id = await cancel_on_disconnect(
+            http_request,
+            ask_llm(
+                session=db_session,
+                request=request,
+                current_user=current_user,
+            ),
+            endpoint="ask",
         )
         return ResponseChatMessage(
             code=200,
@@ -99,11 +109,13 @@ async def ask_chat(
 @router.post(
     '/ask/rag',
     response_model=ResponseChatMessage,
+    dependencies=[Depends(require_ready(LLM, EMBEDDER, QDRANT)), Depends(enforce_quota)],
 )
 async def ask_chat_with_rag(
     current_user: Annotated[TokenData, Depends(get_current_user)],
     request: RequestChatMessage,
     db_session: Annotated[AsyncSession, Depends(get_db_session)],
+    http_request: Request,
 ) -> ResponseChatMessage:
     """
     Ask a question in a chat session with RAG (Retrieval-Augmented Generation).
@@ -111,10 +123,15 @@ async def ask_chat_with_rag(
     will create a new session.
     """
     try:
-        answer, thinking_content, chat_session_id = await ask_llm_with_rag(
-            session=db_session,
-            request=request,
-            current_user=current_user,
+        # A client that disconnects stops the generation, the turn is then not saved
+        answer, thinking_content, chat_session_id = await cancel_on_disconnect(
+            http_request,
+            ask_llm_with_rag(
+                session=db_session,
+                request=request,
+                current_user=current_user,
+            ),
+            endpoint="ask_rag",
         )
         return ResponseChatMessage(
             code=200,
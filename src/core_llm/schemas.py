@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ChatSessionList(BaseModel):
@@ -42,9 +42,26 @@ class ChatSessionDetail(BaseModel):
     }
 
 
+class RagFilter(BaseModel):
+    since_days: Optional[int] = Field(None, ge=1)
+    source: Optional[str] = None
+    tickers: Optional[List[str]] = None
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "since_days": 3,
+                "source": "USTV",
+                "tickers": ["2330"],
+            },
+        },
+    }
+
+
 class RequestChatMessage(BaseModel):
     chat_session_id: Optional[str] = None
     content: str
+    rag_filter: Optional[RagFilter] = None  # Only used by the RAG endpoint
 
     model_config = {
         "json_schema_extra": {
@@ -1,16 +1,29 @@
 import asyncio
 import uuid
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional
+from typing import Any, Awaitable, List, Optional, TypeVar
 
+from fastapi import HTTPException, Request
 from ollama import ChatResponse
 from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..common.metrics import registry
+from ..common.tracing import traced
 from ..config import configuration
 from ..db.models import ChatSession
 
 MEMORY_SIZE = configuration.MEMORY_SIZE  # Default memory size from configuration
+# Not sent to anyone, it only shows up in the access log (nginx uses the same code)
+CLIENT_CLOSED_REQUEST = 499
+
+chat_cancellations = registry.counter(
+    "chat_cancellations_total",
+    "Chat requests cancelled because the client disconnected before the answer was ready.",
+    labels=("endpoint",),
+)
+
+T = TypeVar("T")
 
 
 def __split_content(
@@ -31,6 +44,7 @@ def __split_content(
     return content, thinking_content
 
 
+@traced("chat.split_content")
 async def split_content_form_ollama(
     response: ChatResponse,
 ) -> tuple[str, Optional[str]]:
@@ -44,15 +58,69 @@ async def split_content_form_ollama(
     return content, thinking_content
 
 
+async def gather_or_cancel(*aws: Awaitable[Any]) -> List[Any]:
+    """
+    Run the awaitables concurrently and return their results in order.
+    Unlike `asyncio.gather`, the first failure cancels the others and is re-raised as is,
+    so an HTTPException from one branch still reaches FastAPI unchanged.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        # Also reached when the caller itself is cancelled
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    for task in tasks:
+        if not task.cancelled() and task.exception() is not None:
+            raise task.exception()
+    return [task.result() for task in tasks]
+
+
+async def __wait_for_disconnect(request: Request) -> None:
+    # The body is already read, the next ASGI message is the disconnect
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def cancel_on_disconnect(request: Request, aw: Awaitable[T], endpoint: str) -> T:
+    """
+    Await `aw` unless the client disconnects first. Then `aw` is cancelled, which closes the pending
+    Ollama request so the model stops generating, and nothing after it (e.g. saving the turn) runs.
+    """
+    if not configuration.LLM_CANCEL_ON_DISCONNECT:
+        return await aw
+    task = asyncio.ensure_future(aw)
+    watcher = asyncio.ensure_future(__wait_for_disconnect(request))
+    try:
+        await asyncio.wait([task, watcher], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    if task.cancelled():
+        chat_cancellations.inc(1, endpoint)
+        raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed the request.")
+    return task.result()
+
+
 async def query_chat_sessions(
     session: AsyncSession,
     user_id: int,
 ) -> list[ChatSession]:
     try:
-        query = select(
-            ChatSession,
-        ).where(
-            ChatSession.user_id == user_id,
+        query = (
+            select(
+                ChatSession,
+            )
+            .where(
+                ChatSession.user_id == user_id,
+            )
+            .order_by(ChatSession.created_at.desc())
         )
         result = await session.execute(query)
         chat_sessions = result.scalars().all()
@@ -82,6 +150,7 @@ async def query_chat_session_by_session_id(
         raise e
 
 
+@traced("db.update_chat_session")
 async def update_chat_session(
     session: AsyncSession,
     chat_session: ChatSession,
@@ -1,10 +1,11 @@
-from typing import Callable, List
+from typing import Awaitable, Callable, List, Optional
 
 from ..schemas import NewsArticle
 from .ustv import crawl_ustv
 
 # For type hinting
-FetcherFunction = Callable[[], List[NewsArticle]]
+ArticleSink = Callable[[NewsArticle], Awaitable[None]]
+FetcherFunction = Callable[[Optional[ArticleSink]], Awaitable[List[NewsArticle]]]
 
 
 def get_fetchers() -> List[FetcherFunction]:
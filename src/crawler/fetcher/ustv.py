@@ -1,7 +1,5 @@
 import os
-from typing import List
-
-from playwright.async_api import async_playwright
+from typing import Awaitable, Callable, List, Optional
 
 from ...config import configuration
 from ..schemas import NewsArticle
@@ -13,16 +11,26 @@ from .utils import (
     save_content_to_file,
 )
 
-ARTICLE_DIR = f"{configuration.CRAWLER_DATA_ROOT}/ustv"
+# Streamed articles are ingested right away, so the raw copies are archived with the ingested ones
+ARTICLE_DIR = f"{configuration.INGESTED_ARTICLES}/ustv"
 
 
-async def crawl_ustv() -> List[NewsArticle]:
+async def crawl_ustv(
+    on_article: Optional[Callable[[NewsArticle], Awaitable[None]]] = None,
+) -> List[NewsArticle]:
+    """
+    Crawl yesterday's USTV articles.
+    Every article is handed to `on_article` as soon as its content is fetched.
+    """
+    # Imported here so Playwright is only loaded by the process that actually crawls
+    from playwright.async_api import async_playwright
 
     article_data: List[NewsArticle] = []
 
     yesterday = get_yesterday_date(fmt="%Y-%m-%d")
     article_dir = f"{ARTICLE_DIR}/{yesterday}"
-    os.makedirs(article_dir, exist_ok=True)
+    if configuration.CRAWLER_ARCHIVE_RAW:
+        os.makedirs(article_dir, exist_ok=True)
     logger.info(f"Fetching USTV articles for {yesterday}")
     url = f"https://news.ustv.com.tw/newslist/146?startDate={yesterday}&endDate={yesterday}"
 
@@ -44,6 +52,7 @@ async def crawl_ustv() -> List[NewsArticle]:
                     url=href,
                     source="USTV",
                     content="",  # Content will be fetched later
+                    published_at=yesterday,
                 )
             )
         logger.info(f"Found {len(article_data)} articles for {yesterday}")
@@ -55,12 +64,15 @@ async def crawl_ustv() -> List[NewsArticle]:
                     "p.block_text",
                     ["ustvshop"],
                 )
-                file_path = await save_content_to_file(
-                    content=full_content,
-                    file_root=article_dir,
-                    file_name=f"{article.title}.txt",
-                )
                 article.content = full_content
-                logger.info(f"Saved article: {article.title} to {file_path}")
+                if on_article is not None:
+                    await on_article(article)
+                if configuration.CRAWLER_ARCHIVE_RAW:
+                    file_path = await save_content_to_file(
+                        content=full_content,
+                        file_root=article_dir,
+                        file_name=f"{article.title}.txt",
+                    )
+                    logger.info(f"Saved article: {article.title} to {file_path}")
         await browser.close()
         return article_data
@@ -1,12 +1,14 @@
 import os
 import re
 from datetime import datetime, timedelta
-from typing import List
+from typing import TYPE_CHECKING, List
 
 import aiofiles
-from playwright.async_api import Page
 from pydantic import HttpUrl
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
 
 def get_yesterday_date(fmt: str) -> str:
     """
@@ -20,7 +22,7 @@ def get_yesterday_date(fmt: str) -> str:
 
 
 async def auto_scroll(
-    page: Page,
+    page: 'Page',
     *,
     max_scrolls: int = 10,
 ) -> None:
@@ -44,7 +46,7 @@ async def auto_scroll(
 
 
 async def fetch_news_content(
-    page: Page,
+    page: 'Page',
     url: HttpUrl,
     query_selector: str,
     ads_keywords: List[str] = None,
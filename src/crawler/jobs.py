@@ -0,0 +1,119 @@
+from typing import List, Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.models import CrawlerJob
+
+# Job kinds the worker knows how to run, see `src/worker/runner.py`
+FETCH_JOB = "fetch"
+INGEST_JOB = "ingest"
+REEMBED_JOB = "reembed"
+
+
+async def enqueue_job(
+    session: AsyncSession,
+    kind: str,
+) -> CrawlerJob:
+    try:
+        query = insert(CrawlerJob).values(kind=kind, status='queued').returning(CrawlerJob)
+        job = await session.execute(query)
+        await session.commit()
+        return job.scalars().first()
+    except Exception as e:
+        await session.rollback()
+        raise e
+
+
+async def query_job(
+    session: AsyncSession,
+    job_id: int,
+) -> Optional[CrawlerJob]:
+    query = select(CrawlerJob).where(CrawlerJob.id == job_id)
+    result = await session.execute(query)
+    return result.scalars().first()
+
+
+async def query_recent_jobs(
+    session: AsyncSession,
+    limit: int = 20,
+) -> List[CrawlerJob]:
+    query = select(CrawlerJob).order_by(CrawlerJob.created_at.desc()).limit(limit)
+    result = await session.execute(query)
+    return result.scalars().all()
+
+
+async def claim_next_job(
+    session: AsyncSession,
+) -> Optional[CrawlerJob]:
+    """
+    Mark the oldest queued job as running and return it.
+    `SKIP LOCKED` keeps two workers from claiming the same job.
+    """
+    try:
+        query = (
+            select(CrawlerJob.id)
+            .where(CrawlerJob.status == 'queued')
+            .order_by(CrawlerJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job_id = (await session.execute(query)).scalar()
+        if job_id is None:
+            await session.rollback()
+            return None
+        update_query = (
+            update(CrawlerJob)
+            .where(CrawlerJob.id == job_id)
+            .values(status='running', started_at=func.now())
+            .returning(CrawlerJob)
+        )
+        job = (await session.execute(update_query)).scalars().first()
+        await session.commit()
+        return job
+    except Exception as e:
+        await session.rollback()
+        raise e
+
+
+async def finish_job(
+    session: AsyncSession,
+    job_id: int,
+    error: Optional[str] = None,
+) -> None:
+    try:
+        query = (
+            update(CrawlerJob)
+            .where(CrawlerJob.id == job_id)
+            .values(
+                status='failed' if error else 'succeeded',
+                error=error,
+                finished_at=func.now(),
+            )
+        )
+        await session.execute(query)
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        raise e
+
+
+async def fail_running_jobs(
+    session: AsyncSession,
+    reason: str,
+) -> int:
+    """
+    Mark jobs left running by a crashed worker as failed, returns how many were found.
+    """
+    try:
+        query = (
+            update(CrawlerJob)
+            .where(CrawlerJob.status == 'running')
+            .values(status='failed', error=reason, finished_at=func.now())
+        )
+        result = await session.execute(query)
+        await session.commit()
+        return result.rowcount
+    except Exception as e:
+        await session.rollback()
+        raise e
@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime, time
+from typing import List, Optional
+
+from ..config import configuration
+from ..rag.embedder import Embedder, get_embedding_service
+from ..rag.ingestor import ArticleMetadata, ingest_text
+from .logger import crawler_logger as logger
+from .schemas import NewsArticle
+
+
+def to_metadata(article: NewsArticle) -> ArticleMetadata:
+    """
+    Build the vector payload metadata of a fetched article.
+    """
+    published_at = None
+    if article.published_at is not None:
+        published_at = datetime.combine(article.published_at, time.min).astimezone().isoformat()
+    return ArticleMetadata(
+        title=article.title,
+        url=str(article.url),
+        news_source=article.source,
+        published_at=published_at,
+    )
+
+
+class ArticlePipeline:
+    """
+    Streams fetched articles straight into the RAG store.
+    Fetchers `put` articles into a bounded queue, and a small pool of workers
+    chunks, embeds and upserts them as they arrive. A full queue blocks the
+    fetcher, so crawling never runs far ahead of ingestion.
+
+    Use it as an async context manager, leaving the block drains the queue:
+        async with ArticlePipeline() as pipeline:
+            await crawl_ustv(on_article=pipeline.put)
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = configuration.INGEST_QUEUE_SIZE,
+        workers: int = configuration.INGEST_WORKERS,
+        embedder: Optional[Embedder] = None,
+    ):
+        self.queue: asyncio.Queue[Optional[NewsArticle]] = asyncio.Queue(maxsize=maxsize)
+        self.workers = workers
+        self.embedder = embedder
+        self.ingested = 0
+        self.failed = 0
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if self.embedder is None:
+            self.embedder = await get_embedding_service().get()
+        self._tasks = [asyncio.create_task(self.__worker(i)) for i in range(self.workers)]
+
+    async def put(self, article: NewsArticle) -> None:
+        """
+        Hand an article to the pipeline, waits while the queue is full.
+        """
+        await self.queue.put(article)
+
+    async def close(self) -> None:
+        """
+        Wait until every queued article is ingested, then stop the workers.
+        """
+        for _ in self._tasks:
+            await self.queue.put(None)
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+        logger.info(f"Ingest pipeline finished: {self.ingested} articles ingested, {self.failed} failed.")
+
+    async def __worker(self, index: int) -> None:
+        while True:
+            article = await self.queue.get()
+            if article is None:
+                break
+            try:
+                if not article.content:
+                    logger.warning(f"Skipping empty article: {article.title}")
+                    continue
+                total = await ingest_text(
+                    article.content,
+                    source=article.title,
+                    embedder=self.embedder,
+                    metadata=to_metadata(article),
+                )
+                self.ingested += 1
+                logger.debug(f"Worker {index} ingested {total} points from article: {article.title}")
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Worker {index} failed to ingest article {article.title}: {e}")
+
+    async def __aenter__(self) -> 'ArticlePipeline':
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
@@ -1,69 +1,97 @@
-from contextlib import asynccontextmanager
+from typing import Annotated, List
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .logger import crawler_logger as logger
-from .service import ingest_articles, run_fetchers
-
-scheduler = AsyncIOScheduler()
-
-
-@asynccontextmanager
-async def lifespan(app: APIRouter):
-    logger.info("Starting Crawler Scheduler")
-    scheduler.add_job(
-        run_fetchers,
-        'cron',
-        hour=0,
-        minute=10,
-        name='fetch_yesterday_articles',
-    )
-    logger.info("Scheduled job to fetch articles every day at 00:10")
-    scheduler.add_job(
-        ingest_articles,
-        'cron',
-        hour=0,
-        minute=20,
-        name='ingest_yesterday_articles',
-    )
-    logger.info("Scheduled job to ingest articles every day at 00:20")
-    scheduler.start()
-    yield
-    logger.info("Stopping Crawler Scheduler")
-    if scheduler.running:
-        scheduler.shutdown(wait=True)
-    logger.info("Crawler Scheduler stopped")
+from ..common.readiness import DATABASE, require_ready
+from ..db.session import get_db_session
+from .jobs import FETCH_JOB, INGEST_JOB, REEMBED_JOB, enqueue_job, query_job, query_recent_jobs
+from .schemas import CrawlerJobStatus
 
+# Crawling and ingestion run in the dedicated worker (`python -m src.worker`),
+# these endpoints only enqueue jobs and report their status.
 
 VERSION = 'v1'
 
 router = APIRouter(
     prefix=f'/crawler/{VERSION}',
     tags=['crawler'],
-    lifespan=lifespan,
+    dependencies=[Depends(require_ready(DATABASE))],
 )
 
 
 @router.post(
     '/fetch-now',
     status_code=202,
+    response_model=CrawlerJobStatus,
 )
 async def fetch_now(
-    background_tasks: BackgroundTasks,
-):
-
-    background_tasks.add_task(run_fetchers)
-    return {"message": "Fetchers started in the background."}
+    db_session: Annotated[AsyncSession, Depends(get_db_session)],
+) -> CrawlerJobStatus:
+    """
+    Queue a fetch job, the worker crawls and ingests the articles.
+    """
+    job = await enqueue_job(db_session, FETCH_JOB)
+    return CrawlerJobStatus.model_validate(job)
 
 
 @router.post(
     '/ingest-articles-now',
     status_code=202,
+    response_model=CrawlerJobStatus,
 )
 async def ingest_articles_now(
-    background_tasks: BackgroundTasks,
-):
+    db_session: Annotated[AsyncSession, Depends(get_db_session)],
+) -> CrawlerJobStatus:
+    """
+    Queue an ingest job for the files in the crawler data directory.
+    """
+    job = await enqueue_job(db_session, INGEST_JOB)
+    return CrawlerJobStatus.model_validate(job)
+
+
+@router.post(
+    '/reembed-now',
+    status_code=202,
+    response_model=CrawlerJobStatus,
+)
+async def reembed_now(
+    db_session: Annotated[AsyncSession, Depends(get_db_session)],
+) -> CrawlerJobStatus:
+    """
+    Queue a job re-embedding the stored chunks with the worker's EMBED_MODEL, the collection alias
+    is switched when it completes and queries keep being served meanwhile.
+    """
+    job = await enqueue_job(db_session, REEMBED_JOB)
+    return CrawlerJobStatus.model_validate(job)
 
-    background_tasks.add_task(ingest_articles)
-    return {"message": "Ingesting articles started in the background."}
+
+@router.get(
+    '/jobs',
+    response_model=List[CrawlerJobStatus],
+)
+async def list_jobs(
+    db_session: Annotated[AsyncSession, Depends(get_db_session)],
+) -> List[CrawlerJobStatus]:
+    """
+    List the most recent crawler jobs.
+    """
+    jobs = await query_recent_jobs(db_session)
+    return [CrawlerJobStatus.model_validate(job) for job in jobs]
+
+
+@router.get(
+    '/jobs/{job_id}',
+    response_model=CrawlerJobStatus,
+)
+async def get_job(
+    job_id: int,
+    db_session: Annotated[AsyncSession, Depends(get_db_session)],
+) -> CrawlerJobStatus:
+    job = await query_job(db_session, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Crawler job with ID {job_id} not found.",
+        )
+    return CrawlerJobStatus.model_validate(job)
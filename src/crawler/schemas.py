@@ -1,3 +1,6 @@
+from datetime import date, datetime
+from typing import Optional
+
 from pydantic import BaseModel, HttpUrl
 
 
@@ -6,3 +9,29 @@ class NewsArticle(BaseModel):
     url: HttpUrl
     source: str
     content: str
+    published_at: Optional[date] = None
+
+
+class CrawlerJobStatus(BaseModel):
+    id: int
+    kind: str
+    status: str
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = {
+        "from_attributes": True,
+        "json_schema_extra": {
+            "example": {
+                "id": 1,
+                "kind": "fetch",
+                "status": "running",
+                "error": None,
+                "created_at": "2023-10-01T00:10:00Z",
+                "started_at": "2023-10-01T00:10:02Z",
+                "finished_at": None,
+            },
+        },
+    }
@@ -5,22 +5,29 @@ from ..config import configuration
 from ..rag.ingestor import ingest_folder
 from .fetcher import get_fetchers
 from .logger import crawler_logger as logger
+from .pipeline import ArticlePipeline
 
 
 async def run_fetchers():
+    """
+    Run every fetcher and stream the fetched articles into the RAG system.
+    """
     fetchers = get_fetchers()
-    for fetcher in fetchers:
-        try:
-            logger.info(f"Running fetcher: {fetcher.__name__}")
-            articles = await fetcher()
-            logger.info(f"Fetcher {fetcher.__name__} fetched {len(articles)} articles.")
-        except Exception as e:
-            logger.error(f"Error running fetcher {fetcher.__name__}: {e}")
+    async with ArticlePipeline() as pipeline:
+        for fetcher in fetchers:
+            try:
+                logger.info(f"Running fetcher: {fetcher.__name__}")
+                articles = await fetcher(on_article=pipeline.put)
+                logger.info(f"Fetcher {fetcher.__name__} fetched {len(articles)} articles.")
+            except Exception as e:
+                logger.error(f"Error running fetcher {fetcher.__name__}: {e}")
 
 
 async def ingest_articles():
     """
     Ingest articles from the crawler data directory into the RAG system.
+    Fetched articles are streamed in by `run_fetchers`, this is only needed for
+    files dropped into the directory by hand.
     """
     article_dir = configuration.CRAWLER_DATA_ROOT
     if not os.path.exists(article_dir):
@@ -0,0 +1,75 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from ..common.metrics import registry
+from ..common.tracing import tracer
+from ..config import configuration
+from .logger import db_logger as logger
+
+statement_latency = registry.histogram(
+    "db_statement_duration_seconds",
+    "Latency of SQL statements by statement type.",
+    labels=("statement",),
+)
+pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+)
+slow_statements = registry.counter(
+    "db_slow_statements_total",
+    "Statements slower than DB_SLOW_QUERY_MS.",
+    labels=("statement",),
+)
+
+SLOW_QUERY_SECONDS = configuration.DB_SLOW_QUERY_MS / 1000
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    The default async pool, plus the time a checkout waited for a free connection.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - start)
+
+
+def __statement_type(statement: str) -> str:
+    # Label by verb only, the full statement would blow up the metric cardinality
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+
+
+def __before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def __after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    statement_type = __statement_type(statement)
+    statement_latency.observe(elapsed, statement_type)
+    end_ns = time.time_ns()
+    tracer.record_span(f"db.{statement_type}", end_ns - int(elapsed * 1e9), end_ns)
+    if SLOW_QUERY_SECONDS > 0 and elapsed >= SLOW_QUERY_SECONDS:
+        slow_statements.inc(1, statement_type)
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {' '.join(statement.split())[:500]}")
+
+
+def __handle_error(exception_context):
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Attach the latency and slow-query hooks to a (sync) engine, use `async_engine.sync_engine`.
+    """
+    event.listen(engine, "before_cursor_execute", __before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", __after_cursor_execute)
+    event.listen(engine, "handle_error", __handle_error)
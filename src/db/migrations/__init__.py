@@ -0,0 +1,10 @@
+from .runner import SchemaVersionError, check_schema, current_version, head_version, history, upgrade
+
+__all__ = [
+    "SchemaVersionError",
+    "check_schema",
+    "current_version",
+    "head_version",
+    "history",
+    "upgrade",
+]
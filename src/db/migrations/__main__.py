@@ -0,0 +1,27 @@
+import argparse
+import asyncio
+
+from ..session import engine
+from .runner import current_version, head_version, history, upgrade
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        if args.command == "upgrade":
+            applied = await upgrade(engine, target=args.target)
+            print(f"Applied migrations: {applied}" if applied else "Database is up to date.")
+        elif args.command == "current":
+            async with engine.connect() as conn:
+                print(f"Current version: {await current_version(conn)}, head: {head_version()}")
+        elif args.command == "history":
+            for entry in await history(engine):
+                print(f"{'x' if entry['applied'] else ' '} {entry['version']:04d} {entry['name']}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Database schema migrations")
+    parser.add_argument("command", choices=["upgrade", "current", "history"])
+    parser.add_argument("--target", type=int, default=None, help="Upgrade up to this version (default: head)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,139 @@
+import importlib
+import pkgutil
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from ..logger import db_logger as logger
+from . import versions
+
+# Postgres advisory lock taken while migrating, so two deploys never migrate at once
+MIGRATION_LOCK_ID = 7_231_002
+
+schema_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    schema_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[AsyncConnection], Awaitable[None]]
+    # False for statements that cannot run in a transaction, e.g. CREATE INDEX CONCURRENTLY
+    transactional: bool = True
+
+
+def load_migrations() -> List[Migration]:
+    """
+    Revisions are the modules of `versions/`, each with VERSION, `async def upgrade(conn)`
+    and optionally TRANSACTIONAL = False.
+    """
+    migrations = []
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        module = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+        migrations.append(
+            Migration(
+                version=module.VERSION,
+                name=module_info.name,
+                upgrade=module.upgrade,
+                transactional=getattr(module, "TRANSACTIONAL", True),
+            )
+        )
+    migrations.sort(key=lambda migration: migration.version)
+    numbers = [migration.version for migration in migrations]
+    if len(set(numbers)) != len(numbers):
+        raise SchemaVersionError(f"Duplicate migration versions: {numbers}")
+    return migrations
+
+
+def head_version() -> int:
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+async def current_version(conn: AsyncConnection) -> int:
+    has_table = await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table(schema_version.name))
+    if not has_table:
+        return 0
+    result = await conn.execute(select(func.max(schema_version.c.version)))
+    return result.scalar() or 0
+
+
+async def check_schema(engine: AsyncEngine) -> int:
+    """
+    Startup check, raises SchemaVersionError when the database is behind the code.
+    """
+    async with engine.connect() as conn:
+        current = await current_version(conn)
+    head = head_version()
+    if current < head:
+        raise SchemaVersionError(
+            f"Database schema is at version {current}, the code needs {head}. "
+            "Run `python -m src.db.migrations upgrade`."
+        )
+    if current > head:
+        logger.warning(f"Database schema version {current} is newer than the code ({head}).")
+    return current
+
+
+async def __run_migration(engine: AsyncEngine, conn: AsyncConnection, migration: Migration) -> None:
+    if migration.transactional:
+        await migration.upgrade(conn)
+    else:
+        async with engine.connect() as autocommit_conn:
+            autocommit_conn = await autocommit_conn.execution_options(isolation_level="AUTOCOMMIT")
+            await migration.upgrade(autocommit_conn)
+    await conn.execute(insert(schema_version).values(version=migration.version, name=migration.name))
+    await conn.commit()
+
+
+async def upgrade(engine: AsyncEngine, target: Optional[int] = None) -> List[int]:
+    """
+    Apply the pending migrations up to `target` (head by default), returns the applied versions.
+    """
+    applied = []
+    async with engine.connect() as conn:
+        is_postgres = conn.dialect.name == "postgresql"
+        if is_postgres:
+            await conn.execute(text("SELECT pg_advisory_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+            await conn.commit()
+        try:
+            await conn.run_sync(schema_metadata.create_all)
+            current = await current_version(conn)
+            await conn.commit()
+            for migration in load_migrations():
+                if migration.version <= current or (target is not None and migration.version > target):
+                    continue
+                logger.info(f"Applying migration {migration.name}")
+                try:
+                    await __run_migration(engine, conn, migration)
+                except Exception:
+                    await conn.rollback()
+                    raise
+                applied.append(migration.version)
+        finally:
+            if is_postgres:
+                await conn.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+                await conn.commit()
+    return applied
+
+
+async def history(engine: AsyncEngine) -> List[dict]:
+    async with engine.connect() as conn:
+        current = await current_version(conn)
+    return [
+        {"version": migration.version, "name": migration.name, "applied": migration.version <= current}
+        for migration in load_migrations()
+    ]
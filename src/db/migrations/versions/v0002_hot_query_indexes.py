@@ -0,0 +1,43 @@
+"""
+Indexes for the hot queries: chat sessions of a user by creation time, and the worker's
+"oldest queued job" claim. On Postgres they are built CONCURRENTLY, so writes are not blocked.
+"""
+
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = 2
+TRANSACTIONAL = False
+
+INDEXES = [
+    ("ix_chat_sessions_user_id_created_at", "chat_sessions", "user_id, created_at"),
+    ("ix_crawler_jobs_status_created_at", "crawler_jobs", "status, created_at"),
+]
+
+
+async def __index_valid(conn: AsyncConnection, name: str) -> Optional[bool]:
+    """
+    pg_index.indisvalid of the index, None if it does not exist.
+    """
+    result = await conn.execute(
+        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": name}
+    )
+    return result.scalar()
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    if conn.dialect.name != "postgresql":
+        for name, table, columns in INDEXES:
+            await conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+        return
+    for name, table, columns in INDEXES:
+        # A failed or cancelled CONCURRENTLY build leaves an INVALID index behind, which IF NOT EXISTS would
+        # keep: it is maintained on every write but never used by the planner
+        if await __index_valid(conn, name) is False:
+            await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        await conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})"))
+        if not await __index_valid(conn, name):
+            # The version is not recorded, the next upgrade drops and rebuilds it
+            raise RuntimeError(f"Index {name} is invalid after CREATE INDEX CONCURRENTLY")
@@ -0,0 +1,27 @@
+"""
+Per-user daily usage (chat requests and Ollama tokens) for the quota subsystem, see src/quota.
+"""
+
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, MetaData, Table, func
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = 3
+
+metadata = MetaData()
+
+Table("users", metadata, Column("id", Integer, primary_key=True))
+
+Table(
+    "user_usage",
+    metadata,
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("day", Date, primary_key=True),
+    Column("requests", Integer, nullable=False, server_default="0"),
+    Column("generated_tokens", Integer, nullable=False, server_default="0"),
+    Column("prompt_tokens", Integer, nullable=False, server_default="0"),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    await conn.run_sync(metadata.tables["user_usage"].create, checkfirst=True)
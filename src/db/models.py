@@ -1,6 +1,7 @@
-from typing import Dict
+from datetime import date
+from typing import Dict, Optional
 
-from sqlalchemy import JSON, DateTime, ForeignKey, String, Text
+from sqlalchemy import JSON, Date, DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -23,6 +24,8 @@ class User(Base):
 
 class ChatSession(Base):
     __tablename__ = 'chat_sessions'
+    # Schema changes ship as revisions in src/db/migrations/versions, keep them in sync
+    __table_args__ = (Index('ix_chat_sessions_user_id_created_at', 'user_id', 'created_at'),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     session_id: Mapped[str] = mapped_column(Text, nullable=False, unique=True)
@@ -31,3 +34,32 @@ class ChatSession(Base):
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     user: Mapped[User] = relationship(back_populates='chat_sessions')
+
+
+class CrawlerJob(Base):
+    __tablename__ = 'crawler_jobs'
+    __table_args__ = (Index('ix_crawler_jobs_status_created_at', 'status', 'created_at'),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    # queued -> running -> succeeded / failed
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default='queued')
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    started_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class UserUsage(Base):
+    """
+    Chat requests and Ollama tokens of a user per day, written by the quota subsystem (src/quota).
+    """
+
+    __tablename__ = 'user_usage'
+
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    requests: Mapped[int] = mapped_column(nullable=False, default=0)
+    generated_tokens: Mapped[int] = mapped_column(nullable=False, default=0)  # Ollama eval_count
+    prompt_tokens: Mapped[int] = mapped_column(nullable=False, default=0)  # Ollama prompt_eval_count
+    updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -1,20 +1,35 @@
 from collections.abc import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from ..config import configuration
+from .instrumentation import TimedAsyncAdaptedQueuePool, instrument_engine
 
 DATABASE_URL = configuration.DATABASE_URL
 
-engine = create_async_engine(
-    DATABASE_URL,
-    pool_size=20,
-    max_overflow=10,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    pool_timeout=30,
-    echo=True,
-)
+
+def create_engine(url: str = DATABASE_URL, *, echo: bool = configuration.DB_ECHO) -> AsyncEngine:
+    """
+    Engine with the configured DB performance profile and the metric hooks attached.
+    """
+    options = {"echo": echo, "pool_pre_ping": configuration.DB_POOL_PRE_PING}
+    if url.startswith("postgresql"):
+        options.update(
+            poolclass=TimedAsyncAdaptedQueuePool,
+            pool_size=configuration.DB_POOL_SIZE,
+            max_overflow=configuration.DB_MAX_OVERFLOW,
+            pool_recycle=configuration.DB_POOL_RECYCLE,
+            pool_timeout=configuration.DB_POOL_TIMEOUT,
+        )
+    if "+asyncpg" in url:
+        # asyncpg keeps prepared statements per connection, repeated queries skip the parse/plan step
+        options["connect_args"] = {"prepared_statement_cache_size": configuration.DB_STATEMENT_CACHE_SIZE}
+    async_engine = create_async_engine(url, **options)
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+engine = create_engine()
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -0,0 +1,24 @@
+from fastapi import Depends, HTTPException, status
+
+from ..auth.dependencies import get_current_user
+from ..auth.schemas import TokenData
+from ..config import configuration
+from .service import check_quota
+
+
+async def enforce_quota(current_user: TokenData = Depends(get_current_user)) -> None:
+    """
+    Rate limit and daily token budget of the chat endpoints, answers 429 before any LLM work is done.
+    Async so it runs on the event loop like `record_usage` and the sync loop, FastAPI runs sync
+    dependencies in its threadpool where concurrent checks would race on the in-memory counters.
+    """
+    check_quota(current_user)
+
+
+async def require_admin(current_user: TokenData = Depends(get_current_user)) -> TokenData:
+    if current_user.account not in configuration.admin_accounts:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can see the usage of other users.",
+        )
+    return current_user
@@ -0,0 +1,3 @@
+from ..common import get_logger
+
+quota_logger = get_logger("src.quota")
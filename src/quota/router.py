@@ -0,0 +1,53 @@
+from datetime import date
+from typing import Annotated, List, Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..auth.dependencies import get_current_user
+from ..auth.schemas import TokenData
+from ..common.readiness import DATABASE, require_ready
+from ..db.session import get_db_session
+from .dependencies import require_admin
+from .schemas import UsageStatus
+from .service import query_usage, sync_usage
+
+VERSION = 'v1'
+
+router = APIRouter(
+    prefix=f'/quota/{VERSION}',
+    tags=['quota'],
+    dependencies=[Depends(get_current_user), Depends(require_ready(DATABASE))],
+)
+
+
+@router.get(
+    '/me',
+    response_model=List[UsageStatus],
+)
+async def my_usage(
+    current_user: Annotated[TokenData, Depends(get_current_user)],
+    db_session: Annotated[AsyncSession, Depends(get_db_session)],
+) -> List[UsageStatus]:
+    """
+    Today's usage of the current user against the daily budget, empty before the first chat request.
+    """
+    await sync_usage(db_session)
+    return await query_usage(session=db_session, day=date.today(), user_id=current_user.id)
+
+
+@router.get(
+    '/usage',
+    response_model=List[UsageStatus],
+    dependencies=[Depends(require_admin)],
+)
+async def usage(
+    db_session: Annotated[AsyncSession, Depends(get_db_session)],
+    day: Optional[date] = None,
+) -> List[UsageStatus]:
+    """
+    Usage of every user on `day` (default today), heaviest users first. Administrators only (ADMIN_ACCOUNTS).
+    Other API processes report their usage every QUOTA_SYNC_SECONDS.
+    """
+    await sync_usage(db_session)
+    return await query_usage(session=db_session, day=day or date.today())
@@ -0,0 +1,27 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class UsageStatus(BaseModel):
+    user_id: int
+    account: str
+    day: date
+    requests: int
+    generated_tokens: int
+    prompt_tokens: int
+    daily_token_budget: int  # 0 = unlimited
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "user_id": 1,
+                "account": "johndoe",
+                "day": "2026-10-19",
+                "requests": 42,
+                "generated_tokens": 18250,
+                "prompt_tokens": 96400,
+                "daily_token_budget": 200000,
+            },
+        },
+    }
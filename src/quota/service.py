@@ -0,0 +1,223 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from ollama import ChatResponse
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..auth.schemas import TokenData
+from ..common.metrics import registry
+from ..common.ratelimit import TokenBucketLimiter
+from ..common.readiness import DATABASE, startup
+from ..config import configuration
+from ..db.models import User, UserUsage
+from ..db.session import AsyncSessionLocal
+from .logger import quota_logger
+from .schemas import UsageStatus
+
+quota_rejections = registry.counter(
+    "quota_rejections_total",
+    "Chat requests refused by the quota, reason=rate (request bucket empty) or daily_tokens (budget used up).",
+    labels=("reason",),
+)
+generated_tokens = registry.counter("quota_generated_tokens_total", "Tokens generated by Ollama for chat requests.")
+
+# Requests per user, checked before anything else is done for a chat request. Per process, like the login limits
+request_limiter = TokenBucketLimiter(
+    rate=configuration.QUOTA_REQUESTS_PER_MINUTE / 60,
+    burst=configuration.QUOTA_REQUEST_BURST,
+)
+
+
+@dataclass
+class Usage:
+    requests: int = 0
+    generated_tokens: int = 0
+    prompt_tokens: int = 0
+
+    def add(self, other: "Usage") -> None:
+        self.requests += other.requests
+        self.generated_tokens += other.generated_tokens
+        self.prompt_tokens += other.prompt_tokens
+
+
+# Today's totals of every process as of the last sync, and what this process counted since then.
+# The budget check reads both, so it never waits on the database.
+_synced_day: date = date.today()
+_synced: Dict[int, Usage] = {}
+_pending: Dict[Tuple[int, date], Usage] = {}
+_sync_task: Optional[asyncio.Task] = None
+
+
+def __pending(user_id: int) -> Usage:
+    return _pending.setdefault((user_id, date.today()), Usage())
+
+
+def usage_today(user_id: int) -> Usage:
+    usage = Usage()
+    if _synced_day == date.today():
+        usage.add(_synced.get(user_id, Usage()))
+    usage.add(_pending.get((user_id, date.today()), Usage()))
+    return usage
+
+
+def __seconds_until_tomorrow() -> float:
+    tomorrow = datetime.combine(date.today() + timedelta(days=1), time.min)
+    return (tomorrow - datetime.now()).total_seconds()
+
+
+def __reject(reason: str, retry_after: float, detail: str) -> None:
+    quota_rejections.inc(1, reason)
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+    )
+
+
+def check_quota(current_user: TokenData) -> None:
+    """
+    Daily token budget and request rate of the user, checked in memory before the chat request is served.
+    Raises HTTPException 429 with Retry-After when either is exceeded.
+    """
+    if not configuration.QUOTA_ENABLED:
+        return
+    budget = configuration.QUOTA_DAILY_TOKENS
+    if budget > 0 and usage_today(current_user.id).generated_tokens >= budget:
+        __reject(
+            "daily_tokens",
+            __seconds_until_tomorrow(),
+            f"Daily budget of {budget} generated tokens used up, it resets at midnight.",
+        )
+    retry_after = request_limiter.hit(str(current_user.id))
+    if retry_after is not None:
+        __reject("rate", retry_after, "Too many chat requests, please retry later.")
+    __pending(current_user.id).requests += 1
+
+
+def record_usage(user_id: int, response: ChatResponse) -> None:
+    """
+    Counts the tokens of an Ollama chat response against the user's daily budget.
+    """
+    usage = __pending(user_id)
+    usage.generated_tokens += response.eval_count or 0
+    usage.prompt_tokens += response.prompt_eval_count or 0
+    generated_tokens.inc(response.eval_count or 0)
+
+
+async def sync_usage(session: AsyncSession) -> None:
+    """
+    Adds the usage counted by this process to the database, then reloads today's totals of every process.
+    """
+    global _synced_day, _synced
+    pending = dict(_pending)
+    _pending.clear()
+    if pending:
+        dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+        query = dialect.insert(UserUsage).values(
+            [
+                {
+                    "user_id": user_id,
+                    "day": day,
+                    "requests": usage.requests,
+                    "generated_tokens": usage.generated_tokens,
+                    "prompt_tokens": usage.prompt_tokens,
+                }
+                for (user_id, day), usage in pending.items()
+            ]
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[UserUsage.user_id, UserUsage.day],
+            set_={
+                "requests": UserUsage.requests + query.excluded.requests,
+                "generated_tokens": UserUsage.generated_tokens + query.excluded.generated_tokens,
+                "prompt_tokens": UserUsage.prompt_tokens + query.excluded.prompt_tokens,
+                "updated_at": func.now(),
+            },
+        )
+        try:
+            await session.execute(query)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            # Counted again at the next sync
+            for key, usage in pending.items():
+                _pending.setdefault(key, Usage()).add(usage)
+            raise e
+
+    today = date.today()
+    result = await session.execute(select(UserUsage).where(UserUsage.day == today))
+    _synced = {
+        row.user_id: Usage(row.requests, row.generated_tokens, row.prompt_tokens) for row in result.scalars().all()
+    }
+    _synced_day = today
+
+
+async def query_usage(
+    session: AsyncSession,
+    day: date,
+    user_id: Optional[int] = None,
+) -> List[UsageStatus]:
+    query = (
+        select(UserUsage, User.account)
+        .join(User, User.id == UserUsage.user_id)
+        .where(UserUsage.day == day)
+        .order_by(UserUsage.generated_tokens.desc())
+    )
+    if user_id is not None:
+        query = query.where(UserUsage.user_id == user_id)
+    result = await session.execute(query)
+    return [
+        UsageStatus(
+            user_id=usage.user_id,
+            account=account,
+            day=usage.day,
+            requests=usage.requests,
+            generated_tokens=usage.generated_tokens,
+            prompt_tokens=usage.prompt_tokens,
+            daily_token_budget=configuration.QUOTA_DAILY_TOKENS,
+        )
+        for usage, account in result.all()
+    ]
+
+
+async def __sync_loop() -> None:
+    await startup.wait(DATABASE)
+    while True:
+        try:
+            async with AsyncSessionLocal() as session:
+                await sync_usage(session)
+        except Exception as e:
+            quota_logger.warning(f"Syncing usage failed, retrying in {configuration.QUOTA_SYNC_SECONDS}s: {e}")
+        await asyncio.sleep(configuration.QUOTA_SYNC_SECONDS)
+
+
+def start_usage_sync() -> None:
+    global _sync_task
+    if configuration.QUOTA_ENABLED and _sync_task is None:
+        _sync_task = asyncio.create_task(__sync_loop())
+
+
+async def stop_usage_sync() -> None:
+    """
+    Stops the sync loop and writes what was counted since the last sync.
+    """
+    global _sync_task
+    if _sync_task is None:
+        return
+    _sync_task.cancel()
+    try:
+        await _sync_task
+    except asyncio.CancelledError:
+        pass
+    _sync_task = None
+    if _pending and startup.is_ready(DATABASE):
+        try:
+            async with AsyncSessionLocal() as session:
+                await sync_usage(session)
+        except Exception as e:
+            quota_logger.error(f"Usage of the last {configuration.QUOTA_SYNC_SECONDS}s was not saved: {e}")
@@ -0,0 +1,101 @@
+import asyncio
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from ..common.metrics import registry
+from ..common.singleflight import SingleFlight, request_key
+from ..common.tracing import traced
+from .logger import rag_logger
+
+if TYPE_CHECKING:
+    from .embedder import Embedder
+
+embed_batch_size = registry.histogram(
+    "embed_batch_size",
+    "Texts per coalesced embedding call.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+
+class BatchingEmbedder:
+    """
+    Coalesces the single-query embeddings of concurrent requests into one batched `embed` call.
+    A text waits at most `max_wait` seconds for others to join, a batch is sent as soon as it
+    holds `max_batch` texts, and each caller gets its own vectors back.
+    Same interface as `Embedder.embed_texts`, identical texts in a batch are embedded once,
+    and with `single_flight` a text already in flight in an earlier batch is not queued again.
+    """
+
+    def __init__(
+        self,
+        embedder: "Embedder",
+        *,
+        max_batch: int = 32,
+        max_wait: float = 0.005,
+        single_flight: bool = True,
+    ):
+        self.embedder = embedder
+        self.model = embedder.model
+        self.embedding_len = embedder.embedding_len
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.single_flight = single_flight
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        # Not the embedder's group: `/api/embed` normalizes and truncates, its vectors are not those of
+        # the per-text `/api/embeddings` calls and must not be handed to them
+        self.flight = SingleFlight("ollama_embed_batch")
+
+    @traced("embedder.embed_texts")
+    async def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        if not self.single_flight:
+            return list(await asyncio.gather(*(self.__enqueue(text) for text in texts)))
+        return list(
+            await asyncio.gather(
+                *(
+                    self.flight.do(request_key(self.model, text), lambda text=text: self.__enqueue(text))
+                    for text in texts
+                )
+            )
+        )
+
+    def __enqueue(self, text: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch:
+            self.__flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self.__flush)
+        return future
+
+    def __flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch :]
+            task = asyncio.create_task(self.__send(batch))
+            # Keep a reference, the loop only holds weak references to tasks
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def __send(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        # Waiters cancelled while queued (e.g. client disconnects) no longer need a vector
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+        unique_texts: Dict[str, int] = {}
+        for text, _ in batch:
+            unique_texts.setdefault(text, len(unique_texts))
+        embed_batch_size.observe(len(unique_texts))
+        try:
+            vectors = await self.embedder.embed_batch(list(unique_texts))
+        except Exception as e:
+            rag_logger.error(f"Batched embedding of {len(unique_texts)} texts failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for text, future in batch:
+            if not future.done():
+                future.set_result(vectors[unique_texts[text]])
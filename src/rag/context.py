@@ -0,0 +1,159 @@
+import asyncio
+import math
+import re
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import List, Optional
+
+from ..config import configuration
+from ..llm_client import get_client
+from .logger import rag_logger
+from .retriever import SearchResult
+
+_CJK_RE = re.compile(r"[\u3000-\u303f\u3400-\u9fff\uf900-\ufaff\uff00-\uffef]")
+_SCORE_RE = re.compile(r"\d+")
+
+RERANK_PROMPT = (
+    "請評估以下資料對回答問題的幫助程度，只回答一個 0 到 10 的整數。\n"
+    "問題：{query}\n"
+    "資料：{text}\n"
+    "分數："
+)
+
+
+@dataclass
+class ContextPassage:
+    """
+    A piece of context for the prompt, adjacent chunks of one article are merged into one passage.
+    """
+
+    source: str
+    text: str
+    score: float
+    chunk_ids: List[int] = field(default_factory=list)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate, CJK characters are about one token each and other text about four characters per token.
+    """
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def __bigrams(text: str) -> set:
+    return {text[i : i + 2] for i in range(len(text) - 1)} or {text}
+
+
+def __drop_low_scores(results: List[SearchResult], min_score: float) -> List[SearchResult]:
+    # Hits found only by BM25 have no dense score, they matched an exact term so they are kept
+    return [r for r in results if r.dense_score is None or r.dense_score >= min_score]
+
+
+def __drop_near_duplicates(results: List[SearchResult], threshold: float) -> List[SearchResult]:
+    kept: List[SearchResult] = []
+    kept_grams: List[set] = []
+    for result in results:
+        grams = __bigrams(result.payload.get("text", ""))
+        if any(len(grams & other) / len(grams | other) >= threshold for other in kept_grams):
+            continue
+        kept.append(result)
+        kept_grams.append(grams)
+    return kept
+
+
+def __merge_adjacent(results: List[SearchResult]) -> List[ContextPassage]:
+    """
+    Merge hits that are consecutive chunks of the same source into one passage scored by its best chunk.
+    """
+    passages: List[ContextPassage] = []
+
+    def key(r: SearchResult):
+        return r.payload.get("source", ""), r.payload.get("chunk_id", 0)
+
+    for source, group in groupby(sorted(results, key=key), key=lambda r: key(r)[0]):
+        current: Optional[ContextPassage] = None
+        for result in group:
+            chunk_id = result.payload.get("chunk_id", 0)
+            text = result.payload.get("text", "")
+            if current is not None and chunk_id == current.chunk_ids[-1] + 1:
+                current.text += text
+                current.score = max(current.score, result.score)
+                current.chunk_ids.append(chunk_id)
+                continue
+            current = ContextPassage(source=source, text=text, score=result.score, chunk_ids=[chunk_id])
+            passages.append(current)
+    passages.sort(key=lambda p: p.score, reverse=True)
+    return passages
+
+
+async def __llm_score(query: str, passage: ContextPassage, model: str) -> Optional[float]:
+    try:
+        response = await get_client().generate(
+            model=model,
+            prompt=RERANK_PROMPT.format(query=query, text=passage.text),
+            options={"temperature": 0, "num_predict": 4},
+        )
+        match = _SCORE_RE.search(response.response)
+        return float(match.group(0)) if match else None
+    except Exception as e:
+        rag_logger.warning(f"Rerank scoring failed for {passage.source}: {e}")
+        return None
+
+
+async def __rerank(query: str, passages: List[ContextPassage], model: str) -> List[ContextPassage]:
+    scores = await asyncio.gather(*(__llm_score(query, p, model) for p in passages))
+    # Passages the scorer could not rate keep their retrieval order behind the rated ones
+    ranked = sorted(
+        zip(passages, scores),
+        key=lambda item: (item[1] is not None, item[1] or 0.0, item[0].score),
+        reverse=True,
+    )
+    return [p for p, _ in ranked]
+
+
+def __pack(passages: List[ContextPassage], top_k: int, token_budget: int) -> List[ContextPassage]:
+    """
+    Takes passages in rank order until `top_k` are accepted, a passage that does not fit in the
+    remaining budget is skipped so a shorter one ranked below it can take its place.
+    """
+    packed: List[ContextPassage] = []
+    used = 0
+    for passage in passages:
+        if len(packed) == top_k:
+            break
+        tokens = estimate_tokens(passage.text)
+        if used + tokens > token_budget:
+            continue
+        packed.append(passage)
+        used += tokens
+    return packed
+
+
+async def build_context(
+    query: str,
+    candidates: List[SearchResult],
+    *,
+    top_k: int = configuration.RAG_TOP_K,
+    min_score: float = configuration.RAG_MIN_SCORE,
+    dedup_threshold: float = configuration.RAG_DEDUP_THRESHOLD,
+    token_budget: int = configuration.RAG_CONTEXT_TOKENS,
+    rerank_model: Optional[str] = configuration.RAG_RERANK_MODEL,
+) -> List[ContextPassage]:
+    """
+    Turn an over-fetched candidate list into the passages that go into the prompt:
+    drop low-score hits and near-duplicates, merge adjacent chunks of the same article,
+    optionally rerank with an LLM scorer, and keep the best `top_k` that fit in `token_budget`.
+    """
+    results = __drop_low_scores(candidates, min_score)
+    results = __drop_near_duplicates(results, dedup_threshold)
+    passages = __merge_adjacent(results)
+    if rerank_model and passages:
+        passages = await __rerank(query, passages, rerank_model)
+    passages = __pack(passages, top_k, token_budget)
+    rag_logger.debug(f"Built RAG context with {len(passages)} passages from {len(candidates)} candidates.")
+    return passages
+
+
+def format_context(passages: List[ContextPassage]) -> str:
+    return "\n".join(f"({i + 1}) {p.text}" for i, p in enumerate(passages))
@@ -1,8 +1,11 @@
 import asyncio
-from typing import List
+from typing import List, Optional
 
+from ..common.singleflight import SingleFlight, request_key
+from ..common.tracing import traced
 from ..config import configuration
 from ..llm_client import get_client
+from .batching import BatchingEmbedder
 from .logger import rag_logger
 
 
@@ -12,18 +15,19 @@ class Embedder:
     Create an instance using the `Embedder.create()` method to ensure the model is pulled and ready for use.
     """
 
-    def __init__(self):
-        self.model = configuration.EMBED_MODEL
+    def __init__(self, model: Optional[str] = None):
+        self.model = model or configuration.EMBED_MODEL
         self.client = get_client()
         self.embedding_len = None
+        self.flight = SingleFlight("ollama_embed")  # Identical texts in flight are embedded once
 
     @classmethod
-    async def create(cls) -> 'Embedder':
+    async def create(cls, model: Optional[str] = None) -> 'Embedder':
         """
         Factory method to create an instance of Embedder.
         This can be used to ensure the model is pulled before embedding.
         """
-        embedder = cls()
+        embedder = cls(model)
         await embedder.__pull_model()
         embedder.embedding_len = await embedder.__get_embedding_len()
         return embedder
@@ -51,15 +55,113 @@ class Embedder:
         """
         Embed a single text using the configured embedding model.
         """
+        if configuration.LLM_SINGLEFLIGHT:
+            return await self.flight.do(request_key(self.model, text), lambda: self.__request_embedding(text))
+        return await self.__request_embedding(text)
+
+    async def __request_embedding(self, text: str) -> List[float]:
         response = await self.client.embeddings(model=self.model, prompt=text)
         return response.embedding
 
+    @traced("embedder.embed_texts")
     async def embed_texts(self, texts: List[str]) -> List[List[float]]:
         """Embed a list of texts using the configured embedding model."""
         tasks = [self.__embed_single(text) for text in texts]
         embeddings = await asyncio.gather(*tasks)
         return embeddings
 
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed the texts with one batched request (Ollama `/api/embed`).
+        The vectors come back L2-normalized, which does not change cosine similarity.
+        """
+        response = await self.client.embed(model=self.model, input=texts)
+        return response.embeddings
+
+
+class EmbeddingService:
+    """
+    Application-scoped owner of the Embedder.
+    Model discovery, pull and the probe embedding run once in `start()` (from the app lifespan),
+    and every consumer shares the resulting Embedder. It is rebuilt only when the model changes.
+    """
+
+    def __init__(self):
+        self._embedder: Optional[Embedder] = None
+        self._query_embedder: Optional[BatchingEmbedder] = None
+        self._lock = asyncio.Lock()
+        self.error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._embedder is not None
+
+    @property
+    def model(self) -> Optional[str]:
+        return self._embedder.model if self._embedder else None
+
+    @property
+    def embedder(self) -> Embedder:
+        """
+        The shared Embedder, raises if `start()` has not completed.
+        """
+        if self._embedder is None:
+            raise RuntimeError("Embedding service is not ready")
+        return self._embedder
+
+    async def start(self, model: Optional[str] = None) -> Embedder:
+        """
+        Create the shared Embedder, or rebuild it if `model` differs from the current one.
+        Concurrent callers wait for the same initialization.
+        """
+        model = model or configuration.EMBED_MODEL
+        async with self._lock:
+            if self._embedder is not None and self._embedder.model == model:
+                return self._embedder
+            try:
+                self._embedder = await Embedder.create(model)
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+                raise
+            rag_logger.info(f"Embedding service ready with {model} (dimension {self._embedder.embedding_len}).")
+            return self._embedder
+
+    async def get(self) -> Embedder:
+        """
+        The shared Embedder, initializing it first if needed (scripts and jobs outside the app lifespan).
+        """
+        if self._embedder is not None:
+            return self._embedder
+        return await self.start()
+
+    async def get_query_embedder(self):
+        """
+        Embedder for search queries. With EMBED_BATCHING, concurrent queries are coalesced
+        into batched embed calls, otherwise this is the shared Embedder.
+        """
+        embedder = await self.get()
+        if not configuration.EMBED_BATCHING:
+            return embedder
+        if self._query_embedder is None or self._query_embedder.embedder is not embedder:
+            self._query_embedder = BatchingEmbedder(
+                embedder,
+                max_batch=configuration.EMBED_BATCH_MAX,
+                max_wait=configuration.EMBED_BATCH_WAIT_MS / 1000,
+                single_flight=configuration.LLM_SINGLEFLIGHT,
+            )
+        return self._query_embedder
+
+
+embedding_service = EmbeddingService()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """
+    Returns the application-scoped embedding service.
+    """
+    return embedding_service
+
 
 if __name__ == "__main__":
     # Quick test to ensure the embedder works
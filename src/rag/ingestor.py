@@ -2,7 +2,7 @@ import asyncio
 import csv
 import os
 from concurrent.futures import ThreadPoolExecutor
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional
 from uuid import uuid4
@@ -10,10 +10,26 @@ from uuid import uuid4
 import aiofiles
 from qdrant_client.models import PointStruct
 
-from ..config import configuration
-from .embedder import Embedder
+from .embedder import Embedder, get_embedding_service
 from .logger import rag_logger
-from .qdrant import get_qdrant_client
+from .partitions import target_collection
+from .qdrant import get_qdrant_client, sparse_enabled
+from .sparse import SPARSE_VECTOR_NAME, encode_document
+from .utils import extract_tickers
+
+
+@dataclass
+class ArticleMetadata:
+    """
+    Structured article information stored next to every chunk of the article.
+    `published_at` is an RFC 3339 datetime string so Qdrant can range-filter on it.
+    """
+
+    title: Optional[str] = None
+    url: Optional[str] = None
+    news_source: Optional[str] = None
+    published_at: Optional[str] = None
+    tickers: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -22,14 +38,22 @@ class DocumentChunk:
     chunk_id: int
     text: str
     created_at: str
+    metadata: ArticleMetadata = field(default_factory=ArticleMetadata)
 
     def to_payload(self) -> dict:
-        return {
+        payload = {
             "source": self.source,
             "chunk_id": self.chunk_id,
             "text": self.text,
             "created_at": self.created_at,
+            "tickers": self.metadata.tickers,
         }
+        # Unset fields are left out so they never match a payload filter
+        for key in ("title", "url", "news_source", "published_at"):
+            value = getattr(self.metadata, key)
+            if value is not None:
+                payload[key] = value
+        return payload
 
 
 def __make_chunk(text: str, max_length: int = 200) -> List[str]:
@@ -74,39 +98,24 @@ async def read_csv(file_path: str) -> List[str]:
     return results
 
 
-async def ingest_file(
-    file_path: str,
+async def __upsert_chunks(
+    chunks: List[str],
     *,
-    embedder: Optional[Embedder] = None,
-):
+    source: str,
+    embedder: Embedder,
+    metadata: ArticleMetadata,
+) -> int:
     """
-    Ingests a file and returns a list of PointStructs for Qdrant.
+    Embeds the chunks and upserts them into Qdrant. Returns the number of points written.
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File {file_path} does not exist.")
-    if not file_path.endswith('.txt') and not file_path.endswith('.csv'):
-        rag_logger.warning(f"Skipping unsupported file type: {file_path}")
-        return
-    if embedder is None:
-        embedder = await Embedder.create()
-
-    chunks = None
-    if file_path.endswith('.txt'):
-        chunks = await read_txt(file_path)
-    elif file_path.endswith('.csv'):
-        chunks = await read_csv(file_path)
-    if not chunks:
-        rag_logger.warning(f"No content to ingest from {file_path}")
-        return
-
     timestamp = datetime.now().isoformat()
-    file_name = os.path.basename(file_path)
     chunks = [
         DocumentChunk(
-            source=file_name,
+            source=source,
             chunk_id=i,
             text=chunk,
             created_at=timestamp,
+            metadata=metadata,
         )
         for i, chunk in enumerate(chunks)
     ]
@@ -114,23 +123,81 @@ async def ingest_file(
     texts = [chunk.text for chunk in chunks]
     embeddings = await embedder.embed_texts(texts)
 
+    with_sparse = sparse_enabled()
     points = [
         PointStruct(
             id=str(uuid4()),
-            vector=embedding,
+            vector={"": embedding, SPARSE_VECTOR_NAME: encode_document(chunk.text)} if with_sparse else embedding,
             payload=chunk.to_payload(),
         )
         for chunk, embedding in zip(chunks, embeddings)
     ]
     await get_qdrant_client().upsert(
-        collection_name=configuration.QDRANT_COLLECTION,
+        collection_name=await target_collection(metadata.published_at),
         points=points,
     )
-    rag_logger.debug(f"Ingested {len(points)} points from {file_path} into Qdrant.")
+    return len(points)
+
+
+async def ingest_text(
+    text: str,
+    *,
+    source: str,
+    embedder: Optional[Embedder] = None,
+    metadata: Optional[ArticleMetadata] = None,
+) -> int:
+    """
+    Ingests an in-memory text (e.g. a freshly crawled article) without staging it on disk.
+    Returns the number of points written to Qdrant.
+    """
+    if embedder is None:
+        embedder = await get_embedding_service().get()
+    if metadata is None:
+        metadata = ArticleMetadata()
+    if not metadata.tickers:
+        metadata.tickers = extract_tickers(text)
+    chunks = await chunk_text(text)
+    if not chunks:
+        rag_logger.warning(f"No content to ingest from {source}")
+        return 0
+    total = await __upsert_chunks(chunks, source=source, embedder=embedder, metadata=metadata)
+    rag_logger.debug(f"Ingested {total} points from {source} into Qdrant.")
+    return total
+
+
+async def ingest_file(
+    file_path: str,
+    *,
+    embedder: Optional[Embedder] = None,
+):
+    """
+    Ingests a file and upserts its chunks into Qdrant.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File {file_path} does not exist.")
+    if not file_path.endswith('.txt') and not file_path.endswith('.csv'):
+        rag_logger.warning(f"Skipping unsupported file type: {file_path}")
+        return
+    if embedder is None:
+        embedder = await get_embedding_service().get()
+
+    chunks = None
+    if file_path.endswith('.txt'):
+        chunks = await read_txt(file_path)
+    elif file_path.endswith('.csv'):
+        chunks = await read_csv(file_path)
+    if not chunks:
+        rag_logger.warning(f"No content to ingest from {file_path}")
+        return
+
+    file_name = os.path.basename(file_path)
+    metadata = ArticleMetadata(tickers=extract_tickers("".join(chunks)))
+    total = await __upsert_chunks(chunks, source=file_name, embedder=embedder, metadata=metadata)
+    rag_logger.debug(f"Ingested {total} points from {file_path} into Qdrant.")
 
 
 async def ingest_folder(folder_path: str):
-    embedders = await Embedder.create()
+    embedder = await get_embedding_service().get()
     total = 0
     files = []
     for root, _, filenames in os.walk(folder_path):
@@ -140,7 +207,7 @@ async def ingest_folder(folder_path: str):
     rag_logger.info(f"Found {len(files)} files in folder {folder_path} for ingestion.")
     for file in files:
         if os.path.isfile(file) and (file.endswith('.txt') or file.endswith('.csv')):
-            await ingest_file(file, embedder=embedders)
+            await ingest_file(file, embedder=embedder)
             total += 1
         else:
             rag_logger.warning(f"Skipping non-file: {file}")
@@ -0,0 +1,794 @@
+"""
+In-process vector store for single-node and CI deployments (VECTOR_BACKEND=local).
+
+It implements the subset of `AsyncQdrantClient` the app uses (collections, aliases, payload indexes,
+upsert/scroll/count, dense and BM25 sparse `query_points` with payload filters) and returns the same
+response models, so the retriever, ingestor and migration tools run unchanged.
+
+Layout of a collection directory under VECTOR_LOCAL_PATH:
+    collection.json   vector size, sparse vectors, payload indexes, metadata, requested storage layout
+    vectors.f32       memory-mapped float32 matrix of L2-normalized vectors, one row per point version
+    points.jsonl      append-only log of (id, row, payload, sparse vector), replayed on load
+
+Dense search is a vectorized cosine top-k over the matrix, or over the rows of the nearest
+VECTOR_LOCAL_IVF_PROBES inverted-file lists when VECTOR_LOCAL_IVF_LISTS > 0.
+"""
+
+import asyncio
+import json
+import math
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from httpx import Headers
+from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client.models import (
+    AliasDescription,
+    CollectionConfig,
+    CollectionDescription,
+    CollectionInfo,
+    CollectionParams,
+    CollectionsAliasesResponse,
+    CollectionsResponse,
+    CollectionStatus,
+    CountResult,
+    CreateAliasOperation,
+    DeleteAliasOperation,
+    Distance,
+    FieldCondition,
+    Filter,
+    HnswConfig,
+    HnswConfigDiff,
+    MatchAny,
+    MatchValue,
+    OptimizersConfig,
+    PayloadIndexInfo,
+    PayloadSchemaType,
+    PointStruct,
+    QuantizationConfig,
+    Record,
+    ScoredPoint,
+    SnapshotDescription,
+    SparseVector,
+    SparseVectorParams,
+    UpdateResult,
+    UpdateStatus,
+    VectorParams,
+)
+from qdrant_client.http.models import QueryResponse  # qdrant_client.models.QueryResponse is the fastembed one
+
+from .logger import rag_logger
+
+PointId = Union[int, str]
+_INITIAL_CAPACITY = 1024
+_IVF_MIN_POINTS_PER_LIST = 39  # Fewer training points than this per list gives poor centroids
+_IVF_TRAIN_ITERATIONS = 10
+_RANGE_BOUNDS = (("gte", np.greater_equal), ("gt", np.greater), ("lte", np.less_equal), ("lt", np.less))
+
+
+def _timestamp(value: Any) -> float:
+    """
+    Seconds since the epoch of a datetime or RFC 3339 string, naive values are UTC like in Qdrant.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _write_json(path: str, data: Any) -> None:
+    """
+    Replaces the file atomically, a process following the store never reads half of it.
+    """
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False)
+    os.replace(f"{path}.tmp", path)
+
+
+def _error(status_code: int, reason: str, message: str) -> UnexpectedResponse:
+    """
+    Errors are raised like the Qdrant server reports them, so callers handle both backends alike.
+    """
+    return UnexpectedResponse(status_code, reason, json.dumps({"status": {"error": message}}).encode(), Headers())
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class _IvfIndex:
+    """
+    Inverted-file partitioning: k-means centroids, every row assigned to its nearest centroid.
+    Rows added later are assigned incrementally, the centroids are retrained when the collection doubles.
+    Shared by the searches running in worker threads, which update it under a lock.
+    """
+
+    def __init__(self, lists: int, probes: int):
+        self.lists = lists
+        self.probes = probes
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments = np.empty(0, dtype=np.int32)
+        self.trained_rows = 0
+        self.__list_order: Optional[np.ndarray] = None
+        self.__list_bounds: Optional[np.ndarray] = None
+        self.__lock = threading.Lock()
+
+    def candidates(self, vectors: np.ndarray, rows: int, query: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Rows below `rows` in the `probes` lists nearest to the query, None while the collection is too small
+        to partition.
+        """
+        if rows < self.lists * _IVF_MIN_POINTS_PER_LIST:
+            return None
+        with self.__lock:
+            if self.centroids is None or rows > 2 * self.trained_rows:
+                self.__train(vectors[:rows])
+            elif len(self.assignments) < rows:
+                added = self.__assign(vectors[len(self.assignments) : rows])
+                self.assignments = np.concatenate([self.assignments, added])
+                self.__list_order = None
+            if self.__list_order is None:
+                # Rows grouped by list, so probing a list is a slice instead of a scan of every assignment
+                self.__list_order = np.argsort(self.assignments, kind="stable")
+                self.__list_bounds = np.searchsorted(self.assignments[self.__list_order], np.arange(self.lists + 1))
+            centroids, list_order, list_bounds = self.centroids, self.__list_order, self.__list_bounds
+        probed = np.argsort(-(centroids @ query))[: self.probes]
+        candidates = np.sort(np.concatenate([list_order[list_bounds[i] : list_bounds[i + 1]] for i in probed]))
+        # A concurrent search may have assigned rows appended after this one started
+        return candidates[candidates < rows]
+
+    def __train(self, vectors: np.ndarray) -> None:
+        rng = np.random.default_rng(0)
+        sample_size = min(len(vectors), self.lists * 256)
+        sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+        centroids = sample[rng.choice(sample_size, self.lists, replace=False)]
+        for _ in range(_IVF_TRAIN_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for list_id in range(self.lists):
+                members = sample[labels == list_id]
+                if len(members):
+                    centroids[list_id] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+        self.centroids = centroids.astype(np.float32)
+        self.assignments = self.__assign(vectors)
+        self.trained_rows = len(vectors)
+        self.__list_order = None
+
+    def __assign(self, vectors: np.ndarray, chunk: int = 65536) -> np.ndarray:
+        return np.concatenate(
+            [
+                np.argmax(np.asarray(vectors[i : i + chunk]) @ self.centroids.T, axis=1)
+                for i in range(0, len(vectors), chunk)
+            ]
+            or [np.empty(0, dtype=np.int64)]
+        ).astype(np.int32)
+
+
+class _Collection:
+    def __init__(self, path: str, config: Dict[str, Any], ivf_lists: int, ivf_probes: int):
+        self.path = path
+        self.config = config
+        self.dim: int = config["size"]
+        self.ids: List[PointId] = []  # Point id of every row, dead rows included
+        self.row_of: Dict[PointId, int] = {}  # Live row of every point
+        self.alive = np.zeros(0, dtype=bool)
+        self.payloads: List[Optional[dict]] = []
+        self.sparse: Dict[str, List[Optional[Tuple[List[int], List[float]]]]] = {
+            name: [] for name in config["sparse_vectors"]
+        }
+        # term -> rows and values, dead rows are skipped through `alive`
+        self.postings: Dict[str, Dict[int, Tuple[List[int], List[float]]]] = {
+            name: {} for name in config["sparse_vectors"]
+        }
+        self.document_frequency: Dict[str, Dict[int, int]] = {name: {} for name in config["sparse_vectors"]}
+        self.keyword_index: Dict[str, Dict[Any, List[int]]] = {}
+        self.datetime_index: Dict[str, np.ndarray] = {}
+        self.ivf = _IvfIndex(ivf_lists, ivf_probes) if ivf_lists > 0 else None
+        self.vectors = self.__open_vectors(max(_INITIAL_CAPACITY, self.__stored_capacity()))
+        for field_name, schema in config["payload_indexes"].items():
+            self.__build_index(field_name, schema)
+        self.__config_mtime = os.stat(os.path.join(path, "collection.json")).st_mtime_ns
+        self.__log_offset = 0  # Bytes of points.jsonl applied so far
+        self.refresh()
+
+    @property
+    def rows(self) -> int:
+        return len(self.ids)
+
+    @property
+    def points_count(self) -> int:
+        return len(self.row_of)
+
+    def __stored_capacity(self) -> int:
+        path = os.path.join(self.path, "vectors.f32")
+        return os.path.getsize(path) // (self.dim * 4) if os.path.exists(path) else 0
+
+    def __open_vectors(self, capacity: int) -> np.memmap:
+        path = os.path.join(self.path, "vectors.f32")
+        with open(path, "ab") as file:
+            if file.tell() < capacity * self.dim * 4:
+                file.truncate(capacity * self.dim * 4)
+        return np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def save_config(self) -> None:
+        config_path = os.path.join(self.path, "collection.json")
+        _write_json(config_path, self.config)
+        self.__config_mtime = os.stat(config_path).st_mtime_ns
+
+    def replaced(self) -> bool:
+        """
+        True if the writing process deleted the collection and created it again under the same name (e.g. a
+        month partition dropped and re-created) since it was loaded: its files are new, it must be loaded again.
+        """
+        config_path = os.path.join(self.path, "collection.json")
+        log_path = os.path.join(self.path, "points.jsonl")
+        try:
+            mtime = os.stat(config_path).st_mtime_ns
+            size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+        except FileNotFoundError:
+            # Deleted, `LocalVectorStore` drops it
+            return False
+        if size < self.__log_offset:
+            return True
+        if mtime == self.__config_mtime:
+            return False
+        with open(config_path, encoding="utf-8") as file:
+            return json.load(file).get("created") != self.config.get("created")
+
+    def refresh(self) -> None:
+        """
+        Applies what the writing process (e.g. the crawler worker) changed since the last call: metadata,
+        payload indexes and the points appended to the log. Only complete lines of the log are applied.
+        """
+        config_path = os.path.join(self.path, "collection.json")
+        mtime = os.stat(config_path).st_mtime_ns
+        if mtime != self.__config_mtime:
+            self.__config_mtime = mtime
+            with open(config_path, encoding="utf-8") as file:
+                config = json.load(file)
+            self.config["metadata"] = config["metadata"]
+            for field_name, schema in config["payload_indexes"].items():
+                if field_name not in self.config["payload_indexes"]:
+                    self.config["payload_indexes"][field_name] = schema
+                    self.__build_index(field_name, schema)
+        log_path = os.path.join(self.path, "points.jsonl")
+        size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+        if size <= self.__log_offset:
+            return
+        with open(log_path, "rb") as file:
+            file.seek(self.__log_offset)
+            data = file.read(size - self.__log_offset)
+        complete = data.rfind(b"\n") + 1
+        self.__log_offset += complete
+        for line in data[:complete].splitlines():
+            entry = json.loads(line)
+            self.__apply(entry["id"], entry["row"], entry["payload"], entry.get("sparse") or {})
+
+    def __apply(self, point_id: PointId, row: int, payload: dict, sparse: Dict[str, list]) -> None:
+        """
+        Makes `row` the live version of `point_id`, the previous row of the point becomes dead.
+        """
+        previous = self.row_of.get(point_id)
+        if previous is not None:
+            self.alive[previous] = False
+            for name, entry in self.sparse.items():
+                if entry[previous] is not None:
+                    for term in entry[previous][0]:
+                        self.document_frequency[name][term] -= 1
+        if row >= len(self.vectors):
+            # Grown by the writing process
+            self.vectors = self.__open_vectors(max(row + 1, self.__stored_capacity()))
+        if row >= len(self.alive):
+            grown = np.zeros(max(row + 1, 2 * len(self.alive)), dtype=bool)
+            grown[: len(self.alive)] = self.alive
+            self.alive = grown
+        self.ids.append(point_id)
+        self.row_of[point_id] = row
+        self.alive[row] = True
+        self.payloads.append(payload)
+        for name, entry in self.sparse.items():
+            vector = sparse.get(name)
+            entry.append(tuple(vector) if vector else None)
+            if vector:
+                for term, value in zip(*vector):
+                    rows, values = self.postings[name].setdefault(term, ([], []))
+                    rows.append(row)
+                    values.append(value)
+                    self.document_frequency[name][term] = self.document_frequency[name].get(term, 0) + 1
+        for field_name in self.keyword_index:
+            self.__index_keyword(field_name, row, payload)
+        for field_name in self.datetime_index:
+            self.__index_datetime(field_name, row, payload)
+
+    def upsert(self, points: Sequence[PointStruct]) -> None:
+        self.refresh()
+        start = self.rows
+        if start + len(points) > len(self.vectors):
+            self.vectors.flush()
+            capacity = len(self.vectors)
+            while capacity < start + len(points):
+                capacity *= 2
+            self.vectors = self.__open_vectors(capacity)
+        dense = np.empty((len(points), self.dim), dtype=np.float32)
+        entries = []
+        for i, point in enumerate(points):
+            vector = point.vector
+            sparse = {}
+            if isinstance(vector, dict):
+                sparse = {
+                    name: [list(value.indices), list(value.values)]
+                    for name, value in vector.items()
+                    if isinstance(value, SparseVector) and name in self.sparse
+                }
+                vector = vector[""]
+            dense[i] = vector
+            entries.append({"id": point.id, "row": start + i, "payload": point.payload or {}, "sparse": sparse})
+        self.vectors[start : start + len(points)] = _normalize(dense)
+        self.vectors.flush()
+        with open(os.path.join(self.path, "points.jsonl"), "a", encoding="utf-8") as file:
+            file.writelines(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        self.refresh()
+
+    def create_index(self, field_name: str, schema: PayloadSchemaType) -> None:
+        if field_name in self.config["payload_indexes"]:
+            return
+        self.config["payload_indexes"][field_name] = str(schema)
+        self.save_config()
+        self.__build_index(field_name, str(schema))
+
+    def __build_index(self, field_name: str, schema: str) -> None:
+        if schema == PayloadSchemaType.DATETIME:
+            self.datetime_index[field_name] = np.full(0, np.nan)
+            for row, payload in enumerate(self.payloads):
+                self.__index_datetime(field_name, row, payload)
+        else:
+            self.keyword_index[field_name] = {}
+            for row, payload in enumerate(self.payloads):
+                self.__index_keyword(field_name, row, payload)
+
+    def __index_keyword(self, field_name: str, row: int, payload: dict) -> None:
+        values = payload.get(field_name)
+        if values is None:
+            return
+        for value in values if isinstance(values, list) else [values]:
+            self.keyword_index[field_name].setdefault(value, []).append(row)
+
+    def __index_datetime(self, field_name: str, row: int, payload: dict) -> None:
+        column = self.datetime_index[field_name]
+        if row >= len(column):
+            grown = np.full(max(row + 1, 2 * len(column)), np.nan)
+            grown[: len(column)] = column
+            column = self.datetime_index[field_name] = grown
+        value = payload.get(field_name)
+        column[row] = _timestamp(value) if value else np.nan
+
+    def filter_mask(self, query_filter: Optional[Filter]) -> np.ndarray:
+        mask = self.alive[: self.rows].copy()
+        if query_filter is None:
+            return mask
+        for condition in query_filter.must or []:
+            mask &= self.__condition_mask(condition)
+        for condition in query_filter.must_not or []:
+            mask &= ~self.__condition_mask(condition)
+        if query_filter.should:
+            mask &= np.logical_or.reduce([self.__condition_mask(condition) for condition in query_filter.should])
+        return mask
+
+    def __condition_mask(self, condition: Union[FieldCondition, Filter]) -> np.ndarray:
+        if isinstance(condition, Filter):
+            return self.filter_mask(condition)
+        if not isinstance(condition, FieldCondition):
+            raise _error(400, "Bad Request", f"Unsupported filter condition in the local vector store: {condition}")
+        key = condition.key
+        mask = np.zeros(self.rows, dtype=bool)
+        if condition.match is not None:
+            if isinstance(condition.match, MatchValue):
+                wanted = {condition.match.value}
+            elif isinstance(condition.match, MatchAny):
+                wanted = set(condition.match.any)
+            else:
+                raise _error(400, "Bad Request", f"Unsupported match in the local vector store: {condition.match}")
+            if key in self.keyword_index:
+                for value in wanted:
+                    mask[self.keyword_index[key].get(value, [])] = True
+                return mask
+            for row, payload in enumerate(self.payloads):
+                values = (payload or {}).get(key)
+                mask[row] = bool(wanted.intersection(values if isinstance(values, list) else [values]))
+            return mask
+        if condition.range is not None:
+            bounds = condition.range
+            if key in self.datetime_index:
+                column = self.datetime_index[key][: self.rows]
+                if len(column) < self.rows:
+                    column = np.concatenate([column, np.full(self.rows - len(column), np.nan)])
+            else:
+                column = np.array(
+                    [self.__range_value((payload or {}).get(key)) for payload in self.payloads], dtype=float
+                )
+            # Comparisons with NaN (no value) are false, like a missing field in Qdrant
+            mask = ~np.isnan(column)
+            for bound, compare in _RANGE_BOUNDS:
+                value = getattr(bounds, bound, None)
+                if value is not None:
+                    mask &= compare(column, value if isinstance(value, (int, float)) else _timestamp(value))
+            return mask
+        raise _error(400, "Bad Request", f"Unsupported filter condition in the local vector store: {condition}")
+
+    @staticmethod
+    def __range_value(value: Any) -> float:
+        if value is None:
+            return np.nan
+        if isinstance(value, (int, float)):
+            return float(value)
+        return _timestamp(value)
+
+    # The searches filter on the event loop and return the scoring, which only reads what was captured then
+    # (row count, filter mask, vector matrix, posting list lengths). It runs in a worker thread while the
+    # event loop goes on applying points, which appends rows and replaces grown arrays.
+
+    def search_dense(
+        self,
+        query: Sequence[float],
+        query_filter: Optional[Filter],
+        limit: int,
+    ) -> Callable[[], List[Tuple[int, float]]]:
+        if len(query) != self.dim:
+            raise _error(
+                400, "Bad Request", f"Wrong input: Vector dimension error: expected dim: {self.dim}, got {len(query)}"
+            )
+        query = _normalize(np.asarray(query, dtype=np.float32))
+        mask = self.filter_mask(query_filter)
+        rows, vectors, ivf = self.rows, self.vectors, self.ivf
+
+        def score() -> List[Tuple[int, float]]:
+            candidates = ivf.candidates(vectors, rows, query) if ivf is not None else None
+            if candidates is None:
+                scores = np.asarray(vectors[:rows] @ query)
+                scores[~mask] = -np.inf
+                return self.__top(np.arange(rows), scores, limit)
+            hit_rows = candidates[mask[candidates]]
+            scores = np.asarray(vectors[hit_rows] @ query) if len(hit_rows) else np.empty(0, dtype=np.float32)
+            return self.__top(hit_rows, scores, limit)
+
+        return score
+
+    def search_sparse(
+        self,
+        name: str,
+        query: SparseVector,
+        query_filter: Optional[Filter],
+        limit: int,
+    ) -> Callable[[], List[Tuple[int, float]]]:
+        if name not in self.config["sparse_vectors"]:
+            raise _error(400, "Bad Request", f"Wrong input: Not existing vector name error: {name}")
+        mask = self.filter_mask(query_filter)
+        rows, points = self.rows, self.points_count
+        modifier = self.config["sparse_vectors"][name]
+        terms = []
+        for term, value in zip(query.indices, query.values):
+            term_rows, term_values = self.postings[name].get(term, ([], []))
+            if not term_rows:
+                continue
+            if modifier == "idf":
+                frequency = self.document_frequency[name].get(term, 0)
+                value *= math.log((points - frequency + 0.5) / (frequency + 0.5) + 1)
+            terms.append((term_rows, term_values, len(term_rows), value))
+
+        def score() -> List[Tuple[int, float]]:
+            scores = np.zeros(rows, dtype=np.float32)
+            for term_rows, term_values, length, value in terms:
+                np.add.at(scores, term_rows[:length], value * np.asarray(term_values[:length], dtype=np.float32))
+            scores[~(mask & (scores != 0))] = -np.inf
+            return self.__top(np.arange(rows), scores, limit)
+
+        return score
+
+    @staticmethod
+    def __top(rows: np.ndarray, scores: np.ndarray, limit: int) -> List[Tuple[int, float]]:
+        valid = np.count_nonzero(np.isfinite(scores))
+        k = min(limit, valid)
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+    def vector_of(self, row: int, names: Union[bool, Sequence[str]]) -> Any:
+        dense = self.vectors[row].tolist()
+        if names is True and not self.sparse:
+            return dense
+        vectors = {"": dense}
+        for name, entry in self.sparse.items():
+            if entry[row] is not None:
+                vectors[name] = SparseVector(indices=list(entry[row][0]), values=list(entry[row][1]))
+        if names is True:
+            return vectors
+        return {name: vector for name, vector in vectors.items() if name in names}
+
+    def info(self) -> CollectionInfo:
+        sparse_vectors = {
+            name: SparseVectorParams(modifier=modifier) for name, modifier in self.config["sparse_vectors"].items()
+        }
+        # Collections created before the layout was recorded are reported as the default profile
+        layout = self.config.get("layout", {})
+        return CollectionInfo(
+            status=CollectionStatus.GREEN,
+            optimizer_status="ok",
+            segments_count=1,
+            points_count=self.points_count,
+            indexed_vectors_count=self.points_count,
+            config=CollectionConfig(
+                params=CollectionParams(
+                    vectors=VectorParams(size=self.dim, distance=Distance.COSINE, on_disk=layout.get("on_disk", False)),
+                    sparse_vectors=sparse_vectors or None,
+                    on_disk_payload=layout.get("on_disk_payload", False),
+                ),
+                hnsw_config=HnswConfig(m=0, ef_construct=0, full_scan_threshold=0, on_disk=layout.get("hnsw_on_disk")),
+                optimizer_config=OptimizersConfig(default_segment_number=1, flush_interval_sec=0),
+                quantization_config=layout.get("quantization"),
+                metadata=self.config["metadata"] or None,
+            ),
+            payload_schema={
+                field_name: PayloadIndexInfo(data_type=schema, points=self.points_count)
+                for field_name, schema in self.config["payload_indexes"].items()
+            },
+        )
+
+
+class LocalVectorStore:
+    """
+    Drop-in for the `AsyncQdrantClient` calls made by `src.rag`, backed by NumPy files under `path`.
+    Searches run in a worker thread so a large matrix product does not block the event loop.
+    """
+
+    def __init__(self, path: str, *, ivf_lists: int = 0, ivf_probes: int = 8):
+        self.path = path
+        self.ivf_lists = ivf_lists
+        self.ivf_probes = ivf_probes
+        os.makedirs(path, exist_ok=True)
+        self._collections: Dict[str, _Collection] = {}
+        self._aliases: Dict[str, str] = {}
+        self.__aliases_mtime: Optional[int] = None
+        self.__sync()
+
+    def __sync(self) -> None:
+        """
+        Follows the collections and aliases created or deleted by another process sharing `path`,
+        e.g. the API following the crawler worker. One process writes, the others only read.
+        """
+        aliases_path = os.path.join(self.path, "aliases.json")
+        mtime = os.stat(aliases_path).st_mtime_ns if os.path.exists(aliases_path) else None
+        if mtime != self.__aliases_mtime:
+            self.__aliases_mtime = mtime
+            with open(aliases_path, encoding="utf-8") as file:
+                self._aliases = json.load(file)
+        names = {
+            name for name in os.listdir(self.path) if os.path.exists(os.path.join(self.path, name, "collection.json"))
+        }
+        for name in set(self._collections) - names:
+            del self._collections[name]
+        for name in sorted(names - set(self._collections)):
+            self.__load(name)
+
+    def __load(self, name: str) -> _Collection:
+        directory = os.path.join(self.path, name)
+        with open(os.path.join(directory, "collection.json"), encoding="utf-8") as file:
+            config = json.load(file)
+        collection = self._collections[name] = _Collection(directory, config, self.ivf_lists, self.ivf_probes)
+        rag_logger.info(f"Loaded local collection '{name}' with {collection.points_count} points")
+        return collection
+
+    def __save_aliases(self) -> None:
+        _write_json(os.path.join(self.path, "aliases.json"), self._aliases)
+        self.__aliases_mtime = os.stat(os.path.join(self.path, "aliases.json")).st_mtime_ns
+
+    def __get(self, name: str) -> _Collection:
+        self.__sync()
+        resolved = self._aliases.get(name, name)
+        collection = self._collections.get(resolved)
+        if collection is None:
+            raise _error(404, "Not Found", f"Not found: Collection `{name}` doesn't exist!")
+        if collection.replaced():
+            collection = self.__load(resolved)
+        collection.refresh()
+        return collection
+
+    async def get_collections(self) -> CollectionsResponse:
+        self.__sync()
+        return CollectionsResponse(collections=[CollectionDescription(name=name) for name in self._collections])
+
+    async def get_aliases(self) -> CollectionsAliasesResponse:
+        self.__sync()
+        return CollectionsAliasesResponse(
+            aliases=[
+                AliasDescription(alias_name=alias, collection_name=collection)
+                for alias, collection in self._aliases.items()
+            ]
+        )
+
+    async def collection_exists(self, collection_name: str) -> bool:
+        self.__sync()
+        return collection_name in self._collections
+
+    async def create_collection(
+        self,
+        collection_name: str,
+        vectors_config: Union[VectorParams, Dict[str, Any]],
+        sparse_vectors_config: Optional[Dict[str, SparseVectorParams]] = None,
+        on_disk_payload: Optional[bool] = None,
+        quantization_config: Optional[QuantizationConfig] = None,
+        hnsw_config: Optional[HnswConfigDiff] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> bool:
+        self.__sync()
+        if collection_name in self._collections or collection_name in self._aliases:
+            raise _error(400, "Bad Request", f"Wrong input: Collection `{collection_name}` already exists!")
+        if isinstance(vectors_config, dict):
+            size, on_disk = vectors_config["size"], vectors_config.get("on_disk")
+        else:
+            size, on_disk = vectors_config.size, vectors_config.on_disk
+        config = {
+            "size": size,
+            "sparse_vectors": {
+                name: str(params.modifier) if params.modifier else None
+                for name, params in (sparse_vectors_config or {}).items()
+            },
+            "payload_indexes": {},
+            "metadata": dict(metadata or {}),
+            # Tells readers that a collection deleted and created again under the same name is another one
+            "created": uuid.uuid4().hex,
+            # Only reported back by `info()`, so the profile checks see the profile the collection was created
+            # with. The store itself always memory-maps the vectors and keeps the payloads in RAM
+            "layout": {
+                "on_disk": bool(on_disk),
+                "on_disk_payload": bool(on_disk_payload),
+                "quantization": (
+                    quantization_config.model_dump(mode="json", exclude_none=True) if quantization_config else None
+                ),
+                "hnsw_on_disk": bool(hnsw_config and hnsw_config.on_disk),
+            },
+        }
+        directory = os.path.join(self.path, collection_name)
+        os.makedirs(directory, exist_ok=True)
+        _write_json(os.path.join(directory, "collection.json"), config)
+        self.__load(collection_name)
+        return True
+
+    async def get_collection(self, collection_name: str) -> CollectionInfo:
+        return self.__get(collection_name).info()
+
+    async def update_collection(
+        self,
+        collection_name: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> bool:
+        collection = self.__get(collection_name)
+        if metadata:
+            collection.config["metadata"].update(metadata)
+            collection.save_config()
+        return True
+
+    async def delete_collection(self, collection_name: str, **kwargs: Any) -> bool:
+        self.__sync()
+        collection = self._collections.pop(collection_name, None)
+        if collection is None:
+            return False
+        # Readers stop seeing the collection as soon as its config is gone
+        os.remove(os.path.join(collection.path, "collection.json"))
+        shutil.rmtree(collection.path, ignore_errors=True)
+        self._aliases = {alias: target for alias, target in self._aliases.items() if target != collection_name}
+        self.__save_aliases()
+        return True
+
+    async def update_collection_aliases(self, change_aliases_operations: Iterable[Any], **kwargs: Any) -> bool:
+        self.__sync()
+        aliases = dict(self._aliases)
+        for operation in change_aliases_operations:
+            if isinstance(operation, CreateAliasOperation):
+                target = operation.create_alias.collection_name
+                if target not in self._collections:
+                    raise _error(404, "Not Found", f"Not found: Collection `{target}` doesn't exist!")
+                aliases[operation.create_alias.alias_name] = target
+            elif isinstance(operation, DeleteAliasOperation):
+                aliases.pop(operation.delete_alias.alias_name, None)
+            else:
+                raise _error(400, "Bad Request", f"Unsupported alias operation in the local vector store: {operation}")
+        # Applied together, like Qdrant does
+        self._aliases = aliases
+        self.__save_aliases()
+        return True
+
+    async def create_payload_index(
+        self,
+        collection_name: str,
+        field_name: str,
+        field_schema: PayloadSchemaType,
+        **kwargs: Any,
+    ) -> UpdateResult:
+        self.__get(collection_name).create_index(field_name, field_schema)
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+    async def upsert(self, collection_name: str, points: Sequence[PointStruct], **kwargs: Any) -> UpdateResult:
+        self.__get(collection_name).upsert(points)
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+    async def count(self, collection_name: str, exact: bool = True, **kwargs: Any) -> CountResult:
+        return CountResult(count=self.__get(collection_name).points_count)
+
+    async def scroll(
+        self,
+        collection_name: str,
+        limit: int = 10,
+        offset: Optional[PointId] = None,
+        with_payload: bool = True,
+        with_vectors: Union[bool, Sequence[str]] = False,
+        **kwargs: Any,
+    ) -> Tuple[List[Record], Optional[PointId]]:
+        collection = self.__get(collection_name)
+        live_rows = np.flatnonzero(collection.alive[: collection.rows])
+        start = 0
+        if offset is not None:
+            start = int(np.searchsorted(live_rows, collection.row_of[offset]))
+        page = live_rows[start : start + limit]
+        records = [
+            Record(
+                id=collection.ids[row],
+                payload=collection.payloads[row] if with_payload else None,
+                vector=collection.vector_of(row, with_vectors) if with_vectors else None,
+            )
+            for row in page
+        ]
+        next_offset = collection.ids[live_rows[start + limit]] if start + limit < len(live_rows) else None
+        return records, next_offset
+
+    async def query_points(
+        self,
+        collection_name: str,
+        query: Union[Sequence[float], SparseVector],
+        using: Optional[str] = None,
+        query_filter: Optional[Filter] = None,
+        limit: int = 10,
+        with_payload: bool = True,
+        **kwargs: Any,
+    ) -> QueryResponse:
+        collection = self.__get(collection_name)
+        if isinstance(query, SparseVector):
+            score = collection.search_sparse(using, query, query_filter, limit)
+        else:
+            score = collection.search_dense(query, query_filter, limit)
+        hits = await asyncio.to_thread(score)
+        return QueryResponse(
+            points=[
+                ScoredPoint(
+                    id=collection.ids[row],
+                    version=0,
+                    score=score,
+                    payload=collection.payloads[row] if with_payload else None,
+                )
+                for row, score in hits
+            ]
+        )
+
+    async def create_snapshot(self, collection_name: str, **kwargs: Any) -> SnapshotDescription:
+        collection = self.__get(collection_name)
+        collection.vectors.flush()
+        now = datetime.now()
+        name = f"{os.path.basename(collection.path)}-{now:%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}"
+        target = os.path.join(self.path, ".snapshots", name)
+        await asyncio.to_thread(shutil.copytree, collection.path, target)
+        size = sum(os.path.getsize(os.path.join(target, file)) for file in os.listdir(target))
+        return SnapshotDescription(name=name, creation_time=now.isoformat(), size=size)
+
+    async def close(self, **kwargs: Any) -> None:
+        for collection in self._collections.values():
+            collection.vectors.flush()
@@ -0,0 +1,161 @@
+"""
+Rebuild the RAG collection into another storage profile without re-embedding:
+
+    python -m src.rag.migrate status
+    python -m src.rag.migrate --profile compact
+
+The points (vectors and payloads) are copied into a new collection named
+`<QDRANT_COLLECTION>_<profile>_<timestamp>`, then `QDRANT_COLLECTION` becomes an alias of it.
+Stop the crawler worker first, points written during the copy are not carried over.
+`--keep-old` is refused for a plain `QDRANT_COLLECTION` collection (from older versions), it is
+deleted to create the alias.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from qdrant_client.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    PointStruct,
+)
+
+from ..config import configuration
+from . import qdrant
+from .logger import rag_logger
+from .profiles import PROFILES, CollectionProfile, get_profile
+
+
+async def copy_points(source: str, target: str, *, batch_size: int = 256) -> int:
+    """
+    Copies every point of `source` into `target` as is. Returns the number of points copied.
+    """
+    client = qdrant.get_qdrant_client()
+    copied = 0
+    offset = None
+    while True:
+        points, offset = await client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if points:
+            await client.upsert(
+                collection_name=target,
+                points=[PointStruct(id=point.id, vector=point.vector, payload=point.payload) for point in points],
+            )
+            copied += len(points)
+            rag_logger.info(f"Copied {copied} points into '{target}'")
+        if offset is None:
+            return copied
+
+
+async def switch_alias(alias: str, collection: str) -> Optional[str]:
+    """
+    Points `alias` at `collection` and returns the collection it pointed at before.
+    An existing alias is swapped in one request. A plain collection named `alias` (created before
+    collections were put behind an alias) is deleted first, it cannot be kept and queries to it fail
+    until the other processes follow the alias.
+    """
+    client = qdrant.get_qdrant_client()
+    previous = await qdrant.resolve_collection(alias)
+    operations = [CreateAliasOperation(create_alias=CreateAlias(collection_name=collection, alias_name=alias))]
+    if previous == alias:
+        await client.delete_collection(alias)
+        previous = None
+    elif previous is not None:
+        operations.insert(0, DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+    await client.update_collection_aliases(change_aliases_operations=operations)
+    return previous
+
+
+async def migrate_collection(
+    profile: CollectionProfile,
+    *,
+    alias: str = configuration.QDRANT_COLLECTION,
+    batch_size: int = 256,
+    keep_old: bool = False,
+) -> str:
+    """
+    Rebuilds the collection behind `alias` with `profile` and switches the alias to it.
+    Returns the name of the new collection.
+    """
+    client = qdrant.get_qdrant_client()
+    source = await qdrant.resolve_collection(alias)
+    if source is None:
+        raise ValueError(f"Collection '{alias}' does not exist")
+    info = await client.get_collection(source)
+    if profile.matches(info):
+        rag_logger.info(f"Collection '{source}' already uses profile '{profile.name}'")
+        return source
+    if source == alias and keep_old:
+        # The alias needs the name of the plain collection, switch_alias deletes it
+        raise ValueError(
+            f"'{alias}' is a plain collection, the switch deletes it to create the alias so it cannot be kept. "
+            "Snapshot it if a rollback is needed and run without --keep-old."
+        )
+
+    target = f"{alias}_{profile.name}_{datetime.now():%Y%m%d%H%M%S}"
+    await qdrant.create_collection(
+        target,
+        qdrant.vector_size(info),
+        profile,
+        sparse_vectors_config=info.config.params.sparse_vectors,
+        metadata=info.config.metadata,
+    )
+    try:
+        copied = await copy_points(source, target, batch_size=batch_size)
+        expected = (await client.count(source, exact=True)).count
+        if copied != expected:
+            raise RuntimeError(f"'{source}' changed during the copy ({copied} copied, {expected} now), retry")
+    except BaseException:
+        await client.delete_collection(target)
+        raise
+
+    previous = await switch_alias(alias, target)
+    rag_logger.info(f"'{alias}' now points at '{target}' ({copied} points, profile '{profile.name}')")
+    if previous is not None and not keep_old:
+        await client.delete_collection(previous)
+        rag_logger.info(f"Deleted previous collection '{previous}'")
+    return target
+
+
+async def status(alias: str = configuration.QDRANT_COLLECTION) -> None:
+    client = qdrant.get_qdrant_client()
+    source = await qdrant.resolve_collection(alias)
+    if source is None:
+        print(f"Collection '{alias}' does not exist")
+        return
+    info = await client.get_collection(source)
+    profile = next((p.name for p in PROFILES.values() if p.matches(info)), "custom")
+    print(
+        f"'{alias}' -> '{source}': {info.points_count} points, dimension {qdrant.vector_size(info)}, "
+        f"profile '{profile}' (configured: '{configuration.QDRANT_PROFILE}'), "
+        f"embedded with {qdrant.embed_model_of(info) or 'an unrecorded model'}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    qdrant.get_qdrant_client()
+    try:
+        if args.command == "status":
+            await status()
+        else:
+            await migrate_collection(get_profile(args.profile), batch_size=args.batch_size, keep_old=args.keep_old)
+    finally:
+        await qdrant.get_qdrant_client().close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", choices=["migrate", "status"], default="migrate")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=None, help="Default: QDRANT_PROFILE")
+    parser.add_argument("--batch-size", type=int, default=256, help="Points per scroll/upsert request")
+    parser.add_argument("--keep-old", action="store_true", help="Keep the previous collection for a rollback")
+    asyncio.run(main(parser.parse_args()))
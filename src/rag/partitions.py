@@ -0,0 +1,169 @@
+import asyncio
+import re
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from ..config import configuration
+from . import qdrant
+from .embedder import get_embedding_service
+from .logger import rag_logger
+from .profiles import get_profile
+
+# Month partitions known to this process, refreshed from Qdrant every PARTITION_REFRESH_SECONDS
+# so partitions created by the crawler worker become searchable without a restart
+_partitions: Dict[date, str] = {}
+# QDRANT_COLLECTION from before partitioning was enabled, searched along with the partitions
+_legacy: Optional[str] = None
+# Collections left out of searches (another embedding model, ...) with the reason, logged when it changes
+_skipped: Dict[str, str] = {}
+_refreshed_at: float = 0.0
+_create_lock = asyncio.Lock()  # Concurrent ingest workers must not create the same partition twice
+PARTITION_REFRESH_SECONDS = 60.0
+
+
+def partition_name(month: date, base: str = qdrant.COLLECTION_NAME) -> str:
+    return f"{base}_{month:%Y_%m}"
+
+
+def month_of(published_at: Optional[str]) -> date:
+    """
+    First day of the month an article belongs to, articles without a date go into the current month.
+    """
+    moment = datetime.fromisoformat(published_at) if published_at else datetime.now()
+    return moment.date().replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def __find_partitions(base: str) -> Dict[date, str]:
+    pattern = re.compile(rf"^{re.escape(base)}_(\d{{4}})_(\d{{2}})$")
+    collections = await qdrant.get_qdrant_client().get_collections()
+    found = {}
+    for collection in collections.collections:
+        match = pattern.match(collection.name)
+        if match:
+            found[date(int(match.group(1)), int(match.group(2)), 1)] = collection.name
+    return found
+
+
+async def refresh_partitions(base: str = qdrant.COLLECTION_NAME) -> Dict[date, str]:
+    """
+    Re-lists the partitions and checks which of them, and of the collection from before partitioning,
+    can be searched with the current embedding model.
+    """
+    global _refreshed_at, _legacy
+    found = await __find_partitions(base)
+    legacy = await qdrant.resolve_collection(base)
+    names = list(found.values()) + ([legacy] if legacy is not None else [])
+    reasons = await asyncio.gather(*(qdrant.search_incompatibility(name) for name in names))
+    skipped = {name: reason for name, reason in zip(names, reasons) if reason is not None}
+    for name, reason in skipped.items():
+        if _skipped.get(name) != reason:
+            rag_logger.warning(f"'{name}' is not searched: {reason}")
+    _partitions.clear()
+    _partitions.update(found)
+    _skipped.clear()
+    _skipped.update(skipped)
+    _legacy = legacy
+    _refreshed_at = time.monotonic()
+    return dict(_partitions)
+
+
+async def partitions_model(base: str = qdrant.COLLECTION_NAME) -> Optional[str]:
+    """
+    The embedding model recorded on the newest partition, new partitions are embedded with it
+    so they can be searched together with the existing ones. None if no partition records one.
+    """
+    client = qdrant.get_qdrant_client()
+    for _, name in sorted((await __find_partitions(base)).items(), reverse=True):
+        model = qdrant.embed_model_of(await client.get_collection(name))
+        if model is not None:
+            return model
+    return None
+
+
+async def list_partitions() -> Dict[date, str]:
+    if time.monotonic() - _refreshed_at > PARTITION_REFRESH_SECONDS:
+        await refresh_partitions()
+    return dict(_partitions)
+
+
+async def ensure_partition(month: date) -> str:
+    """
+    Returns the collection of `month`, created with the configured profile and the current embedding model
+    if it does not exist yet.
+    """
+    name = _partitions.get(month)
+    if name is not None:
+        return name
+    async with _create_lock:
+        if month in _partitions:
+            return _partitions[month]
+        name = partition_name(month)
+        if not await qdrant.get_qdrant_client().collection_exists(name):
+            await qdrant.create_collection(
+                name,
+                qdrant.EMBEDDING_DIM,
+                get_profile(),
+                sparse_vectors_config=qdrant.default_sparse_vectors(),
+                metadata={qdrant.EMBED_MODEL_KEY: get_embedding_service().model},
+            )
+        _partitions[month] = name
+    return name
+
+
+async def target_collection(published_at: Optional[str]) -> str:
+    """
+    The collection a chunk is written to: its month partition, or QDRANT_COLLECTION without partitioning.
+    """
+    if not configuration.QDRANT_PARTITIONING:
+        return qdrant.COLLECTION_NAME
+    return await ensure_partition(month_of(published_at))
+
+
+async def search_partitions(since: Optional[datetime] = None) -> List[str]:
+    """
+    Partitions a query searches, newest first: the months from `since` (a published_at filter)
+    up to now, or the recent window of QDRANT_SEARCH_MONTHS months. The collection from before
+    partitioning comes last, its articles are of any month. Collections that cannot be searched
+    with the current embedding model are left out, see `refresh_partitions`.
+    """
+    newest = date.today().replace(day=1)
+    if since is not None:
+        oldest = since.date().replace(day=1)
+    else:
+        oldest = add_months(newest, 1 - configuration.QDRANT_SEARCH_MONTHS)
+    partitions = await list_partitions()
+    names = [partitions[month] for month in sorted(partitions, reverse=True) if month >= oldest]
+    if _legacy is not None:
+        names.append(_legacy)
+    return [name for name in names if name not in _skipped]
+
+
+async def apply_retention(today: Optional[date] = None) -> List[str]:
+    """
+    Drops the partitions older than QDRANT_RETENTION_MONTHS, after a snapshot of each one if
+    QDRANT_ARCHIVE_SNAPSHOTS is set. Returns the dropped collections. Does nothing without
+    QDRANT_PARTITIONING, `_YYYY_MM` collections left from when it was on are not touched.
+    """
+    if not configuration.QDRANT_PARTITIONING or configuration.QDRANT_RETENTION_MONTHS <= 0:
+        return []
+    client = qdrant.get_qdrant_client()
+    current = (today or date.today()).replace(day=1)
+    oldest_kept = add_months(current, 1 - configuration.QDRANT_RETENTION_MONTHS)
+    dropped = []
+    for month, name in sorted((await refresh_partitions()).items()):
+        if month >= oldest_kept:
+            continue
+        if configuration.QDRANT_ARCHIVE_SNAPSHOTS:
+            snapshot = await client.create_snapshot(collection_name=name, wait=True)
+            rag_logger.info(f"Archived partition '{name}' as snapshot '{snapshot.name}'")
+        await client.delete_collection(name)
+        _partitions.pop(month, None)
+        dropped.append(name)
+        rag_logger.info(f"Dropped partition '{name}' (retention {configuration.QDRANT_RETENTION_MONTHS} months)")
+    return dropped
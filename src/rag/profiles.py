@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CollectionInfo,
+    Distance,
+    HnswConfigDiff,
+    QuantizationConfig,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+from ..config import configuration
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    """
+    Storage layout of the RAG collection, selected with `QDRANT_PROFILE`.
+    Quantized profiles keep only the compressed vectors in RAM, search them with HNSW and
+    rescore the `oversampling * limit` best candidates with the original vectors read from disk.
+    Payloads on disk are only read for the returned hits, the payload indexes stay in RAM so
+    filters on published_at / news_source / tickers never read the chunk text.
+    """
+
+    name: str
+    on_disk_vectors: bool = False
+    on_disk_payload: bool = False
+    quantization: Optional[QuantizationConfig] = None
+    exact: bool = False  # Brute-force search instead of HNSW
+    hnsw_ef: int = 128
+    oversampling: float = 1.0
+
+    def vectors_config(self, dim: int) -> VectorParams:
+        return VectorParams(size=dim, distance=Distance.COSINE, on_disk=self.on_disk_vectors)
+
+    def hnsw_config(self) -> Optional[HnswConfigDiff]:
+        # The graph of an on-disk collection is only walked through the quantized vectors
+        return HnswConfigDiff(on_disk=True) if self.on_disk_vectors else None
+
+    def search_params(self) -> SearchParams:
+        quantization = None
+        if self.quantization is not None:
+            quantization = QuantizationSearchParams(rescore=True, oversampling=self.oversampling)
+        return SearchParams(exact=self.exact, hnsw_ef=self.hnsw_ef, quantization=quantization)
+
+    def matches(self, info: CollectionInfo) -> bool:
+        """
+        Returns True if an existing collection stores its vectors the way this profile does, which is what
+        decides the search parameters. Unset fields count as the server defaults (vectors in RAM, no
+        quantization). The payload location is not compared: collections created before the profiles have
+        the server default (on disk), and the payload indexes used by filters are in RAM either way.
+        """
+        vectors = info.config.params.vectors
+        if isinstance(vectors, dict):
+            # Named vectors, the app only writes the unnamed dense vector
+            vectors = vectors.get("")
+        on_disk = bool(getattr(vectors, "on_disk", None))
+        quantization = info.config.quantization_config
+        return on_disk == self.on_disk_vectors and type(quantization) is type(self.quantization)
+
+
+PROFILES: Dict[str, CollectionProfile] = {
+    # float32 vectors and payloads in RAM, exact search: best recall, RAM grows with the corpus
+    "default": CollectionProfile(name="default", exact=True),
+    # int8 vectors in RAM (4x smaller), float32 vectors and payloads on disk
+    "compact": CollectionProfile(
+        name="compact",
+        on_disk_vectors=True,
+        on_disk_payload=True,
+        quantization=ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        ),
+        oversampling=2.0,
+    ),
+    # 1 bit per dimension in RAM (32x smaller), needs more oversampling to keep recall
+    "binary": CollectionProfile(
+        name="binary",
+        on_disk_vectors=True,
+        on_disk_payload=True,
+        quantization=BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True)),
+        oversampling=4.0,
+    ),
+}
+
+
+def get_profile(name: Optional[str] = None) -> CollectionProfile:
+    name = name or configuration.QDRANT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown collection profile '{name}', expected one of {sorted(PROFILES)}")
+    return PROFILES[name]
@@ -1,53 +1,316 @@
-from typing import Optional
+import asyncio
+import re
+import time
+from typing import Any, Dict, Optional, Union
 
 from qdrant_client import AsyncQdrantClient
-from qdrant_client.models import CollectionStatus, Distance
+from qdrant_client.models import (
+    CollectionInfo,
+    CollectionStatus,
+    CreateAlias,
+    CreateAliasOperation,
+    Modifier,
+    PayloadSchemaType,
+    SparseVectorParams,
+)
 
 from ..config import configuration
-from .embedder import Embedder
+from .embedder import Embedder, get_embedding_service
+from .local_store import LocalVectorStore
 from .logger import rag_logger
+from .profiles import PROFILES, CollectionProfile, get_profile
+from .sparse import SPARSE_VECTOR_NAME
 
-_qdrant_client: Optional[AsyncQdrantClient] = None
+_qdrant_client: Optional[Union[AsyncQdrantClient, LocalVectorStore]] = None
 COLLECTION_NAME = configuration.QDRANT_COLLECTION
+# Collection checked at startup: COLLECTION_NAME, or the current month partition with QDRANT_PARTITIONING
+ACTIVE_COLLECTION = COLLECTION_NAME
 EMBEDDING_DIM: Optional[int] = None
+# Collection metadata key recording the model that embedded the vectors
+EMBED_MODEL_KEY = "embed_model"
+# Concrete collection queries go to, together with the embedding model it was built with. Re-resolved from
+# the COLLECTION_NAME alias every COLLECTION_FOLLOW_SECONDS, so a re-embedded collection is picked up live
+_search_collection: str = COLLECTION_NAME
+_followed_at: float = 0.0
+_follow_task: Optional[asyncio.Task] = None
+COLLECTION_FOLLOW_SECONDS = 30.0
+# Whether the collection has the BM25 sparse vector, collections created before hybrid search do not
+_sparse_enabled: bool = False
+# Profile the collection was actually created with, it decides the search parameters
+_profile: CollectionProfile = PROFILES["default"]
+# Payload fields used by filtered search, indexed so filters never fall back to a full scan
+PAYLOAD_INDEXES = {
+    "published_at": PayloadSchemaType.DATETIME,
+    "news_source": PayloadSchemaType.KEYWORD,
+    "tickers": PayloadSchemaType.KEYWORD,
+}
 
 
-async def ensure_collection():
-    rag_embedder = await Embedder.create()
+async def resolve_collection(name: str) -> Optional[str]:
+    """
+    Returns the collection `name` refers to (itself, or the target of the alias `name`), None if neither exists.
+    """
+    collections = await _qdrant_client.get_collections()
+    if any(collection.name == name for collection in collections.collections):
+        return name
+    aliases = await _qdrant_client.get_aliases()
+    for alias in aliases.aliases:
+        if alias.alias_name == name:
+            return alias.collection_name
+    return None
+
+
+def vector_size(info: CollectionInfo) -> int:
+    vectors = info.config.params.vectors
+    if isinstance(vectors, dict):
+        # Named vectors, the app only writes the unnamed dense vector
+        vectors = vectors[""]
+    return vectors.size
+
+
+def model_collection(model: str, alias: str = COLLECTION_NAME) -> str:
+    """
+    Name of the collection embedded with `model` behind the alias `alias`, e.g. `news_bge_m3`.
+    """
+    return f"{alias}_{re.sub(r'[^A-Za-z0-9]+', '_', model).strip('_').lower()}"
+
+
+def embed_model_of(info: CollectionInfo) -> Optional[str]:
+    """
+    The model that embedded the collection, None for collections created before it was recorded.
+    """
+    return (info.config.metadata or {}).get(EMBED_MODEL_KEY)
+
+
+async def create_collection(
+    name: str,
+    dim: int,
+    profile: CollectionProfile,
+    *,
+    sparse_vectors_config: Optional[Dict[str, SparseVectorParams]] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> None:
+    rag_logger.info(f"Creating collection '{name}' with dimension {dim} and profile '{profile.name}'")
+    await _qdrant_client.create_collection(
+        collection_name=name,
+        vectors_config=profile.vectors_config(dim),
+        sparse_vectors_config=sparse_vectors_config,
+        on_disk_payload=profile.on_disk_payload,
+        quantization_config=profile.quantization,
+        hnsw_config=profile.hnsw_config(),
+        metadata=metadata,
+    )
+    await ensure_payload_indexes(name)
 
+
+def default_sparse_vectors() -> Optional[Dict[str, SparseVectorParams]]:
+    if not configuration.RAG_HYBRID:
+        return None
+    # Qdrant computes the IDF part of BM25 from the collection statistics
+    return {SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)}
+
+
+def __switch_hint() -> str:
+    if configuration.QDRANT_PARTITIONING:
+        return "the partitions are re-ingested (they cannot be re-embedded)"
+    return "it is re-embedded (`python -m src.rag.reembed`)"
+
+
+async def __pin_model(embedder: Embedder, stored_model: Optional[str], collection: str) -> Embedder:
+    """
+    Switches the embedding service to `stored_model`, the model the vectors of `collection` come from.
+    Vectors and queries must come from the same model, EMBED_MODEL only applies after a switch.
+    """
     global EMBEDDING_DIM
+    if stored_model is None or stored_model == embedder.model:
+        return embedder
+    rag_logger.warning(
+        f"{collection} was embedded with {stored_model}, not EMBED_MODEL {embedder.model}. "
+        f"Using {stored_model} until {__switch_hint()}."
+    )
+    embedder = await get_embedding_service().start(stored_model)
+    EMBEDDING_DIM = embedder.embedding_len
+    return embedder
+
+
+async def ensure_collection():
+    rag_embedder = await get_embedding_service().get()
+
+    global EMBEDDING_DIM, ACTIVE_COLLECTION, _search_collection
     EMBEDDING_DIM = rag_embedder.embedding_len
     assert EMBEDDING_DIM is not None, "Embedding dimension must be specified"
 
-    collections = await _qdrant_client.get_collections()
-    exists = any(collection.name == COLLECTION_NAME for collection in collections.collections)
-    if not exists:
-        rag_logger.info(f"Creating collection '{COLLECTION_NAME}' with dimension {EMBEDDING_DIM}")
-        await _qdrant_client.create_collection(
-            collection_name=COLLECTION_NAME,
-            vectors_config={
-                "size": EMBEDDING_DIM,
-                "distance": Distance.COSINE,
-            },
+    profile = get_profile()
+    if configuration.QDRANT_PARTITIONING:
+        # Imported here, the partitions module builds on this one
+        from .partitions import ensure_partition, month_of, partitions_model, refresh_partitions
+
+        # Before the current partition is created, it must be searchable together with the existing ones
+        rag_embedder = await __pin_model(rag_embedder, await partitions_model(), "The newest month partition")
+        ACTIVE_COLLECTION = await ensure_partition(month_of(None))
+    else:
+        ACTIVE_COLLECTION = COLLECTION_NAME
+        if await resolve_collection(COLLECTION_NAME) is None:
+            # Created behind the alias, so a re-embed or a migration only ever swaps the alias
+            # and the collection the API processes are querying stays in place until they follow
+            target = model_collection(rag_embedder.model)
+            await create_collection(
+                target,
+                EMBEDDING_DIM,
+                profile,
+                sparse_vectors_config=default_sparse_vectors(),
+                metadata={EMBED_MODEL_KEY: rag_embedder.model},
+            )
+            await _qdrant_client.update_collection_aliases(
+                change_aliases_operations=[
+                    CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=COLLECTION_NAME))
+                ]
+            )
+        _search_collection = await resolve_collection(COLLECTION_NAME)
+    await ensure_payload_indexes(ACTIVE_COLLECTION)
+
+    global _sparse_enabled, _profile
+    info = await _qdrant_client.get_collection(ACTIVE_COLLECTION)
+    stored_model = embed_model_of(info)
+    rag_embedder = await __pin_model(rag_embedder, stored_model, f"Collection '{ACTIVE_COLLECTION}'")
+    if stored_model is None and vector_size(info) != EMBEDDING_DIM:
+        rag_logger.error(
+            f"Collection '{ACTIVE_COLLECTION}' has dimension {vector_size(info)} but {rag_embedder.model} "
+            f"produces {EMBEDDING_DIM}, search fails until {__switch_hint()}."
+        )
+    sparse_vectors = info.config.params.sparse_vectors or {}
+    _sparse_enabled = configuration.RAG_HYBRID and SPARSE_VECTOR_NAME in sparse_vectors
+    if configuration.RAG_HYBRID and not _sparse_enabled:
+        rag_logger.warning(
+            f"Collection '{ACTIVE_COLLECTION}' has no '{SPARSE_VECTOR_NAME}' sparse vector, "
+            "hybrid search is disabled until the collection is rebuilt."
+        )
+    stored = profile if profile.matches(info) else next((p for p in PROFILES.values() if p.matches(info)), None)
+    # A layout matching no profile is searched with the parameters of the configured one
+    _profile = stored or profile
+    if stored is not profile:
+        layout = f"as profile '{stored.name}'" if stored is not None else "with a custom layout matching no profile"
+        rag_logger.warning(
+            f"Collection '{ACTIVE_COLLECTION}' is stored {layout}, not as '{profile.name}'. "
+            f"Rebuild it with `python -m src.rag.migrate --profile {profile.name}`."
+        )
+    if configuration.QDRANT_PARTITIONING:
+        # Now that the model and the sparse vectors are settled, they decide which partitions
+        # and whether the collection from before partitioning are searched
+        await refresh_partitions()
+
+
+async def search_incompatibility(name: str) -> Optional[str]:
+    """
+    Why the collection `name` cannot be searched together with the collections in use (another embedding
+    model or dimension, no BM25 vector while hybrid search is on), None if it can.
+    """
+    info = await _qdrant_client.get_collection(name)
+    model, current_model = embed_model_of(info), get_embedding_service().model
+    if model is not None and model != current_model:
+        return f"it was embedded with {model}, not {current_model}"
+    if vector_size(info) != EMBEDDING_DIM:
+        return f"it has dimension {vector_size(info)}, not {EMBEDDING_DIM}"
+    if _sparse_enabled and SPARSE_VECTOR_NAME not in (info.config.params.sparse_vectors or {}):
+        return f"it has no '{SPARSE_VECTOR_NAME}' sparse vector"
+    return None
+
+
+def search_collection() -> str:
+    """
+    The collection behind COLLECTION_NAME that queries go to, see `follow_collection`.
+    """
+    return _search_collection
+
+
+async def follow_collection() -> None:
+    """
+    Re-resolves the COLLECTION_NAME alias. When it points at a collection embedded with another model,
+    that model is loaded first, then queries move to the new collection in the same step.
+    """
+    global _search_collection, _followed_at
+    _followed_at = time.monotonic()
+    target = await resolve_collection(COLLECTION_NAME)
+    if target is None or target == _search_collection:
+        return
+    info = await _qdrant_client.get_collection(target)
+    model = embed_model_of(info)
+    service = get_embedding_service()
+    if model is not None and model != service.model:
+        await service.start(model)
+    rag_logger.info(f"'{COLLECTION_NAME}' now resolves to '{target}', searching it with {service.model}")
+    _search_collection = target
+
+
+def schedule_follow() -> None:
+    """
+    Starts `follow_collection` in the background at most every COLLECTION_FOLLOW_SECONDS, requests never wait for it.
+    """
+    global _followed_at, _follow_task
+    if time.monotonic() - _followed_at < COLLECTION_FOLLOW_SECONDS:
+        return
+    if _follow_task is not None and not _follow_task.done():
+        return
+    _followed_at = time.monotonic()
+    _follow_task = asyncio.create_task(__follow_logged())
+
+
+async def __follow_logged() -> None:
+    try:
+        await follow_collection()
+    except Exception as e:
+        rag_logger.error(f"Failed to re-resolve '{COLLECTION_NAME}': {e}")
+
+
+def collection_profile() -> CollectionProfile:
+    """
+    Returns the profile of the collection in use, its search parameters apply to every dense query.
+    """
+    return _profile
+
+
+def sparse_enabled() -> bool:
+    """
+    Returns True if BM25 sparse vectors are written and queried.
+    """
+    return _sparse_enabled
+
+
+async def ensure_payload_indexes(collection_name: str = COLLECTION_NAME):
+    info = await _qdrant_client.get_collection(collection_name)
+    for field_name, field_schema in PAYLOAD_INDEXES.items():
+        if field_name in info.payload_schema:
+            continue
+        rag_logger.info(f"Creating payload index '{field_name}' ({field_schema}) on '{collection_name}'")
+        await _qdrant_client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field_name,
+            field_schema=field_schema,
         )
 
 
 async def qdrant_status_check():
-    info = await _qdrant_client.get_collection(COLLECTION_NAME)
+    info = await _qdrant_client.get_collection(ACTIVE_COLLECTION)
     status = info.status
     if status != CollectionStatus.GREEN:
-        rag_logger.warning(f"Collection '{COLLECTION_NAME}' status is {status}. Expected GREEN.")
+        rag_logger.warning(f"Collection '{ACTIVE_COLLECTION}' status is {status}. Expected GREEN.")
     else:
-        rag_logger.info(f"Collection '{COLLECTION_NAME}' is healthy with status {status}.")
+        rag_logger.info(f"Collection '{ACTIVE_COLLECTION}' is healthy with status {status}.")
 
 
 def get_qdrant_client():
     """
-    Returns the Qdrant client instance.
+    Returns the Qdrant client instance, or the in-process store with VECTOR_BACKEND=local.
     This is useful for direct access to the client in other modules.
     """
     global _qdrant_client
-    if _qdrant_client is None:
+    if _qdrant_client is None and configuration.VECTOR_BACKEND == "local":
+        _qdrant_client = LocalVectorStore(
+            configuration.VECTOR_LOCAL_PATH,
+            ivf_lists=configuration.VECTOR_LOCAL_IVF_LISTS,
+            ivf_probes=configuration.VECTOR_LOCAL_IVF_PROBES,
+        )
+    elif _qdrant_client is None:
         _qdrant_client = AsyncQdrantClient(
             url=configuration.QDRANT_URL,
             api_key=configuration.QDRANT_API_KEY,
@@ -0,0 +1,209 @@
+"""
+Re-embed the RAG collection with another embedding model without downtime:
+
+    python -m src.rag.reembed status
+    python -m src.rag.reembed --model bge-m3
+
+The chunk texts stored in the payloads are embedded again (no re-crawl) into a new collection
+`<QDRANT_COLLECTION>_<model>`, at most REEMBED_TEXTS_PER_SECOND texts per second so the
+embedding server keeps serving queries. The progress is checkpointed in the new collection's
+metadata, running the command again resumes where it stopped. When every point is copied,
+the `QDRANT_COLLECTION` alias is switched to it, and the API follows within a minute.
+The crawler worker runs the same job (POST /crawler/v1/reembed-now) with EMBED_MODEL,
+run the command only while the worker is stopped.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from qdrant_client.models import PointStruct
+
+from ..common.metrics import registry
+from ..config import configuration
+from . import qdrant
+from .embedder import Embedder
+from .logger import rag_logger
+from .migrate import switch_alias
+from .profiles import get_profile
+from .sparse import SPARSE_VECTOR_NAME
+
+reembedded_points = registry.counter("reembed_points_total", "Points re-embedded into a new collection.")
+
+# Checkpoint keys in the metadata of the collection being built
+SOURCE_KEY = "reembed_source"
+OFFSET_KEY = "reembed_offset"
+DONE_KEY = "reembed_done"
+TOTAL_KEY = "reembed_total"
+
+
+async def __prepare_target(source: str, target: str, embedder: Embedder) -> Dict[str, Any]:
+    """
+    Creates the target collection, or returns the checkpoint of an interrupted run into it.
+    """
+    client = qdrant.get_qdrant_client()
+    source_info = await client.get_collection(source)
+    if await client.collection_exists(target):
+        metadata = (await client.get_collection(target)).config.metadata or {}
+        if metadata.get(SOURCE_KEY) == source:
+            rag_logger.info(f"Resuming re-embedding into '{target}' at {metadata.get(DONE_KEY, 0)} points")
+            return metadata
+        # Left over from a run against another source collection
+        await client.delete_collection(target)
+    metadata = {
+        qdrant.EMBED_MODEL_KEY: embedder.model,
+        SOURCE_KEY: source,
+        OFFSET_KEY: None,
+        DONE_KEY: 0,
+        TOTAL_KEY: source_info.points_count,
+    }
+    await qdrant.create_collection(
+        target,
+        embedder.embedding_len,
+        get_profile(),
+        sparse_vectors_config=source_info.config.params.sparse_vectors,
+        metadata=metadata,
+    )
+    return metadata
+
+
+async def reembed_collection(
+    model: Optional[str] = None,
+    *,
+    alias: str = configuration.QDRANT_COLLECTION,
+    batch_size: int = configuration.REEMBED_BATCH_SIZE,
+    texts_per_second: float = configuration.REEMBED_TEXTS_PER_SECOND,
+    keep_old: bool = False,
+) -> str:
+    """
+    Re-embeds the collection behind `alias` with `model` (default EMBED_MODEL) and switches the alias to
+    the new collection. Resumes an interrupted run. Returns the name of the new collection.
+    """
+    if configuration.QDRANT_PARTITIONING:
+        raise ValueError("Re-embedding month partitions is not supported, re-ingest them instead")
+    model = model or configuration.EMBED_MODEL
+    client = qdrant.get_qdrant_client()
+    source = await qdrant.resolve_collection(alias)
+    if source is None:
+        raise ValueError(f"Collection '{alias}' does not exist")
+    target = qdrant.model_collection(model, alias)
+    if source == target:
+        rag_logger.info(f"'{alias}' is already embedded with {model}")
+        return target
+    if source == alias:
+        # Collections created before they were put behind an alias: the alias needs the name
+        if keep_old:
+            raise ValueError(
+                f"'{alias}' is a plain collection, the switch deletes it to create the alias so it cannot be kept. "
+                "Snapshot it if a rollback is needed and run without --keep-old."
+            )
+        rag_logger.warning(
+            f"'{alias}' is a plain collection, it is deleted at the switch. API processes get errors "
+            "for the queries in flight then, and follow the alias on the next one."
+        )
+
+    embedder = await Embedder.create(model)
+    metadata = await __prepare_target(source, target, embedder)
+    with_sparse = SPARSE_VECTOR_NAME in ((await client.get_collection(source)).config.params.sparse_vectors or {})
+    offset, done, total = metadata.get(OFFSET_KEY), metadata.get(DONE_KEY, 0), metadata.get(TOTAL_KEY) or 0
+    started, started_done = time.monotonic(), done
+    # An interrupted run may have stopped after the last batch but before the switch
+    finished = done > 0 and offset is None
+    while not finished:
+        points, offset = await client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            # The BM25 vectors do not depend on the embedding model, they are copied as is
+            with_vectors=[SPARSE_VECTOR_NAME] if with_sparse else False,
+        )
+        if points:
+            embeddings = await embedder.embed_batch([point.payload.get("text", "") for point in points])
+            await client.upsert(
+                collection_name=target,
+                points=[
+                    PointStruct(
+                        id=point.id,
+                        vector={"": embedding, **point.vector} if with_sparse else embedding,
+                        payload=point.payload,
+                    )
+                    for point, embedding in zip(points, embeddings)
+                ],
+            )
+            done += len(points)
+            reembedded_points.inc(len(points))
+        await client.update_collection(target, metadata={OFFSET_KEY: offset, DONE_KEY: done})
+
+        elapsed = time.monotonic() - started
+        rate = (done - started_done) / elapsed if elapsed else 0.0
+        eta = f", about {(total - done) / rate / 60:.0f} min left" if rate and total > done else ""
+        rag_logger.info(f"Re-embedded {done}/{total} points into '{target}' ({rate:.1f} texts/s{eta})")
+        if texts_per_second > 0:
+            # Pace the run so queries keep most of the embedding server
+            await asyncio.sleep(max(0.0, (done - started_done) / texts_per_second - elapsed))
+        finished = offset is None
+
+    expected = (await client.count(source, exact=True)).count
+    copied = (await client.count(target, exact=True)).count
+    if copied < expected:
+        raise RuntimeError(f"'{source}' changed during the run ({copied} re-embedded, {expected} now), run it again")
+
+    previous = await switch_alias(alias, target)
+    rag_logger.info(f"'{alias}' now points at '{target}', embedded with {model} ({copied} points)")
+    await qdrant.follow_collection()
+    if previous is not None and not keep_old:
+        # Other processes follow the alias within COLLECTION_FOLLOW_SECONDS, until then they query the old one
+        await asyncio.sleep(2 * qdrant.COLLECTION_FOLLOW_SECONDS)
+        await client.delete_collection(previous)
+        rag_logger.info(f"Deleted previous collection '{previous}'")
+    return target
+
+
+async def run_reembed_job() -> None:
+    """
+    Worker job handler, re-embeds with EMBED_MODEL.
+    """
+    await reembed_collection()
+
+
+async def status(model: Optional[str] = None, alias: str = configuration.QDRANT_COLLECTION) -> None:
+    client = qdrant.get_qdrant_client()
+    source = await qdrant.resolve_collection(alias)
+    if source is None:
+        print(f"Collection '{alias}' does not exist")
+        return
+    info = await client.get_collection(source)
+    print(f"'{alias}' -> '{source}': {info.points_count} points, embedded with {qdrant.embed_model_of(info)}")
+    target = qdrant.model_collection(model or configuration.EMBED_MODEL, alias)
+    if target != source and await client.collection_exists(target):
+        metadata = (await client.get_collection(target)).config.metadata or {}
+        done, total = metadata.get(DONE_KEY, 0), metadata.get(TOTAL_KEY) or 0
+        print(f"Re-embedding into '{target}': {done}/{total} points ({done / max(total, 1):.1%})")
+
+
+async def main(args: argparse.Namespace) -> None:
+    qdrant.get_qdrant_client()
+    try:
+        if args.command == "status":
+            await status(args.model)
+        else:
+            await reembed_collection(
+                args.model,
+                batch_size=args.batch_size,
+                texts_per_second=args.rate,
+                keep_old=args.keep_old,
+            )
+    finally:
+        await qdrant.get_qdrant_client().close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", choices=["run", "status"], default="run")
+    parser.add_argument("--model", default=None, help="Default: EMBED_MODEL")
+    parser.add_argument("--batch-size", type=int, default=configuration.REEMBED_BATCH_SIZE)
+    parser.add_argument("--rate", type=float, default=configuration.REEMBED_TEXTS_PER_SECOND, help="0 = unlimited")
+    parser.add_argument("--keep-old", action="store_true", help="Keep the previous collection for a rollback")
+    asyncio.run(main(parser.parse_args()))
@@ -1,11 +1,31 @@
+import asyncio
 from dataclasses import dataclass
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 
-from qdrant_client.http.models import SearchParams
+from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client.http.models import (
+    DatetimeRange,
+    FieldCondition,
+    Filter,
+    MatchAny,
+    MatchValue,
+)
 
+from ..common.tracing import traced
 from ..config import configuration
-from .embedder import Embedder
-from .qdrant import get_qdrant_client
+from .embedder import Embedder, get_embedding_service
+from .partitions import refresh_partitions, search_partitions
+from .qdrant import (
+    COLLECTION_NAME,
+    collection_profile,
+    follow_collection,
+    get_qdrant_client,
+    schedule_follow,
+    search_collection,
+    sparse_enabled,
+)
+from .sparse import SPARSE_VECTOR_NAME, encode_query
 
 
 @dataclass
@@ -13,6 +33,69 @@ class SearchResult:
     id: str
     score: float
     payload: dict
+    dense_score: Optional[float] = None  # Cosine similarity, kept after fusion for score thresholds
+
+
+@dataclass
+class SearchFilter:
+    """
+    Payload filters for `Retriever.search`, e.g. "last 3 days, source=USTV":
+        SearchFilter(since_days=3, source="USTV")
+    Every field is optional and the set ones are combined with AND.
+    """
+
+    since_days: Optional[int] = None
+    source: Optional[str] = None
+    tickers: Optional[List[str]] = None
+
+    def since(self) -> Optional[datetime]:
+        if self.since_days is None:
+            return None
+        return datetime.now().astimezone() - timedelta(days=self.since_days)
+
+    def to_qdrant(self) -> Optional[Filter]:
+        conditions = []
+        since = self.since()
+        if since is not None:
+            conditions.append(FieldCondition(key="published_at", range=DatetimeRange(gte=since)))
+        if self.source:
+            conditions.append(FieldCondition(key="news_source", match=MatchValue(value=self.source)))
+        if self.tickers:
+            conditions.append(FieldCondition(key="tickers", match=MatchAny(any=self.tickers)))
+        if not conditions:
+            return None
+        return Filter(must=conditions)
+
+
+def reciprocal_rank_fusion(
+    result_lists: List[List[SearchResult]],
+    *,
+    k: int = configuration.RAG_RRF_K,
+    top_k: Optional[int] = None,
+) -> List[SearchResult]:
+    """
+    Merge ranked result lists with reciprocal-rank fusion: score(d) = sum(1 / (k + rank(d))).
+    Only ranks matter, so the dense cosine scores and the BM25 scores need no normalisation.
+    """
+    fused: Dict[str, SearchResult] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            if result.id not in fused:
+                fused[result.id] = SearchResult(id=result.id, score=0.0, payload=result.payload)
+            fused[result.id].score += 1.0 / (k + rank)
+            if result.dense_score is not None:
+                fused[result.id].dense_score = result.dense_score
+    merged = sorted(fused.values(), key=lambda r: r.score, reverse=True)
+    return merged[:top_k] if top_k is not None else merged
+
+
+def merge_by_score(result_lists: List[List[SearchResult]], limit: int) -> List[SearchResult]:
+    """
+    Merge the hits of the same query against several partitions, the scores come from one model and are comparable.
+    """
+    merged = [result for results in result_lists for result in results]
+    merged.sort(key=lambda r: r.score, reverse=True)
+    return merged[:limit]
 
 
 class Retriever:
@@ -24,27 +107,118 @@ class Retriever:
         top_k: int = 5,
     ):
         self.collection_name = collection_name
-        self.embedder = embedder
+        self.embedder = embedder  # None means the shared embedding service
         self.top_k = top_k
         self.qdrant_client = get_qdrant_client()
 
+    @traced("retriever.search")
     async def search(
         self,
         query: str,
         top_k: Optional[int] = None,
+        filters: Optional[SearchFilter] = None,
     ) -> List[SearchResult]:
-        if self.embedder is None:
-            self.embedder = await Embedder.create()
         if top_k is None:
             top_k = self.top_k
-        query_vector = await self.embedder.embed_texts([query])
-        results = await self.qdrant_client.search(
-            collection_name=self.collection_name,
-            query_vector=query_vector[0],
-            limit=top_k,
-            search_params=SearchParams(
-                exact=True,  # Use exact search for better accuracy
-                hnsw_ef=128,  # Higher ef for better recall
-            ),
+        searched = search_collection()
+        try:
+            return await self.__search(query, top_k, filters)
+        except UnexpectedResponse as e:
+            if e.status_code in (400, 404) and configuration.QDRANT_PARTITIONING:
+                # A partition was dropped by the retention job since the list was refreshed (404), or holds
+                # vectors of another model (400). The refresh lists the partitions again and leaves those out
+                await refresh_partitions()
+                return await self.__search(query, top_k, filters)
+            # The collection was replaced behind the alias (e.g. re-embedded): 404 once the old one is deleted,
+            # 400 when a plain collection was replaced by an alias to vectors of another dimension.
+            # Follow the alias and retry once if it moved
+            if e.status_code not in (400, 404) or not self.__follows_alias():
+                raise
+            await follow_collection()
+            if search_collection() == searched:
+                raise
+            return await self.__search(query, top_k, filters)
+
+    async def __search(self, query: str, top_k: int, filters: Optional[SearchFilter]) -> List[SearchResult]:
+        query_filter = filters.to_qdrant() if filters else None
+        # The embedder and the collection are read together, they change together when the alias moves
+        embedder = self.embedder or await get_embedding_service().get_query_embedder()
+        collections = await self.__collections(filters)
+        if not collections:
+            return []
+        if not sparse_enabled():
+            return await self.__dense_search(query, collections, embedder, limit=top_k, query_filter=query_filter)
+
+        # Over-fetch each side so documents ranked a bit lower by one retriever can still win the fusion
+        limit = top_k * 4
+        dense_results, sparse_results = await asyncio.gather(
+            self.__dense_search(query, collections, embedder, limit=limit, query_filter=query_filter),
+            self.__sparse_search(query, collections, limit=limit, query_filter=query_filter),
         )
-        return [SearchResult(id=hit.id, score=hit.score, payload=hit.payload) for hit in results]
+        return reciprocal_rank_fusion([dense_results, sparse_results], top_k=top_k)
+
+    def __follows_alias(self) -> bool:
+        return not configuration.QDRANT_PARTITIONING and self.collection_name == COLLECTION_NAME
+
+    async def __collections(self, filters: Optional[SearchFilter]) -> List[str]:
+        """
+        With QDRANT_PARTITIONING only the month partitions the query can match are searched,
+        so the cost follows the recent window (or the date filter), not the whole history.
+        """
+        if self.__follows_alias():
+            schedule_follow()
+            return [search_collection()]
+        if not configuration.QDRANT_PARTITIONING:
+            return [self.collection_name]
+        return await search_partitions(filters.since() if filters else None)
+
+    async def __dense_search(
+        self,
+        query: str,
+        collections: List[str],
+        embedder: Embedder,
+        *,
+        limit: int,
+        query_filter: Optional[Filter],
+    ) -> List[SearchResult]:
+        query_vector = await embedder.embed_texts([query])
+
+        async def search(collection_name: str) -> List[SearchResult]:
+            response = await self.qdrant_client.query_points(
+                collection_name=collection_name,
+                query=query_vector[0],
+                query_filter=query_filter,
+                limit=limit,
+                search_params=collection_profile().search_params(),
+            )
+            return [
+                SearchResult(id=hit.id, score=hit.score, payload=hit.payload, dense_score=hit.score)
+                for hit in response.points
+            ]
+
+        return merge_by_score(await asyncio.gather(*(search(name) for name in collections)), limit)
+
+    async def __sparse_search(
+        self,
+        query: str,
+        collections: List[str],
+        *,
+        limit: int,
+        query_filter: Optional[Filter],
+    ) -> List[SearchResult]:
+        sparse_query = encode_query(query)
+        if not sparse_query.indices:
+            return []
+
+        async def search(collection_name: str) -> List[SearchResult]:
+            response = await self.qdrant_client.query_points(
+                collection_name=collection_name,
+                query=sparse_query,
+                using=SPARSE_VECTOR_NAME,
+                query_filter=query_filter,
+                limit=limit,
+            )
+            return [SearchResult(id=hit.id, score=hit.score, payload=hit.payload) for hit in response.points]
+
+        # The BM25 IDF is per partition, close enough to merge by score for partitions of similar news
+        return merge_by_score(await asyncio.gather(*(search(name) for name in collections)), limit)
@@ -0,0 +1,63 @@
+import re
+import zlib
+from collections import Counter
+from typing import List
+
+from qdrant_client.models import SparseVector
+
+# Name of the sparse (BM25) vector in the Qdrant collection
+SPARSE_VECTOR_NAME = "bm25"
+
+# BM25 term-frequency saturation. The IDF part is computed by Qdrant (Modifier.IDF).
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Chunks are cut at 200 characters, which is about 200 CJK bigrams
+BM25_AVG_DOC_LEN = 200
+
+# ASCII words/numbers (tickers like 2330, TSMC, 2330.TW) or runs of CJK characters
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:\.[A-Za-z0-9]+)*|[\u3400-\u9fff\uf900-\ufaff]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split a text into BM25 terms.
+    ASCII words are lower-cased and kept whole so tickers match exactly,
+    CJK runs are split into overlapping bigrams since Chinese has no word boundaries.
+    """
+    tokens: List[str] = []
+    for match in _TOKEN_RE.finditer(text):
+        word = match.group(0)
+        if word.isascii():
+            tokens.append(word.lower())
+        elif len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def __token_index(token: str) -> int:
+    # Stable across processes (unlike hash()), and fits Qdrant's u32 sparse indices
+    return zlib.crc32(token.encode('utf-8'))
+
+
+def encode_document(text: str) -> SparseVector:
+    """
+    Encode a chunk into its BM25 term weights.
+    """
+    tokens = tokenize(text)
+    doc_len = len(tokens)
+    weights = {}
+    for token, tf in Counter(tokens).items():
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / BM25_AVG_DOC_LEN)
+        index = __token_index(token)
+        weights[index] = weights.get(index, 0.0) + tf * (BM25_K1 + 1) / (tf + norm)
+    return SparseVector(indices=list(weights.keys()), values=list(weights.values()))
+
+
+def encode_query(text: str) -> SparseVector:
+    """
+    Encode a query, every distinct term counts once.
+    """
+    indices = sorted({__token_index(token) for token in tokenize(text)})
+    return SparseVector(indices=indices, values=[1.0] * len(indices))
@@ -0,0 +1,26 @@
+import re
+from typing import List
+
+# Taiwan stock codes as they appear in news text: 台積電(2330), 聯發科（2454）, 2330.TW, 6488-TWO
+_TICKER_PATTERNS = [
+    re.compile(r"[（(](\d{4,6}[A-Z]?)([-.]TWO?)?[)）]"),
+    re.compile(r"(?<![\d.])(\d{4,6})([-.]TWO?)\b"),
+]
+# Codes without the .TW / .TWO suffix in this range are read as years: 財報(2024) is skipped, so is 中鋼(2002)
+# while 中鋼(2002.TW) is kept
+_YEARS = range(1990, 2040)
+
+
+def extract_tickers(text: str) -> List[str]:
+    """
+    Extract the stock tickers mentioned in a text, in order of first appearance.
+    """
+    tickers: List[str] = []
+    for pattern in _TICKER_PATTERNS:
+        for match in pattern.finditer(text):
+            ticker, suffix = match.groups()
+            if suffix is None and ticker.isdigit() and int(ticker) in _YEARS:
+                continue
+            if ticker not in tickers:
+                tickers.append(ticker)
+    return tickers
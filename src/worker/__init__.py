@@ -0,0 +1,3 @@
+from .runner import run_worker
+
+__all__ = ["run_worker"]
@@ -0,0 +1,3 @@
+from ..common import get_logger
+
+worker_logger = get_logger("src.worker")
@@ -0,0 +1,217 @@
+import asyncio
+import signal
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ..config import configuration
+from ..crawler.jobs import (
+    FETCH_JOB,
+    INGEST_JOB,
+    REEMBED_JOB,
+    claim_next_job,
+    enqueue_job,
+    fail_running_jobs,
+    finish_job,
+)
+from ..crawler.service import ingest_articles, run_fetchers
+from ..db.migrations import check_schema
+from ..db.models import CrawlerJob
+from ..db.session import AsyncSessionLocal, engine
+from ..rag.embedder import get_embedding_service
+from ..rag.partitions import apply_retention
+from ..rag.qdrant import ensure_collection, get_qdrant_client
+from ..rag.reembed import run_reembed_job
+from .logger import worker_logger as logger
+
+JOB_HANDLERS = {
+    FETCH_JOB: run_fetchers,
+    INGEST_JOB: ingest_articles,
+    REEMBED_JOB: run_reembed_job,
+}
+RETENTION_JOB_ID = "apply_partition_retention"
+
+
+def __retention_enabled() -> bool:
+    return configuration.QDRANT_PARTITIONING and configuration.QDRANT_RETENTION_MONTHS > 0
+
+
+async def enqueue_scheduled_fetch() -> None:
+    """
+    Daily cron entry point. It only queues a fetch job, so scheduled and manual runs
+    go through the same job table and show up in the job status endpoints.
+    Kept at module level because the persistent job store references it by import path.
+    """
+    async with AsyncSessionLocal() as session:
+        job = await enqueue_job(session, FETCH_JOB)
+    logger.info(f"Queued scheduled fetch job {job.id}")
+
+
+async def apply_scheduled_retention() -> None:
+    """
+    Daily cron entry point dropping the month partitions past QDRANT_RETENTION_MONTHS.
+    """
+    dropped = await apply_retention()
+    if dropped:
+        logger.info(f"Retention dropped partitions: {dropped}")
+
+
+def create_scheduler():
+    """
+    APScheduler with a job store in Postgres, so a restarted or new leader picks up
+    the same schedule (and runs a missed 00:10 run within the grace time).
+    """
+    from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    # The job store is synchronous, psycopg2 is the sync driver of the same database
+    job_store_url = configuration.DATABASE_URL.replace("+asyncpg", "+psycopg2")
+    scheduler = AsyncIOScheduler(
+        jobstores={"default": SQLAlchemyJobStore(url=job_store_url, tablename="apscheduler_jobs")},
+        job_defaults={"coalesce": True, "misfire_grace_time": 3600},
+    )
+    scheduler.add_job(
+        enqueue_scheduled_fetch,
+        'cron',
+        hour=0,
+        minute=10,
+        id='fetch_yesterday_articles',
+        name='fetch_yesterday_articles',
+        replace_existing=True,
+    )
+    if __retention_enabled():
+        scheduler.add_job(
+            apply_scheduled_retention,
+            'cron',
+            hour=0,
+            minute=40,
+            id=RETENTION_JOB_ID,
+            name=RETENTION_JOB_ID,
+            replace_existing=True,
+        )
+    return scheduler
+
+
+def remove_disabled_jobs(scheduler) -> None:
+    """
+    Removes the persisted jobs of features turned off since they were scheduled, the job store
+    would keep firing them. Needs a started scheduler, the job store is only loaded by `start()`.
+    """
+    if not __retention_enabled() and scheduler.get_job(RETENTION_JOB_ID) is not None:
+        scheduler.remove_job(RETENTION_JOB_ID)
+        logger.info(f"Removed the scheduled '{RETENTION_JOB_ID}' job, partition retention is disabled.")
+
+
+async def __try_leader_lock(conn: AsyncConnection) -> bool:
+    result = await conn.execute(text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": configuration.WORKER_LOCK_ID})
+    is_leader = bool(result.scalar())
+    # The advisory lock is held by the connection, not by the transaction
+    await conn.commit()
+    return is_leader
+
+
+async def __holds_leader_lock(conn: AsyncConnection) -> bool:
+    """
+    Whether the session of `conn` still holds the advisory lock. If the connection dropped, the server
+    released the lock and a standby may already be the leader.
+    """
+    try:
+        # A bigint advisory key is shown split into classid (high half) and objid (low half), with objsubid 1
+        result = await conn.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' AND granted "
+                "AND pid = pg_backend_pid() AND objsubid = 1 "
+                "AND ((classid::bigint << 32) | objid::bigint) = :lock_id)"
+            ),
+            {"lock_id": configuration.WORKER_LOCK_ID},
+        )
+        held = bool(result.scalar())
+        await conn.commit()
+        return held
+    except Exception as e:
+        logger.error(f"Leader lock connection failed: {e}")
+        return False
+
+
+async def __wait(stop: asyncio.Event, seconds: float) -> None:
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def run_job(job: CrawlerJob) -> None:
+    handler = JOB_HANDLERS.get(job.kind)
+    error = None
+    logger.info(f"Running {job.kind} job {job.id}")
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+        await handler()
+    except Exception as e:
+        error = str(e) or type(e).__name__
+        logger.error(f"Job {job.id} failed: {error}")
+    async with AsyncSessionLocal() as session:
+        await finish_job(session, job.id, error=error)
+    logger.info(f"Finished {job.kind} job {job.id}")
+
+
+async def poll_jobs(stop: asyncio.Event, lock_conn: AsyncConnection) -> None:
+    """
+    Run queued jobs one at a time until `stop` is set. Before each claim, checks that `lock_conn`
+    still holds the leader lock and raises if it does not, so two workers never run jobs at once.
+    """
+    while not stop.is_set():
+        if not await __holds_leader_lock(lock_conn):
+            raise RuntimeError("Lost the leader lock, stopping so this worker can rejoin as a standby.")
+        async with AsyncSessionLocal() as session:
+            job = await claim_next_job(session)
+        if job is None:
+            await __wait(stop, configuration.WORKER_POLL_SECONDS)
+            continue
+        await run_job(job)
+
+
+async def run_worker() -> None:
+    """
+    Entry point of the crawler/ingestion worker (`python -m src.worker`).
+    Only the worker holding the advisory lock schedules and runs jobs, other
+    instances wait as hot standbys and take over when the leader goes away.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        async with engine.connect() as lock_conn:
+            while not stop.is_set():
+                if await __try_leader_lock(lock_conn):
+                    break
+                logger.info("Another worker is the leader, waiting.")
+                await __wait(stop, configuration.WORKER_POLL_SECONDS)
+            if stop.is_set():
+                return
+            logger.info("Acquired leader lock.")
+            await check_schema(engine)
+
+            async with AsyncSessionLocal() as session:
+                stale = await fail_running_jobs(session, reason="Worker restarted before the job finished")
+            if stale:
+                logger.warning(f"Marked {stale} interrupted jobs as failed.")
+
+            get_qdrant_client()
+            await get_embedding_service().start()
+            await ensure_collection()
+
+            scheduler = create_scheduler()
+            scheduler.start()
+            remove_disabled_jobs(scheduler)
+            try:
+                await poll_jobs(stop, lock_conn)
+            finally:
+                logger.info("Stopping worker.")
+                scheduler.shutdown(wait=False)
+    finally:
+        await get_qdrant_client().close()
+        await engine.dispose()